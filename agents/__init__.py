@@ -1,8 +1,23 @@
-"""Agents package initialization."""
-from agents.planner_agent import create_planner_agent
-from agents.data_analyst_agent import create_data_analyst_agent
-from agents.modeling_agent import create_modeling_agent
-from agents.report_writer_agent import create_report_writer_agent
+"""Agents package initialization.
+
+The agent factories import crewai; they are loaded on first use.
+"""
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from agents.planner_agent import create_planner_agent
+    from agents.data_analyst_agent import create_data_analyst_agent
+    from agents.modeling_agent import create_modeling_agent
+    from agents.report_writer_agent import create_report_writer_agent
+
+# Public name -> defining module, imported on first access
+_EXPORTS = {
+    'create_planner_agent': 'agents.planner_agent',
+    'create_data_analyst_agent': 'agents.data_analyst_agent',
+    'create_modeling_agent': 'agents.modeling_agent',
+    'create_report_writer_agent': 'agents.report_writer_agent'
+}
 
 __all__ = [
     'create_planner_agent',
@@ -10,3 +25,11 @@ __all__ = [
     'create_modeling_agent',
     'create_report_writer_agent'
 ]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
@@ -1,7 +1,7 @@
 """Data Analyst Agent - Performs comprehensive exploratory data analysis."""
 from crewai import Agent
-from tools.csv_reader_tool import csv_reader_tool
-from tools.data_stats_tool import data_stats_tool
+
+from llm import gateway_llm
 
 
 def create_data_analyst_agent(llm=None) -> Agent:
@@ -15,8 +15,14 @@ def create_data_analyst_agent(llm=None) -> Agent:
         llm: Optional LLM instance to use (overrides default)
 
     Returns:
-        Agent: Configured Data Analyst Agent with CSV reading and statistics tools
+        Agent: Configured Data Analyst Agent with CSV reading, statistics and
+            relationship tools
     """
+    # The tools bring in pandas; load them only when the agent is created
+    from tools.csv_reader_tool import csv_reader_tool
+    from tools.data_stats_tool import data_stats_tool
+    from tools.relationships_tool import relationships_tool
+    
     return Agent(
         role="Senior Data Analyst and Statistician",
         goal=(
@@ -41,8 +47,8 @@ def create_data_analyst_agent(llm=None) -> Agent:
             "explaining statistical concepts in accessible language and always tie your "
             "findings back to business implications."
         ),
-        tools=[csv_reader_tool, data_stats_tool],
-        llm=llm,
+        tools=[csv_reader_tool, data_stats_tool, relationships_tool],
+        llm=gateway_llm(llm),
         verbose=True,
         allow_delegation=False
     )
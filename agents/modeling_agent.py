@@ -1,20 +1,26 @@
-"""Modeling Agent - Proposes baseline models and evaluation strategies."""
+"""Modeling Agent - Trains baseline models and proposes evaluation strategies."""
 from crewai import Agent
 
+from llm import gateway_llm
+
 
 def create_modeling_agent(llm=None) -> Agent:
     """
     Create the Modeling Agent.
     
     This agent is responsible for proposing appropriate baseline machine learning
-    models and defining suitable evaluation metrics based on the problem type.
+    models and defining suitable evaluation metrics based on the problem type,
+    grounded in baselines it trains and cross-validates on the dataset.
     
     Args:
         llm: Optional LLM instance to use (overrides default)
 
     Returns:
-        Agent: Configured Modeling Agent
+        Agent: Configured Modeling Agent with the baseline training tool
     """
+    # The tool brings in pandas and scikit-learn; load it only when the agent is created
+    from tools.baseline_training_tool import baseline_training_tool
+    
     return Agent(
         role="Machine Learning Engineer and Model Architect",
         goal=(
@@ -40,9 +46,11 @@ def create_modeling_agent(llm=None) -> Agent:
             "for classification, or RMSE, MAE, R² for regression, always considering "
             "business context and class imbalance. You're known for providing clear "
             "explanations of why certain models and metrics are appropriate, making "
-            "complex ML concepts accessible to stakeholders."
+            "complex ML concepts accessible to stakeholders. You never quote expected "
+            "performance you have not measured."
         ),
-        llm=llm,
+        tools=[baseline_training_tool],
+        llm=gateway_llm(llm),
         verbose=True,
         allow_delegation=False,
         max_iter=15
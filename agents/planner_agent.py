@@ -1,6 +1,8 @@
 """Project Planner Agent - Translates business requirements into actionable work plans."""
 from crewai import Agent
 
+from llm import gateway_llm
+
 
 def create_planner_agent(llm=None) -> Agent:
     """
@@ -36,7 +38,7 @@ def create_planner_agent(llm=None) -> Agent:
             "quality issues and technical constraints. You excel at anticipating challenges "
             "and building contingency plans."
         ),
-        llm=llm,
+        llm=gateway_llm(llm),
         verbose=True,
         allow_delegation=False,
         max_iter=15
@@ -1,6 +1,8 @@
 """Report Writer Agent - Compiles findings into professional technical reports."""
 from crewai import Agent
 
+from llm import gateway_llm
+
 
 def create_report_writer_agent(llm=None) -> Agent:
     """
@@ -44,7 +46,7 @@ def create_report_writer_agent(llm=None) -> Agent:
             "recommendations. Your writing is concise yet comprehensive, striking the perfect "
             "balance between detail and readability."
         ),
-        llm=llm,
+        llm=gateway_llm(llm),
         verbose=True,
         allow_delegation=False,
         max_iter=15
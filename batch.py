@@ -0,0 +1,218 @@
+"""
+Batch execution script: analyze a manifest of datasets in one process.
+
+Imports crewai and configures the LLM client once, then runs every job in the
+manifest through a bounded worker pool. Jobs share the LLM client and the
+in-process dataset cache; a failing job is recorded and the batch continues.
+"""
+
+import argparse
+import csv
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+import json
+import os
+import sys
+import time
+from typing import List, Optional
+
+# main applies the Windows signal compatibility patch before crewai is imported
+from main import configure_llm
+
+from dotenv import load_dotenv
+
+from llm import gateway_summary, llm_cache, llm_cache_enabled, routing_summary
+from pipeline import run_analysis
+from tools.columnar_cache import columnar_cache
+from tools.dataset_cache import dataset_cache
+
+
+# Default number of jobs run at the same time (overridable via BATCH_WORKERS)
+DEFAULT_WORKERS = 4
+
+
+@dataclass
+class BatchJob:
+    """One manifest entry and its outcome."""
+    index: int
+    topic: str
+    csv: str
+    output: str
+    status: str = "pending"
+    wall_seconds: float = 0.0
+    turns: int = 0
+    error: str = ""
+
+
+def load_manifest(manifest_path: str, output_dir: str) -> List[BatchJob]:
+    """
+    Read a CSV or JSONL manifest with topic, csv and (optional) output fields.
+
+    Relative dataset paths are resolved against the manifest's directory and
+    relative report paths against the output directory. Entries without an
+    output are written to <output_dir>/<index>_<dataset name>_report.md.
+
+    Args:
+        manifest_path: Path to a .csv or .jsonl manifest
+        output_dir: Directory for the reports
+
+    Returns:
+        List of BatchJob in manifest order
+
+    Raises:
+        ValueError: If an entry is missing its topic or csv field
+    """
+    if manifest_path.endswith(".jsonl"):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(manifest_path, "r", encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    for index, row in enumerate(rows, 1):
+        topic = (row.get("topic") or "").strip()
+        csv_path = (row.get("csv") or "").strip()
+        if not topic or not csv_path:
+            raise ValueError(f"Manifest entry {index} needs both 'topic' and 'csv'")
+        csv_path = os.path.join(base_dir, csv_path)
+
+        output = (row.get("output") or "").strip()
+        if not output:
+            stem = os.path.splitext(os.path.basename(csv_path))[0]
+            output = f"{index:03d}_{stem}_report.md"
+        jobs.append(BatchJob(
+            index=index,
+            topic=topic,
+            csv=os.path.abspath(csv_path),
+            output=os.path.join(output_dir, output),
+        ))
+    return jobs
+
+
+def run_job(job: BatchJob, llm, sequential: bool, dataset_profile: bool) -> BatchJob:
+    """Run one job, recording its status and wall time instead of raising."""
+    start = time.perf_counter()
+    try:
+        result = run_analysis(job.topic, job.csv, job.output, llm=llm, sequential=sequential,
+                              dataset_profile=dataset_profile)
+        job.turns = result.turns
+        job.status = "ok"
+    except Exception as e:
+        job.status = "failed"
+        job.error = f"{type(e).__name__}: {e}"
+    job.wall_seconds = time.perf_counter() - start
+    return job
+
+
+def write_summary(jobs: List[BatchJob], summary_path: str) -> None:
+    """Write per-job status, wall time, LLM turns and errors as CSV."""
+    summary_dir = os.path.dirname(summary_path)
+    if summary_dir:
+        os.makedirs(summary_dir, exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["index", "topic", "csv", "output", "status", "wall_seconds", "llm_turns", "error"])
+        for job in jobs:
+            writer.writerow([
+                job.index, job.topic, job.csv, job.output, job.status,
+                f"{job.wall_seconds:.2f}", job.turns, job.error
+            ])
+
+
+def main(argv: Optional[List[str]] = None):
+    """Batch execution function."""
+    # Load environment variables
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(
+        description="Run the Multi-Agent Data Science Analysis System over a manifest of datasets"
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        required=True,
+        help="CSV or JSONL file with topic, csv and optional output columns"
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        default="reports",
+        help="Directory for the reports (default: reports)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("BATCH_WORKERS", DEFAULT_WORKERS)),
+        help=f"Number of jobs run concurrently (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--summary",
+        type=str,
+        default=None,
+        help="Path of the per-job summary CSV (default: <output-dir>/batch_summary.csv)"
+    )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="Run each job's tasks strictly one after another"
+    )
+    parser.add_argument(
+        "--no-dataset-profile",
+        action="store_true",
+        help="Do not embed a precomputed dataset profile in the tasks"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = load_manifest(args.manifest, args.output_dir)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: Could not read manifest: {e}")
+        sys.exit(1)
+    summary_path = args.summary or os.path.join(args.output_dir, "batch_summary.csv")
+
+    # One LLM client shared by every agent of every job
+    llm = configure_llm()
+
+    print("=" * 80)
+    print("BATCH ANALYSIS")
+    print("=" * 80)
+    print(f"\n📋 Manifest: {args.manifest} ({len(jobs)} jobs)")
+    print(f"⚙️  Workers: {args.workers}")
+    print(f"📝 Reports: {args.output_dir}\n")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(args.workers, 1), thread_name_prefix="batch") as executor:
+        futures = [executor.submit(run_job, job, llm, args.sequential, not args.no_dataset_profile) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            job = future.result()
+            mark = "✓" if job.status == "ok" else "✗"
+            detail = job.output if job.status == "ok" else job.error
+            print(f"{mark} [{done}/{len(jobs)}] job {job.index} ({job.wall_seconds:.1f}s): {detail}")
+    elapsed = time.perf_counter() - start
+
+    write_summary(jobs, summary_path)
+    failed = [job for job in jobs if job.status != "ok"]
+
+    print("\n" + "=" * 80)
+    print("BATCH COMPLETE")
+    print("=" * 80)
+    print(f"\n✓ {len(jobs) - len(failed)}/{len(jobs)} jobs succeeded in {elapsed:.1f}s "
+          f"({sum(job.wall_seconds for job in jobs):.1f}s of job time)")
+    print(f"✓ Summary saved to: {summary_path}")
+    print(f"✓ {dataset_cache.summary()}")
+    print(f"✓ {columnar_cache.summary()}")
+    if llm_cache_enabled():
+        print(f"✓ {llm_cache.summary()}")
+    for line in gateway_summary() + routing_summary():
+        print(f"✓ {line}")
+    if failed:
+        print(f"\n✗ {len(failed)} jobs failed:")
+        for job in failed:
+            print(f"  - job {job.index} ({job.csv}): {job.error}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Compare LLM turns and wall time with and without the precomputed dataset profile.
+
+Runs the full crew twice on the same dataset with the configured LLM (see
+.env.example): once letting the agents discover the data through tool calls,
+once with the profile embedded in the task descriptions. The LLM response
+cache is bypassed so both runs pay for every call.
+
+Usage:
+    python benchmarks/bench_dataset_profile.py --csv datasets/telecom_churn.csv \
+        [--topic "Predict customer churn"]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import configure_llm
+
+from dotenv import load_dotenv
+
+from pipeline import build_analysis
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the precomputed dataset profile")
+    parser.add_argument("--csv", type=str, required=True, help="Path to the CSV dataset file")
+    parser.add_argument("--topic", type=str, default="Predict the target variable",
+                        help="Business objective for both runs")
+    args = parser.parse_args()
+
+    load_dotenv()
+    os.environ["LLM_CACHE"] = "false"
+    llm = configure_llm()
+    csv_path = os.path.abspath(args.csv)
+
+    rows = []
+    for label, profile in (("tool discovery", False), ("dataset profile", True)):
+        analysis = build_analysis(args.topic, csv_path, llm=llm, dataset_profile=profile, verbose=False)
+        analysis.kickoff()
+        rows.append((label, analysis.turns.turns, analysis.turns.tool_calls, analysis.wall_seconds))
+
+    print(f"\n{'mode':<16} {'LLM turns':>10} {'tool calls':>11} {'wall (s)':>9}")
+    for label, turns, tool_calls, seconds in rows:
+        print(f"{label:<16} {turns:>10} {tool_calls:>11} {seconds:>9.1f}")
+    (_, before_turns, _, before_s), (_, after_turns, _, after_s) = rows
+    print(f"\n{before_turns - after_turns} fewer LLM turns, {before_s - after_s:.1f}s saved")
+
+
+if __name__ == "__main__":
+    main()
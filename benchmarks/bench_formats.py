@@ -0,0 +1,141 @@
+"""
+Compare I/O, time and memory of reading a dataset from each supported format.
+
+Generates a churn-shaped dataset (see benchmarks/synthetic.py), writes it as
+CSV, gzip- and zstd-compressed CSV, Parquet and Feather, then reads each file
+through tools/dataset_io.py twice: every column, and a projection of a few
+columns. Every read runs in a fresh interpreter, so the peak resident set
+size belongs to that one read. Bytes read are the bytes passed through read
+system calls (/proc/self/io rchar, Linux only); memory-mapped Feather pages do
+not show up there but do show up in the peak RSS.
+
+Usage:
+    python benchmarks/bench_formats.py [--rows 100000] [--cols 300]
+        [--columns tenure,MonthlyCharges,Churn] [--repeats 3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_tools import peak_rss_mb
+from benchmarks.synthetic import DEFAULT_DATA_DIR, generate_dataset
+
+
+FORMATS = ["csv", "csv.gz", "csv.zst", "parquet", "feather"]
+
+DEFAULT_COLUMNS = "tenure,MonthlyCharges,Churn"
+
+
+def bytes_read() -> int:
+    """Bytes this process has passed through read system calls (0 where unsupported)."""
+    try:
+        with open("/proc/self/io", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def format_paths(csv_path: str, directory: str) -> dict:
+    """Return {format: path} for the copies of a dataset in directory."""
+    paths = {fmt: os.path.join(directory, f"dataset.{fmt}") for fmt in FORMATS}
+    paths["csv"] = csv_path
+    return paths
+
+
+def write_formats(csv_path: str, directory: str) -> None:
+    """Write the dataset in every format (run in a subprocess: peak RSS survives exec on Linux)."""
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    paths = format_paths(csv_path, directory)
+    df.to_csv(paths["csv.gz"], index=False, compression="gzip")
+    df.to_csv(paths["csv.zst"], index=False, compression="zstd")
+    df.to_parquet(paths["parquet"], index=False)
+    df.to_feather(paths["feather"])
+
+
+def run_worker(path: str, columns: str) -> None:
+    """Read one file in this process and print the measurement as JSON."""
+    from tools.dataset_io import read_table
+
+    rss_before = peak_rss_mb()
+    read_before = bytes_read()
+    start = time.perf_counter()
+    df = read_table(path, columns.split(",") if columns else None)
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        "seconds": seconds,
+        "read_mb": (bytes_read() - read_before) / 1024 ** 2,
+        "peak_rss_mb": peak_rss_mb(),
+        "import_rss_mb": rss_before,
+        "shape": list(df.shape),
+    }))
+
+
+def measure(path: str, columns: str, repeats: int) -> dict:
+    """Read a file in fresh subprocesses and keep the fastest run."""
+    runs = []
+    for _ in range(repeats):
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", path, columns],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "worker failed")
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return min(runs, key=lambda run: run["seconds"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dataset reads across file formats")
+    parser.add_argument("--rows", type=int, default=100_000, help="Number of rows (default: 100000)")
+    parser.add_argument("--cols", type=int, default=300, help="Number of columns (default: 300)")
+    parser.add_argument("--columns", type=str, default=DEFAULT_COLUMNS,
+                        help=f"Projected columns (default: {DEFAULT_COLUMNS})")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per read, fastest kept (default: 3)")
+    parser.add_argument("--data-dir", type=str, default=DEFAULT_DATA_DIR,
+                        help="Directory for generated datasets (default: benchmarks/.data)")
+    parser.add_argument("--worker", nargs=2, metavar=("PATH", "COLUMNS"), help=argparse.SUPPRESS)
+    parser.add_argument("--convert", nargs=2, metavar=("CSV", "DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+        return
+    if args.convert:
+        write_formats(*args.convert)
+        return
+
+    csv_path = generate_dataset("churn", args.rows, args.cols, 0, args.data_dir)
+    with tempfile.TemporaryDirectory(prefix="bench_formats_") as directory:
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--convert", csv_path, directory], check=True)
+        paths = format_paths(csv_path, directory)
+        results = {}
+        for fmt in FORMATS:
+            for label, columns in (("all", ""), ("projection", args.columns)):
+                results[fmt, label] = measure(paths[fmt], columns, args.repeats)
+                results[fmt, label]["size_mb"] = os.path.getsize(paths[fmt]) / 1024 ** 2
+
+    n_projected = len(args.columns.split(","))
+    print(f"\n{args.rows:,} rows x {args.cols} columns; projection = {n_projected} columns\n")
+    print(f"{'format':<9} {'columns':<11} {'file MB':>8} {'read MB':>8} {'seconds':>8} "
+          f"{'RSS MB':>7} {'vs CSV time':>12} {'vs CSV RSS':>11}")
+    for (fmt, label), run in results.items():
+        csv_run = results["csv", label]
+        rss = run["peak_rss_mb"] - run["import_rss_mb"]
+        csv_rss = csv_run["peak_rss_mb"] - csv_run["import_rss_mb"]
+        print(f"{fmt:<9} {label:<11} {run['size_mb']:>8.1f} {run['read_mb']:>8.1f} {run['seconds']:>8.2f} "
+              f"{rss:>7.0f} {run['seconds'] / csv_run['seconds']:>11.2f}x {rss / max(csv_rss, 1e-9):>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Compare job latency of the cold CLI with the long-running server.
+
+Runs the same analysis --jobs times through `python main.py` (a fresh process
+per job) and through `python server.py` (one warm process, jobs submitted one
+after another), then reports p50 and p95 latency for both. Both paths use the
+configured LLM (see .env.example) with the LLM response cache off, so the
+difference is start-up, agent assembly and dataset parsing.
+
+Usage:
+    python benchmarks/bench_server.py --csv datasets/telecom_churn.csv [--jobs 10]
+        [--topic "Predict customer churn"] [--port 8766]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import List
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def cold_cli_latencies(topic: str, csv_path: str, jobs: int, env: dict, output_dir: str) -> List[float]:
+    latencies = []
+    for i in range(jobs):
+        output = os.path.join(output_dir, f"cli_{i}.md")
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, os.path.join(ROOT, "main.py"), "--topic", topic, "--csv", csv_path, "--output", output],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"main.py failed: {proc.stderr.strip()[-500:]}")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def wait_for_server(url: str, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/health", timeout=2):
+                return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f"Server did not come up at {url}")
+
+
+def server_latencies(topic: str, csv_path: str, jobs: int, url: str, output_dir: str) -> List[float]:
+    latencies = []
+    for i in range(jobs):
+        body = json.dumps({
+            "topic": topic,
+            "csv": csv_path,
+            "output": os.path.join(output_dir, f"server_{i}.md"),
+            "stream": True,
+        }).encode("utf-8")
+        request = urllib.request.Request(f"{url}/jobs", data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+        start = time.perf_counter()
+        last = {}
+        with urllib.request.urlopen(request) as response:
+            for line in response:
+                last = json.loads(line)
+        if last.get("event") != "succeeded":
+            raise RuntimeError(f"Server job failed: {last}")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold CLI vs server job latency")
+    parser.add_argument("--csv", type=str, required=True, help="Path to the CSV dataset file")
+    parser.add_argument("--topic", type=str, default="Predict the target variable", help="Business objective")
+    parser.add_argument("--jobs", type=int, default=10, help="Jobs per path (default: 10)")
+    parser.add_argument("--port", type=int, default=8766, help="Port for the benchmark server (default: 8766)")
+    args = parser.parse_args()
+
+    csv_path = os.path.abspath(args.csv)
+    env = dict(os.environ, LLM_CACHE="false")
+    url = f"http://127.0.0.1:{args.port}"
+
+    with tempfile.TemporaryDirectory(prefix="bench_server_") as output_dir:
+        cold = cold_cli_latencies(args.topic, csv_path, args.jobs, env, output_dir)
+
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "server.py"), "--port", str(args.port), "--workers", "1"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_for_server(url)
+            warm = server_latencies(args.topic, csv_path, args.jobs, url, output_dir)
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"\n{'path':<10} {'jobs':>5} {'p50 (s)':>9} {'p95 (s)':>9}")
+    for label, latencies in (("cold CLI", cold), ("server", warm)):
+        print(f"{label:<10} {len(latencies):>5} {np.percentile(latencies, 50):>9.2f} "
+              f"{np.percentile(latencies, 95):>9.2f}")
+    saved = np.percentile(cold, 50) - np.percentile(warm, 50)
+    print(f"\n{saved:.2f}s saved per job at p50")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Measure main.py startup time and break down where import time goes.
+
+Times, in fresh interpreters, the paths that should return immediately
+(--help, a missing CSV, no LLM configured) and the import of everything a
+real run loads (crewai, agents, tools, pandas). The import breakdown comes
+from python -X importtime, summed per top-level package. No LLM is called.
+
+Results are tracked in the same baseline file as bench_tools.py; a scenario
+more than --threshold slower than its baseline is reported and the script
+exits with status 1.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeats 5] [--top 15]
+        [--baseline benchmarks/baseline.json] [--save-baseline] [--threshold 0.25]
+"""
+import argparse
+from collections import defaultdict
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_tools import DEFAULT_BASELINE, DEFAULT_THRESHOLD, compare, load_baseline, save_baseline
+
+MAIN = os.path.join(ROOT, "main.py")
+
+# Everything a real run imports before the crew starts
+RUN_IMPORTS = (
+    "import main; "
+    "from pipeline import RunTracer, build_analysis; "
+    "from agents import create_data_analyst_agent; create_data_analyst_agent; "
+    "import tools"
+)
+
+NO_LLM_ENV = {"USE_OLLAMA": "false", "USE_GEMINI": "false", "OPENAI_API_KEY": ""}
+
+
+def scenarios() -> List[Tuple[str, List[str], Dict[str, str]]]:
+    """Return (name, command, extra environment) for each timed startup path."""
+    # no_llm only needs a path that exists; the file is never read
+    return [
+        ("help", [MAIN, "--help"], {}),
+        ("missing_csv", [MAIN, "--topic", "x", "--csv", os.path.join(ROOT, "missing.csv")], {}),
+        ("no_llm", [MAIN, "--topic", "x", "--csv", MAIN], NO_LLM_ENV),
+        ("run_imports", ["-c", RUN_IMPORTS], {}),
+    ]
+
+
+def time_command(args: List[str], extra_env: Dict[str, str], repeats: int) -> float:
+    """Best wall time of running the interpreter with args, in seconds."""
+    env = dict(os.environ, **extra_env)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def import_breakdown(statement: str) -> Dict[str, float]:
+    """
+    Seconds of import time per top-level package for a statement.
+
+    Args:
+        statement: Python code to run under -X importtime
+
+    Returns:
+        Package name to self import time in seconds (children excluded, so
+        the values add up to the total)
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                          cwd=ROOT, capture_output=True, text=True)
+    totals: Dict[str, float] = defaultdict(float)
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if not fields[0].strip().isdigit():
+            continue
+        package = fields[2].strip().split(".")[0]
+        totals[package] += int(fields[0]) / 1e6
+    return dict(totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark main.py startup and import time")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per scenario, best is kept (default: 5)")
+    parser.add_argument("--top", type=int, default=15, help="Packages shown in the import breakdown (default: 15)")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE,
+                        help="Baseline results file (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run's results as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Relative slowdown flagged as a regression (default: {DEFAULT_THRESHOLD})")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline).get("results", {})
+
+    print(f"{'scenario':<14} {'wall (s)':>9} {'vs baseline':>12}  status")
+    results = {}
+    regressions = []
+    for name, command, env in scenarios():
+        key = f"startup/{name}"
+        seconds = time_command(command, env, args.repeats)
+        results[key] = {"seconds": seconds}
+        base = baseline.get(key)
+        ratio = f"{seconds / base['seconds']:.2f}x" if base else "-"
+        status = compare(results[key], base, args.threshold) if base else "new"
+        if base and status:
+            regressions.append((key, status))
+            status = f"REGRESSION ({status})"
+        print(f"{name:<14} {seconds:>9.3f} {ratio:>12}  {status or 'ok'}")
+
+    breakdown = import_breakdown(RUN_IMPORTS)
+    total = sum(breakdown.values())
+    print(f"\nImport time of a run, by top-level package ({total:.2f}s total):")
+    print(f"{'package':<24} {'self (s)':>9} {'share':>7}")
+    for package, seconds in sorted(breakdown.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{package:<24} {seconds:>9.3f} {seconds / total * 100:>6.1f}%")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline saved to {args.baseline} ({len(results)} cases)")
+    if regressions:
+        print(f"\n{len(regressions)} regressions beyond {args.threshold:.0%}:")
+        for key, status in regressions:
+            print(f"  - {key}: {status}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
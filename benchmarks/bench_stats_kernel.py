@@ -0,0 +1,88 @@
+"""
+Benchmark the vectorized statistics kernel against the legacy per-column loop.
+
+Generates synthetic tables with a churn-like mix of numeric and categorical
+columns and times both implementations at increasing widths. Duplicate-row
+detection is the same whole-frame call in both and is left out of the timing.
+
+Usage:
+    python benchmarks/bench_stats_kernel.py [--rows 100000] [--widths 10 100 1000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.stats_kernel import compute_dataset_stats
+
+
+def make_table(n_rows: int, n_cols: int, seed: int = 0) -> pd.DataFrame:
+    """Build a table that is ~80% numeric and ~20% categorical, with some NaNs."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(n_cols):
+        if i % 5 == 4:
+            data[f"cat_{i}"] = rng.choice(["Yes", "No", "Maybe", "Unknown"], n_rows)
+        else:
+            values = rng.normal(50, 15, n_rows)
+            values[rng.random(n_rows) < 0.01] = np.nan
+            data[f"num_{i}"] = values
+    return pd.DataFrame(data)
+
+
+def legacy_column_loop(df: pd.DataFrame) -> None:
+    """The per-column pandas calls made by data_stats_tool before the kernel."""
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    categorical_cols = df.select_dtypes(include=["object", "category"]).columns.tolist()
+    for col in numeric_cols:
+        df[col].mean(); df[col].median(); df[col].std(); df[col].min(); df[col].max()
+        df[col].quantile(0.25); df[col].quantile(0.75)
+        if (df[col].isnull().sum() / len(df)) * 100 > 0:
+            df[col].isnull().sum()
+        Q1 = df[col].quantile(0.25)
+        Q3 = df[col].quantile(0.75)
+        IQR = Q3 - Q1
+        ((df[col] < (Q1 - 1.5 * IQR)) | (df[col] > (Q3 + 1.5 * IQR))).sum()
+    for col in categorical_cols:
+        df[col].nunique()
+        df[col].isnull().sum()
+        df[col].value_counts().head(5)
+        df[col].nunique()
+    df.isnull().sum().sum()
+    df.isnull().sum()
+    [col for col in df.columns if df[col].nunique() == 1]
+    [col for col in df.columns if (df[col].isnull().sum() / len(df)) > 0.5]
+
+
+def best_of(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the statistics kernel")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows per table (default: 100000)")
+    parser.add_argument("--widths", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Column counts to benchmark (default: 10 100 1000)")
+    parser.add_argument("--repeats", type=int, default=3, help="Timing repeats, best is kept (default: 3)")
+    args = parser.parse_args()
+
+    print(f"{'columns':>8} {'legacy (s)':>12} {'kernel (s)':>12} {'speedup':>9}")
+    for width in args.widths:
+        df = make_table(args.rows, width)
+        legacy = best_of(lambda: legacy_column_loop(df), args.repeats)
+        kernel = best_of(lambda: compute_dataset_stats(df, check_duplicates=False), args.repeats)
+        print(f"{width:>8} {legacy:>12.3f} {kernel:>12.3f} {legacy / kernel:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Benchmark the CSV Reader, Data Statistics and Relationships tools across dataset sizes and widths.
+
+Generates churn- or titanic-shaped datasets (see benchmarks/synthetic.py) for
+every rows x columns combination and times each tool on each of them. Every
+measurement runs in a fresh interpreter, so the dataset cache starts cold and
+the peak resident set size belongs to that one tool call; the columnar sidecar
+directory is a fresh temporary one for the same reason. No LLM is involved.
+
+Results can be saved as a baseline; later runs compare against it and exit
+with status 1 when a tool got slower or bigger than the threshold allows.
+
+Usage:
+    python benchmarks/bench_tools.py [--preset quick|standard|full] [--schema churn]
+        [--rows 1000 100000] [--cols 10 100] [--repeats 3]
+        [--baseline benchmarks/baseline.json] [--save-baseline] [--threshold 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import DEFAULT_DATA_DIR, SCHEMAS, generate_dataset
+
+
+# rows x columns grids; combinations above --max-cells are skipped
+PRESETS = {
+    "quick": ([10 ** 3, 10 ** 4, 10 ** 5], [10, 100]),
+    "standard": ([10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6], [10, 100, 500]),
+    "full": ([10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7, 10 ** 8], [10, 100, 500, 2000]),
+}
+
+TOOLS = ["csv_reader", "data_stats", "relationships"]
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Default relative slowdown (or memory growth) reported as a regression
+DEFAULT_THRESHOLD = 0.25
+
+# Absolute differences below these are noise, whatever the ratio
+MIN_SECONDS_DELTA = 0.05
+MIN_RSS_DELTA_MB = 16.0
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in megabytes."""
+    try:
+        import resource
+    except ImportError:
+        # Windows: psutil reports the peak working set
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 ** 2
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def run_worker(tool: str, csv_path: str) -> None:
+    """Time one tool call in this process and print the measurement as JSON."""
+    from tools.csv_reader_tool import csv_reader_tool
+    from tools.data_stats_tool import data_stats_tool
+    from tools.relationships_tool import relationships_tool
+
+    tools = {"csv_reader": csv_reader_tool, "data_stats": data_stats_tool, "relationships": relationships_tool}
+    fn = tools[tool].func
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    output = fn(csv_path=csv_path)
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        "seconds": seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "import_rss_mb": rss_before,
+        "output_chars": len(output),
+        "error": output if output.startswith("Error") else None,
+    }))
+
+
+def measure(tool: str, csv_path: str, repeats: int) -> dict:
+    """
+    Run a tool on a dataset in fresh subprocesses and keep the best timing.
+
+    Args:
+        tool: "csv_reader", "data_stats" or "relationships"
+        csv_path: Dataset path
+        repeats: Number of runs
+
+    Returns:
+        Measurement with seconds, peak_rss_mb, import_rss_mb, output_chars
+        and error
+    """
+    runs = []
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory(prefix="bench_sidecar_") as sidecar_dir:
+            env = dict(os.environ, DATASET_SIDECAR_DIR=sidecar_dir)
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", tool, csv_path],
+                capture_output=True, text=True, env=env
+            )
+        if proc.returncode != 0:
+            return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "worker failed"}
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return min(runs, key=lambda run: run["seconds"])
+
+
+def case_key(schema: str, rows: int, cols: int, tool: str) -> str:
+    return f"{schema}/{rows}r/{cols}c/{tool}"
+
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, results: dict) -> None:
+    """Merge results into the baseline file, keeping cases not re-run."""
+    baseline = load_baseline(path)
+    baseline.setdefault("results", {}).update(results)
+    baseline["machine"] = machine_info()
+    baseline["saved_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def machine_info() -> dict:
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(result: dict, base: dict, threshold: float) -> str:
+    """Return "" when within the threshold, else a description of the regression."""
+    problems = []
+    seconds, base_seconds = result["seconds"], base.get("seconds")
+    if base_seconds and seconds > base_seconds * (1 + threshold) and seconds - base_seconds > MIN_SECONDS_DELTA:
+        problems.append(f"time {seconds / base_seconds:.2f}x")
+    rss, base_rss = result.get("peak_rss_mb"), base.get("peak_rss_mb")
+    if rss and base_rss and rss > base_rss * (1 + threshold) and rss - base_rss > MIN_RSS_DELTA_MB:
+        problems.append(f"RSS {rss / base_rss:.2f}x")
+    return ", ".join(problems)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data tools across dataset sizes and widths")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="standard",
+                        help="Rows x columns grid (default: standard)")
+    parser.add_argument("--rows", type=int, nargs="+", default=None, help="Row counts (overrides the preset)")
+    parser.add_argument("--cols", type=int, nargs="+", default=None, help="Column counts (overrides the preset)")
+    parser.add_argument("--schema", choices=sorted(SCHEMAS), default="churn", help="Base schema (default: churn)")
+    parser.add_argument("--tools", choices=TOOLS, nargs="+", default=TOOLS, help="Tools to benchmark (default: all)")
+    parser.add_argument("--max-cells", type=float, default=1e9,
+                        help="Skip datasets with more rows x columns than this (default: 1e9)")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per case, best is kept (default: 3)")
+    parser.add_argument("--data-dir", type=str, default=DEFAULT_DATA_DIR,
+                        help="Directory for generated datasets (default: benchmarks/.data)")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE,
+                        help="Baseline results file (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run's results as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Relative slowdown or memory growth flagged as a regression (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--worker", nargs=2, metavar=("TOOL", "CSV"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+        return
+
+    preset_rows, preset_cols = PRESETS[args.preset]
+    grid = [(rows, cols) for rows in args.rows or preset_rows for cols in args.cols or preset_cols]
+    stored = load_baseline(args.baseline)
+    baseline = stored.get("results", {})
+    if stored.get("machine") and stored["machine"] != machine_info():
+        print(f"Note: baseline recorded on a different machine ({stored['machine']['platform']})\n")
+
+    print(f"{'rows':>11} {'cols':>5} {'tool':<11} {'MB':>9} {'wall (s)':>9} {'peak RSS (MB)':>14} "
+          f"{'vs baseline':>12}  status")
+    results = {}
+    regressions = []
+    for rows, cols in grid:
+        if rows * cols > args.max_cells:
+            print(f"{rows:>11} {cols:>5} {'-':<11} {'':>9} {'':>9} {'':>14} {'':>12}  skipped (> --max-cells)")
+            continue
+        csv_path = generate_dataset(args.schema, rows, cols, data_dir=args.data_dir)
+        size_mb = os.path.getsize(csv_path) / 1024 ** 2
+        for tool in args.tools:
+            key = case_key(args.schema, rows, cols, tool)
+            result = measure(tool, csv_path, args.repeats)
+            if result.get("error"):
+                print(f"{rows:>11} {cols:>5} {tool:<11} {size_mb:>9.1f} {'':>9} {'':>14} {'':>12}  "
+                      f"error: {result['error'][:60]}")
+                continue
+            results[key] = {k: result[k] for k in ("seconds", "peak_rss_mb", "import_rss_mb")}
+
+            base = baseline.get(key)
+            ratio = f"{result['seconds'] / base['seconds']:.2f}x" if base else "-"
+            status = compare(result, base, args.threshold) if base else "new"
+            if base and status:
+                regressions.append((key, status))
+                status = f"REGRESSION ({status})"
+            print(f"{rows:>11} {cols:>5} {tool:<11} {size_mb:>9.1f} {result['seconds']:>9.3f} "
+                  f"{result['peak_rss_mb']:>14.1f} {ratio:>12}  {status or 'ok'}")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline saved to {args.baseline} ({len(results)} cases)")
+    if regressions:
+        print(f"\n{len(regressions)} regressions beyond {args.threshold:.0%}:")
+        for key, status in regressions:
+            print(f"  - {key}: {status}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Parameterized synthetic datasets for the benchmarks.
+
+The schemas follow datasets/generate_churn.py and datasets/generate_titanic.py
+(same columns, categories, probabilities and missing-value rates) but scale
+to any number of rows and columns: wider tables repeat the schema's columns
+with a numeric suffix, narrower ones keep its first columns. Files are
+written in chunks, so 10^8-row datasets never have to fit in memory, and are
+kept in a data directory keyed by their parameters for reuse across runs.
+
+Usage:
+    python benchmarks/synthetic.py --schema churn --rows 1000000 --cols 100
+"""
+import argparse
+import os
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+
+# Rows generated and written per chunk
+CHUNK_ROWS = 500_000
+
+# Where generated datasets are kept between runs
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data")
+
+ColumnFn = Callable[[np.random.Generator, int], np.ndarray]
+
+
+def _choice(values, p=None) -> ColumnFn:
+    values = np.array(values, dtype=object)
+    return lambda rng, n: rng.choice(values, n, p=p)
+
+
+def _with_missing(fn: ColumnFn, rate: float) -> ColumnFn:
+    def column(rng, n):
+        values = fn(rng, n)
+        if values.dtype != object:
+            values = values.astype(float)
+        values[rng.random(n) < rate] = np.nan
+        return values
+    return column
+
+
+SERVICE = ["Yes", "No", "No internet service"]
+
+CHURN_COLUMNS: List[Tuple[str, ColumnFn]] = [
+    ("gender", _choice(["Male", "Female"])),
+    ("SeniorCitizen", lambda rng, n: rng.choice([0, 1], n, p=[0.84, 0.16])),
+    ("Partner", _choice(["Yes", "No"], p=[0.52, 0.48])),
+    ("Dependents", _choice(["Yes", "No"], p=[0.30, 0.70])),
+    ("tenure", lambda rng, n: rng.integers(0, 73, n)),
+    ("PhoneService", _choice(["Yes", "No"], p=[0.90, 0.10])),
+    ("MultipleLines", _choice(["Yes", "No", "No phone service"], p=[0.42, 0.48, 0.10])),
+    ("InternetService", _choice(["DSL", "Fiber optic", "No"], p=[0.34, 0.44, 0.22])),
+    ("OnlineSecurity", _choice(SERVICE, p=[0.28, 0.50, 0.22])),
+    ("OnlineBackup", _choice(SERVICE, p=[0.34, 0.44, 0.22])),
+    ("DeviceProtection", _choice(SERVICE, p=[0.34, 0.44, 0.22])),
+    ("TechSupport", _choice(SERVICE, p=[0.29, 0.49, 0.22])),
+    ("StreamingTV", _choice(SERVICE, p=[0.38, 0.40, 0.22])),
+    ("StreamingMovies", _choice(SERVICE, p=[0.39, 0.39, 0.22])),
+    ("Contract", _choice(["Month-to-month", "One year", "Two year"], p=[0.55, 0.21, 0.24])),
+    ("PaperlessBilling", _choice(["Yes", "No"], p=[0.59, 0.41])),
+    ("PaymentMethod", _choice(
+        ["Electronic check", "Mailed check", "Bank transfer (automatic)", "Credit card (automatic)"],
+        p=[0.33, 0.23, 0.22, 0.22]
+    )),
+    ("MonthlyCharges", lambda rng, n: rng.uniform(18.25, 118.75, n).round(2)),
+    ("TotalCharges", _with_missing(lambda rng, n: rng.uniform(18.8, 8684.8, n).round(2), 11 / 7043)),
+    ("Churn", _choice(["Yes", "No"], p=[0.27, 0.73])),
+]
+
+TITANIC_COLUMNS: List[Tuple[str, ColumnFn]] = [
+    ("Survived", lambda rng, n: rng.choice([0, 1], n, p=[0.62, 0.38])),
+    ("Pclass", lambda rng, n: rng.choice([1, 2, 3], n, p=[0.24, 0.21, 0.55])),
+    ("Sex", _choice(["male", "female"], p=[0.65, 0.35])),
+    ("Age", _with_missing(lambda rng, n: rng.normal(29.7, 14.5, n).clip(0.42, 80).round(1), 177 / 891)),
+    ("SibSp", lambda rng, n: rng.choice([0, 1, 2, 3, 4, 5, 8], n,
+                                        p=[0.68, 0.23, 0.05, 0.02, 0.01, 0.005, 0.005])),
+    ("Parch", lambda rng, n: rng.choice([0, 1, 2, 3, 4, 5, 6], n,
+                                        p=[0.76, 0.13, 0.08, 0.01, 0.01, 0.005, 0.005])),
+    ("Fare", lambda rng, n: rng.gamma(2, 15, n).clip(0, 512).round(2)),
+    ("Embarked", _with_missing(_choice(["C", "Q", "S"], p=[0.19, 0.09, 0.72]), 2 / 891)),
+]
+
+# Schema name -> (ID column name, ID formatter, other columns)
+SCHEMAS: Dict[str, Tuple[str, Callable[[np.ndarray], np.ndarray], List[Tuple[str, ColumnFn]]]] = {
+    "churn": ("customerID", lambda ids: np.char.add("CUST-", np.char.zfill(ids.astype(str), 5)), CHURN_COLUMNS),
+    "titanic": ("PassengerId", lambda ids: ids, TITANIC_COLUMNS),
+}
+
+
+def _columns(schema: str, n_cols: int) -> List[Tuple[str, ColumnFn]]:
+    """Repeat or truncate the schema's columns (after the ID) to n_cols - 1."""
+    _, _, base = SCHEMAS[schema]
+    columns = []
+    for i in range(max(n_cols - 1, 0)):
+        name, fn = base[i % len(base)]
+        repeat = i // len(base)
+        columns.append((f"{name}_{repeat}" if repeat else name, fn))
+    return columns
+
+
+def generate_chunk(schema: str, start: int, n_rows: int, n_cols: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Generate rows [start, start + n_rows) of a synthetic dataset.
+
+    Each chunk has its own random stream derived from the seed and its
+    position, so a file is the same however it is chunked.
+
+    Args:
+        schema: "churn" or "titanic"
+        start: Index of the first row
+        n_rows: Number of rows
+        n_cols: Total number of columns, including the ID column
+        seed: Random seed
+
+    Returns:
+        DataFrame chunk
+    """
+    id_name, format_ids, _ = SCHEMAS[schema]
+    rng = np.random.default_rng([seed, start])
+    data = {id_name: format_ids(np.arange(start + 1, start + n_rows + 1))}
+    for name, fn in _columns(schema, n_cols):
+        data[name] = fn(rng, n_rows)
+    return pd.DataFrame(data)
+
+
+def dataset_path(schema: str, n_rows: int, n_cols: int, seed: int = 0,
+                 data_dir: str = DEFAULT_DATA_DIR) -> str:
+    """Return where the dataset with these parameters is kept."""
+    return os.path.join(data_dir, f"{schema}_{n_rows}r_{n_cols}c_s{seed}.csv")
+
+
+def generate_dataset(schema: str, n_rows: int, n_cols: int, seed: int = 0,
+                     data_dir: str = DEFAULT_DATA_DIR) -> str:
+    """
+    Write a synthetic CSV dataset, reusing an earlier one with the same parameters.
+
+    Args:
+        schema: "churn" or "titanic"
+        n_rows: Number of rows
+        n_cols: Total number of columns, including the ID column
+        seed: Random seed
+        data_dir: Directory for generated datasets
+
+    Returns:
+        Path to the CSV file
+
+    Raises:
+        ValueError: If the schema is unknown
+    """
+    if schema not in SCHEMAS:
+        raise ValueError(f"Unknown schema '{schema}' (choose from {', '.join(SCHEMAS)})")
+    path = dataset_path(schema, n_rows, n_cols, seed, data_dir)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(data_dir, exist_ok=True)
+    partial = path + ".partial"
+    # pyarrow writes CSV several times faster than DataFrame.to_csv; no schema
+    # value contains a delimiter or quote, so nothing is quoted, as with to_csv
+    options = pa_csv.WriteOptions(include_header=False, quoting_style="none")
+    with open(partial, "wb") as f:
+        writer = None
+        for start in range(0, n_rows, CHUNK_ROWS):
+            chunk = generate_chunk(schema, start, min(CHUNK_ROWS, n_rows - start), n_cols, seed)
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                f.write((",".join(chunk.columns) + "\n").encode("utf-8"))
+                writer = pa_csv.CSVWriter(f, table.schema, write_options=options)
+            writer.write_table(table)
+        if writer is not None:
+            writer.close()
+    # Only complete files are picked up by later runs
+    os.replace(partial, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark dataset")
+    parser.add_argument("--schema", choices=sorted(SCHEMAS), default="churn", help="Base schema (default: churn)")
+    parser.add_argument("--rows", type=int, default=7043, help="Number of rows (default: 7043)")
+    parser.add_argument("--cols", type=int, default=21, help="Number of columns (default: 21)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--data-dir", type=str, default=DEFAULT_DATA_DIR,
+                        help="Directory for generated datasets (default: benchmarks/.data)")
+    args = parser.parse_args()
+
+    path = generate_dataset(args.schema, args.rows, args.cols, args.seed, args.data_dir)
+    print(f"{path} ({os.path.getsize(path) / 1024 ** 2:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""LLM helpers initialization.
+
+Loaded on first use: the response cache, the provider gateway and the
+per-agent model router wrap crewai's BaseLLM.
+"""
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from llm.gateway import GatewayLLM, create_provider_llm, gateway_llm, gateway_summary
+    from llm.response_cache import CachedLLM, LLMResponseCache, llm_cache, llm_cache_enabled
+    from llm.routing import RoutedLLM, describe_routes, route_llm, routing_metrics, routing_summary
+    from llm.wrapper import LLMWrapper
+
+# Public name -> defining module, imported on first access
+_EXPORTS = {
+    'GatewayLLM': 'llm.gateway',
+    'create_provider_llm': 'llm.gateway',
+    'gateway_llm': 'llm.gateway',
+    'gateway_summary': 'llm.gateway',
+    'CachedLLM': 'llm.response_cache',
+    'LLMResponseCache': 'llm.response_cache',
+    'llm_cache': 'llm.response_cache',
+    'llm_cache_enabled': 'llm.response_cache',
+    'RoutedLLM': 'llm.routing',
+    'describe_routes': 'llm.routing',
+    'route_llm': 'llm.routing',
+    'routing_metrics': 'llm.routing',
+    'routing_summary': 'llm.routing',
+    'LLMWrapper': 'llm.wrapper'
+}
+
+__all__ = [
+    'GatewayLLM',
+    'create_provider_llm',
+    'gateway_llm',
+    'gateway_summary',
+    'CachedLLM',
+    'LLMResponseCache',
+    'llm_cache',
+    'llm_cache_enabled',
+    'RoutedLLM',
+    'describe_routes',
+    'route_llm',
+    'routing_metrics',
+    'routing_summary',
+    'LLMWrapper'
+]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
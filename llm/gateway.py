@@ -0,0 +1,443 @@
+"""Provider gateway shared by every LLM call of the process.
+
+Each backend (a provider at one base URL) gets:
+
+- a keep-alive HTTP connection pool, shared by every LLM client built for it
+  (LLM_POOL_CONNECTIONS, LLM_KEEPALIVE_SECONDS);
+- a concurrency semaphore bounding its in-flight requests
+  (LLM_MAX_CONCURRENCY) and token buckets bounding its prompt + completion
+  tokens and its requests per minute (LLM_TOKENS_PER_MINUTE,
+  LLM_REQUESTS_PER_MINUTE; 0 = unlimited);
+- retries of 429 and 5xx responses, connection errors and timeouts with
+  jittered exponential backoff, honouring Retry-After (LLM_MAX_RETRIES,
+  LLM_BACKOFF_BASE, LLM_BACKOFF_MAX).
+
+OpenAI, Ollama and Gemini are all reached through their OpenAI-compatible
+chat completions endpoints with crewai's native OpenAI client, so one pooled
+client and one retry policy cover every provider. The client's own retries
+are disabled; the gateway's retry loop runs outside the semaphore, so a
+backing-off call does not hold a slot.
+"""
+import asyncio
+from contextlib import contextmanager
+import copy
+import os
+import random
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+from crewai.llms.base_llm import BaseLLM
+
+from llm.wrapper import LLMWrapper
+from tools.compact_output import count_tokens
+
+
+# Concurrency, rate and pool limits per backend (overridable via
+# LLM_MAX_CONCURRENCY, LLM_TOKENS_PER_MINUTE, LLM_REQUESTS_PER_MINUTE,
+# LLM_POOL_CONNECTIONS and LLM_KEEPALIVE_SECONDS)
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_TOKENS_PER_MINUTE = 0
+DEFAULT_REQUESTS_PER_MINUTE = 0
+DEFAULT_POOL_CONNECTIONS = 8
+DEFAULT_KEEPALIVE_SECONDS = 60.0
+
+# Retry policy (overridable via LLM_MAX_RETRIES, LLM_BACKOFF_BASE and LLM_BACKOFF_MAX)
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 60.0
+
+# Request timeout in seconds (overridable via LLM_TIMEOUT)
+DEFAULT_TIMEOUT = 600.0
+
+PROVIDERS = ("openai", "ollama", "gemini")
+
+# OpenAI-compatible endpoints of the providers (overridable via OPENAI_BASE_URL,
+# OLLAMA_BASE_URL and GEMINI_BASE_URL)
+OLLAMA_BASE_URL = "http://localhost:11434"
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+DEFAULT_MODELS = {"openai": "gpt-4.1-mini", "ollama": "llama2", "gemini": "gemini-2.0-flash"}
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def configured_provider() -> str:
+    """
+    Return the provider from LLM_PROVIDER, or from USE_OLLAMA / USE_GEMINI.
+
+    Raises:
+        ValueError: If LLM_PROVIDER names an unknown provider
+    """
+    provider = os.getenv("LLM_PROVIDER", "").strip().lower()
+    if not provider:
+        if os.getenv("USE_OLLAMA", "false").lower() == "true":
+            provider = "ollama"
+        elif os.getenv("USE_GEMINI", "false").lower() == "true":
+            provider = "gemini"
+        else:
+            provider = "openai"
+    if provider not in PROVIDERS:
+        raise ValueError(f"Invalid LLM_PROVIDER '{provider}' (expected one of: {', '.join(PROVIDERS)})")
+    return provider
+
+
+class RateLimiter:
+    """Token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: float):
+        """
+        Args:
+            per_minute: Units (tokens or requests) allowed per minute; the
+                bucket holds at most one minute's worth
+        """
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, units: float) -> float:
+        """
+        Take units from the bucket, waiting until they are available.
+
+        Requests larger than the bucket wait for a full bucket and leave it
+        in debt, which later requests wait out.
+
+        Returns:
+            Seconds waited
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                needed = min(units, self.capacity)
+                if self.level >= needed:
+                    self.level -= units
+                    return waited
+                delay = (needed - self.level) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def charge(self, units: float) -> None:
+        """Take units used after the fact (e.g. completion tokens), possibly into debt."""
+        with self._lock:
+            self._refill()
+            self.level -= units
+
+
+class Backend:
+    """Connection pool, concurrency limit, rate limits and counters of one backend."""
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Backend key, "<provider>@<base URL>"
+        """
+        self.name = name
+        self.max_concurrency = max(int(_env_float("LLM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)), 1)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        tokens_per_minute = _env_float("LLM_TOKENS_PER_MINUTE", DEFAULT_TOKENS_PER_MINUTE)
+        requests_per_minute = _env_float("LLM_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE)
+        self.tokens = RateLimiter(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.requests = RateLimiter(requests_per_minute) if requests_per_minute > 0 else None
+        self._client: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.waited = 0.0
+        self.backoff = 0.0
+
+    @property
+    def http_client(self) -> httpx.Client:
+        """Keep-alive connection pool shared by every client of this backend."""
+        with self._lock:
+            if self._client is None:
+                connections = max(int(_env_float("LLM_POOL_CONNECTIONS", DEFAULT_POOL_CONNECTIONS)), 1)
+                self._client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=connections,
+                        max_keepalive_connections=connections,
+                        keepalive_expiry=_env_float("LLM_KEEPALIVE_SECONDS", DEFAULT_KEEPALIVE_SECONDS),
+                    ),
+                    timeout=httpx.Timeout(_env_float("LLM_TIMEOUT", DEFAULT_TIMEOUT), connect=10.0),
+                    follow_redirects=True,
+                )
+            return self._client
+
+    @contextmanager
+    def slot(self, prompt_tokens: int) -> Iterator[None]:
+        """Wait for the rate limits and a free concurrency slot, and hold the slot."""
+        start = time.monotonic()
+        if self.requests:
+            self.requests.acquire(1)
+        if self.tokens:
+            self.tokens.acquire(prompt_tokens)
+        self._slots.acquire()
+        with self._lock:
+            self.waited += time.monotonic() - start
+            self.attempts += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def summary(self) -> str:
+        """Return a one-line summary of this backend's traffic."""
+        return (
+            f"{self.name}: {self.calls} calls, {self.retries} retries ({self.backoff:.1f}s backoff), "
+            f"{self.failures} failed, peak {self.peak_in_flight}/{self.max_concurrency} in flight, "
+            f"{self.waited:.1f}s waiting for slots and rate limits"
+        )
+
+
+_backends: Dict[str, Backend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name: str) -> Backend:
+    """Return the process-wide state of a backend, creating it on first use."""
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = Backend(name)
+        return _backends[name]
+
+
+def backend_name(llm: BaseLLM) -> str:
+    """Return the backend key of a provider LLM: its provider and base URL."""
+    base_url = getattr(llm, "base_url", None) or getattr(llm, "api_base", None) or "default"
+    return f"{getattr(llm, 'provider', None) or 'llm'}@{str(base_url).rstrip('/')}"
+
+
+def _error_chain(error: BaseException) -> List[BaseException]:
+    chain = []
+    while error is not None and error not in chain:
+        chain.append(error)
+        error = error.__cause__ or error.__context__
+    return chain
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    """Return the HTTP status behind an error (or its causes), if any."""
+    for e in _error_chain(error):
+        status = getattr(e, "status_code", None)
+        if status is None:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Return the Retry-After delay in seconds sent with an error response, if any."""
+    for e in _error_chain(error):
+        headers = getattr(getattr(e, "response", None), "headers", None)
+        value = headers.get("retry-after") if headers is not None else None
+        if value:
+            try:
+                return max(float(value), 0.0)
+            except ValueError:
+                return None
+    return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Return True for 429 and 5xx responses, connection errors and timeouts."""
+    status = status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return any(isinstance(e, (httpx.TransportError, ConnectionError, TimeoutError)) or
+               type(e).__name__ in ("APIConnectionError", "APITimeoutError")
+               for e in _error_chain(error))
+
+
+def is_timeout(error: BaseException) -> bool:
+    """Return True if an error (or one of its causes) is a request timeout."""
+    return any(isinstance(e, (httpx.TimeoutException, TimeoutError)) or type(e).__name__ == "APITimeoutError"
+               for e in _error_chain(error))
+
+
+def backoff_delay(attempt: int, error: BaseException = None, base: float = None,
+                  cap: float = None) -> float:
+    """
+    Return the wait before retry number `attempt` (0-based).
+
+    Exponential backoff with equal jitter: a uniform draw between half and
+    all of min(cap, base * 2**attempt). A Retry-After header raises the
+    wait to at least its value.
+    """
+    base = _env_float("LLM_BACKOFF_BASE", DEFAULT_BACKOFF_BASE) if base is None else base
+    cap = _env_float("LLM_BACKOFF_MAX", DEFAULT_BACKOFF_MAX) if cap is None else cap
+    ceiling = min(cap, base * 2 ** attempt)
+    delay = random.uniform(ceiling / 2, ceiling)
+    hinted = retry_after(error) if error is not None else None
+    if hinted is not None:
+        delay = max(delay, min(hinted, cap))
+    return delay
+
+
+def _message_text(messages) -> str:
+    if isinstance(messages, str):
+        return messages
+    return "\n".join(str(m.get("content", "")) if isinstance(m, dict) else str(m) for m in messages or [])
+
+
+class GatewayLLM(LLMWrapper):
+    """
+    LLM wrapper routing calls through its backend's limits and retry policy.
+
+    Usage:
+        llm = gateway_llm()                 # configured provider
+        llm = gateway_llm(LLM(model=...))   # any crewai LLM
+    """
+
+    def __init__(self, llm: BaseLLM, backend: Backend = None, max_retries: int = None,
+                 retry_timeouts: bool = True):
+        """
+        Args:
+            llm: The provider LLM to wrap
+            backend: Backend state (defaults to the one for the LLM's provider and base URL)
+            max_retries: Retries per call (defaults to LLM_MAX_RETRIES)
+            retry_timeouts: Retry timed-out requests; disable when a timeout
+                is a latency budget that a caller handles (model routing)
+        """
+        super().__init__(llm)
+        self.backend = backend or get_backend(backend_name(llm))
+        self.max_retries = (int(_env_float("LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+                            if max_retries is None else max_retries)
+        self.retry_timeouts = retry_timeouts
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        """Call the wrapped LLM within the backend's limits, retrying transient failures."""
+        prompt_tokens = count_tokens(_message_text(messages))
+        with self.backend._lock:
+            self.backend.calls += 1
+        attempt = 0
+        while True:
+            with self.backend.slot(prompt_tokens):
+                try:
+                    response = self._llm.call(
+                        messages, tools=tools, callbacks=callbacks,
+                        available_functions=available_functions, from_task=from_task,
+                        from_agent=from_agent, response_model=response_model,
+                    )
+                    break
+                except Exception as e:
+                    if (attempt >= self.max_retries or not is_retryable(e)
+                            or (not self.retry_timeouts and is_timeout(e))):
+                        with self.backend._lock:
+                            self.backend.failures += 1
+                        raise
+                    delay = backoff_delay(attempt, e)
+            # Back off without holding a slot
+            with self.backend._lock:
+                self.backend.retries += 1
+                self.backend.backoff += delay
+            time.sleep(delay)
+            attempt += 1
+        if self.backend.tokens:
+            self.backend.tokens.charge(count_tokens(response if isinstance(response, str) else str(response)))
+        return response
+
+    async def acall(self, messages, tools=None, callbacks=None, available_functions=None,
+                    from_task=None, from_agent=None, response_model=None):
+        """Async variant of call(), run in a worker thread."""
+        return await asyncio.to_thread(
+            self.call, messages, tools=tools, callbacks=callbacks,
+            available_functions=available_functions, from_task=from_task,
+            from_agent=from_agent, response_model=response_model,
+        )
+
+
+def create_provider_llm(provider: str = None, model: str = None, timeout: float = None) -> BaseLLM:
+    """
+    Build the LLM client of a provider on its OpenAI-compatible endpoint.
+
+    The client uses the backend's pooled HTTP connections and leaves
+    retries to the gateway.
+
+    Args:
+        provider: "openai", "ollama" or "gemini" (None uses configured_provider)
+        model: Model name (None uses OPENAI_MODEL_NAME, OLLAMA_MODEL or GEMINI_MODEL)
+        timeout: Request timeout in seconds (None uses LLM_TIMEOUT)
+
+    Returns:
+        crewai OpenAICompletion LLM (not yet wrapped in GatewayLLM)
+    """
+    from crewai.llms.providers.openai.completion import OpenAICompletion
+
+    provider = provider or configured_provider()
+    if provider == "ollama":
+        model = model or os.getenv("OLLAMA_MODEL", DEFAULT_MODELS["ollama"])
+        base_url = os.getenv("OLLAMA_BASE_URL", OLLAMA_BASE_URL).rstrip("/") + "/v1"
+        api_key = "ollama"
+    elif provider == "gemini":
+        model = model or os.getenv("GEMINI_MODEL", DEFAULT_MODELS["gemini"])
+        base_url = os.getenv("GEMINI_BASE_URL", GEMINI_BASE_URL)
+        api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+    else:
+        model = model or os.getenv("MODEL") or os.getenv("OPENAI_MODEL_NAME", DEFAULT_MODELS["openai"])
+        base_url = os.getenv("OPENAI_BASE_URL") or os.getenv("OPENAI_API_BASE")
+        api_key = os.getenv("OPENAI_API_KEY")
+    # LiteLLM-style prefixes ("ollama/llama2", "gemini/...") name the provider, not the model
+    if model.startswith(f"{provider}/"):
+        model = model[len(provider) + 1:]
+
+    llm = OpenAICompletion(model=model, api_key=api_key, base_url=base_url,
+                           timeout=_env_float("LLM_TIMEOUT", DEFAULT_TIMEOUT) if timeout is None else timeout,
+                           max_retries=0)
+    backend = get_backend(backend_name(llm))
+    llm.client = llm.client.copy(http_client=backend.http_client, max_retries=0)
+    return llm
+
+
+def gateway_llm(llm=None):
+    """
+    Route an LLM through the gateway.
+
+    Args:
+        llm: None for the configured provider, a model name, or any crewai
+            LLM; LLMs already routed (also inside a CachedLLM) are returned
+            unchanged
+
+    Returns:
+        GatewayLLM, or a wrapper around one
+    """
+    if llm is None:
+        return GatewayLLM(create_provider_llm())
+    if isinstance(llm, GatewayLLM):
+        return llm
+    if isinstance(llm, LLMWrapper):
+        inner = gateway_llm(llm._llm)
+        if inner is llm._llm:
+            return llm
+        routed = copy.copy(llm)
+        routed._llm = inner
+        return routed
+    if isinstance(llm, str):
+        from crewai.utilities.llm_utils import create_llm
+        llm = create_llm(llm)
+    return GatewayLLM(llm)
+
+
+def gateway_summary() -> List[str]:
+    """Return one summary line per backend used in this process."""
+    with _backends_lock:
+        backends = list(_backends.values())
+    return [f"LLM gateway {backend.summary()}" for backend in backends if backend.calls]
@@ -0,0 +1,311 @@
+"""Content-addressed on-disk cache for LLM responses.
+
+Re-running the crew with the same topic and dataset repeats every LLM call the
+agents make. CachedLLM wraps the configured LLM and answers a call from disk
+when the model, the full message list, the sampling parameters and the dataset
+content hash all match an earlier call. Entries expire after a TTL and the
+least recently used ones are evicted once the cache exceeds its size budget.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any
+
+from crewai.llms.base_llm import BaseLLM
+
+from llm.wrapper import LLMWrapper
+
+
+# Cache directory, size budget and entry lifetime (overridable via
+# LLM_CACHE_DIR, LLM_CACHE_MAX_MB and LLM_CACHE_TTL_HOURS)
+DEFAULT_CACHE_DIR = ".llm_cache"
+DEFAULT_MAX_SIZE_MB = 512
+DEFAULT_TTL_HOURS = 24 * 7
+
+# Bump when the key layout changes so old entries are not reused
+CACHE_FORMAT_VERSION = 1
+
+# Eviction frees space down to this share of the budget, so a full cache is
+# not rescanned on every put
+EVICT_TO_RATIO = 0.9
+
+# LLM attributes that change the response and therefore belong in the key
+SAMPLING_PARAMS = (
+    "temperature", "top_p", "max_tokens", "max_completion_tokens", "seed", "n",
+    "presence_penalty", "frequency_penalty", "logit_bias", "response_format",
+    "reasoning_effort", "stop",
+)
+
+
+def llm_cache_enabled() -> bool:
+    """Return True if the response cache is switched on via LLM_CACHE=true."""
+    return os.getenv("LLM_CACHE", "false").lower() == "true"
+
+
+class LLMResponseCache:
+    """
+    Directory of cached responses, one JSON file per content-addressed key.
+
+    Counts hits, misses, expired entries and evictions for the whole process.
+    """
+
+    def __init__(self, directory: str = None, max_size_bytes: int = None, ttl_seconds: float = None):
+        """
+        Args:
+            directory: Cache directory (defaults to LLM_CACHE_DIR)
+            max_size_bytes: Size budget for all entries. Defaults to
+                LLM_CACHE_MAX_MB (in megabytes) or DEFAULT_MAX_SIZE_MB.
+            ttl_seconds: Entry lifetime. Defaults to LLM_CACHE_TTL_HOURS
+                (in hours) or DEFAULT_TTL_HOURS.
+        """
+        self.directory = directory or os.getenv("LLM_CACHE_DIR", DEFAULT_CACHE_DIR)
+        if max_size_bytes is None:
+            max_mb = float(os.getenv("LLM_CACHE_MAX_MB", DEFAULT_MAX_SIZE_MB))
+            max_size_bytes = int(max_mb * 1024 * 1024)
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("LLM_CACHE_TTL_HOURS", DEFAULT_TTL_HOURS)) * 3600
+        self.max_size_bytes = max_size_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        # Running size of the entries, scanned from disk on the first put
+        self._size_bytes = None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, messages: Any, params: dict, tools: Any = None, namespace: str = "") -> str:
+        """
+        Build the content-addressed key for one call.
+
+        Args:
+            model: Model identifier
+            messages: Prompt string or list of message dictionaries
+            params: Sampling parameters
+            tools: Tool schemas offered to the model, if any
+            namespace: Extra scope, e.g. the dataset content hash
+
+        Returns:
+            Hex BLAKE2b digest of the canonical JSON encoding of the inputs
+        """
+        material = json.dumps(
+            {
+                "v": CACHE_FORMAT_VERSION,
+                "model": model,
+                "messages": messages,
+                "params": params,
+                "tools": tools,
+                "namespace": namespace,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(material.encode("utf-8"), digest_size=20).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str):
+        """Return the cached response for key, or None on a miss or expired entry."""
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if time.time() - entry.get("created", 0) > self.ttl_seconds:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                size = 0
+            with self._lock:
+                if self._size_bytes is not None:
+                    self._size_bytes -= size
+                self.expired += 1
+                self.misses += 1
+            return None
+
+        # Touch the entry so size-based eviction drops least recently used first
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return entry["response"]
+
+    def put(self, key: str, response: str, model: str = "") -> None:
+        """Store a response and evict entries once the cache exceeds its size budget."""
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"created": time.time(), "model": model, "response": response}, f)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._size_bytes is None:
+                self._size_bytes = sum(entry_size for _, entry_size, _ in self._scan())
+            else:
+                self._size_bytes += size - replaced
+            over_budget = self._size_bytes > self.max_size_bytes
+        if over_budget:
+            self._evict()
+
+    def _scan(self) -> list:
+        """Return (mtime, size, path) of every entry on disk."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        """
+        Delete expired entries, then least recently used ones until the cache
+        is back to EVICT_TO_RATIO of its budget.
+
+        The directory is rescanned here, which also corrects the running size
+        for entries written by other processes.
+        """
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        target = self.max_size_bytes * EVICT_TO_RATIO
+        evicted = 0
+        now = time.time()
+        for mtime, size, path in sorted(entries):
+            if total <= target and now - mtime <= self.ttl_seconds:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._size_bytes = total
+            self.evictions += evicted
+
+    def clear(self) -> None:
+        """Delete every cached response."""
+        for _, _, path in self._scan():
+            os.remove(path)
+        with self._lock:
+            self._size_bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Return cache counters.
+
+        Returns:
+            Dictionary with hits, misses, expired entries, evictions and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def summary(self) -> str:
+        """Return a one-line, human-readable summary of the cache counters."""
+        s = self.stats()
+        return (
+            f"LLM response cache: {s['hits']} hits / {s['misses']} misses "
+            f"({s['hit_rate'] * 100:.1f}% hit rate), {s['expired']} expired, "
+            f"{s['evictions']} evictions"
+        )
+
+
+# Process-wide response cache shared by all cached LLMs
+llm_cache = LLMResponseCache()
+
+
+class CachedLLM(LLMWrapper):
+    """
+    LLM wrapper that serves repeated calls from the on-disk response cache.
+
+    Works with any crewai LLM (Ollama and other LiteLLM models, native OpenAI
+    or Gemini). Only plain-text responses are cached; calls that execute tool
+    functions or return structured models always go to the wrapped LLM.
+    """
+
+    def __init__(self, llm: BaseLLM, cache: LLMResponseCache = None, namespace: str = ""):
+        """
+        Args:
+            llm: The LLM to wrap
+            cache: Response cache (defaults to the process-wide llm_cache)
+            namespace: Extra key scope, e.g. the dataset content hash, so a
+                changed dataset never reuses responses about the old one
+        """
+        super().__init__(llm)
+        self.cache = cache or llm_cache
+        self.namespace = namespace
+
+    def _key(self, messages, tools) -> str:
+        params = {name: getattr(self._llm, name, None) for name in SAMPLING_PARAMS}
+        return self.cache.make_key(self._llm.model, messages, params, tools, self.namespace)
+
+    @staticmethod
+    def _cacheable(available_functions, response_model) -> bool:
+        return not available_functions and response_model is None
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        """Answer from the cache when possible, otherwise call the wrapped LLM."""
+        cacheable = self._cacheable(available_functions, response_model)
+        if cacheable:
+            key = self._key(messages, tools)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = self._llm.call(
+            messages, tools=tools, callbacks=callbacks, available_functions=available_functions,
+            from_task=from_task, from_agent=from_agent, response_model=response_model,
+        )
+        if cacheable and isinstance(response, str) and response:
+            self.cache.put(key, response, model=self._llm.model)
+        return response
+
+    async def acall(self, messages, tools=None, callbacks=None, available_functions=None,
+                    from_task=None, from_agent=None, response_model=None):
+        """Async variant of call()."""
+        cacheable = self._cacheable(available_functions, response_model)
+        if cacheable:
+            key = self._key(messages, tools)
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
+
+        response = await self._llm.acall(
+            messages, tools=tools, callbacks=callbacks, available_functions=available_functions,
+            from_task=from_task, from_agent=from_agent, response_model=response_model,
+        )
+        if cacheable and isinstance(response, str) and response:
+            await asyncio.to_thread(self.cache.put, key, response, self._llm.model)
+        return response
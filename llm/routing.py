@@ -0,0 +1,385 @@
+"""Per-agent model routing with latency budgets and fallback models.
+
+Each agent role (planner, analyst, modeler, writer) can run on its own
+model: LLM_MODEL_<ROLE> names it as "<provider>/<model>" (e.g.
+"ollama/llama3.2:3b") or as a model of the configured provider; roles
+without one use the shared LLM. A role can also get a latency budget,
+LLM_SLO_<ROLE> seconds (LLM_SLO_SECONDS for every role), and a faster
+fallback model, LLM_FALLBACK_<ROLE> (LLM_FALLBACK for every role).
+
+With a fallback, the budget is the primary model's request timeout: a call
+that exceeds it, or that still fails with a transient error after the
+gateway's retries, is retried on the fallback. After DEMOTE_AFTER_MISSES
+consecutive budget misses a role goes straight to its fallback for
+LLM_SLO_COOLDOWN seconds before its primary is tried again. Without a
+fallback the budget is only measured.
+
+Every call's latency, answering model and prompt and completion tokens are
+recorded per role, routed or not, so the routes can be tuned from real runs.
+"""
+import asyncio
+from collections import deque
+import copy
+from dataclasses import dataclass
+import os
+import threading
+import time
+from typing import Deque, Dict, List, Optional, Tuple
+
+from crewai.llms.base_llm import BaseLLM
+
+from llm.gateway import (
+    PROVIDERS,
+    GatewayLLM,
+    _message_text,
+    configured_provider,
+    create_provider_llm,
+    is_retryable,
+    is_timeout,
+)
+from llm.wrapper import LLMWrapper
+from tools.compact_output import count_tokens
+
+
+# Agent roles, as named in LLM_MODEL_<ROLE>, LLM_FALLBACK_<ROLE> and LLM_SLO_<ROLE>
+ROLES = ("planner", "analyst", "modeler", "writer")
+
+# Consecutive budget misses after which a role is sent to its fallback
+DEMOTE_AFTER_MISSES = 2
+
+# Seconds a demoted role stays on its fallback (overridable via LLM_SLO_COOLDOWN; 0 = never demote)
+DEFAULT_SLO_COOLDOWN = 300.0
+
+# Latencies kept per role for the percentiles
+MAX_LATENCY_SAMPLES = 4096
+
+
+@dataclass
+class Route:
+    """Model, fallback model and latency budget configured for one role."""
+    role: str
+    model: Optional[str] = None
+    fallback: Optional[str] = None
+    slo_seconds: Optional[float] = None
+
+    def describe(self, default_model: str) -> str:
+        """Return a one-line description of the route."""
+        text = f"{self.role} → {self.model or default_model}"
+        if self.fallback:
+            text += f", fallback {self.fallback}"
+        if self.slo_seconds:
+            text += f", SLO {self.slo_seconds:g}s"
+        return text
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.model or self.fallback or self.slo_seconds)
+
+
+def load_route(role: str) -> Route:
+    """
+    Read the route of a role from the environment.
+
+    Args:
+        role: One of ROLES
+
+    Returns:
+        The role's Route (all fields None when nothing is configured)
+
+    Raises:
+        ValueError: If the role is unknown or its SLO is not a number
+    """
+    if role not in ROLES:
+        raise ValueError(f"Unknown agent role '{role}' (expected one of: {', '.join(ROLES)})")
+    key = role.upper()
+    slo = os.getenv(f"LLM_SLO_{key}") or os.getenv("LLM_SLO_SECONDS")
+    try:
+        slo_seconds = float(slo) if slo else None
+    except ValueError:
+        raise ValueError(f"Invalid latency SLO '{slo}' for the {role} (expected seconds)")
+    return Route(
+        role=role,
+        model=os.getenv(f"LLM_MODEL_{key}") or None,
+        fallback=os.getenv(f"LLM_FALLBACK_{key}") or os.getenv("LLM_FALLBACK") or None,
+        slo_seconds=slo_seconds if slo_seconds and slo_seconds > 0 else None,
+    )
+
+
+def parse_model(spec: str) -> Tuple[str, str]:
+    """
+    Split a model setting into provider and model.
+
+    Args:
+        spec: "<provider>/<model>", or a model of the configured provider
+
+    Returns:
+        (provider, model)
+    """
+    provider, _, model = spec.partition("/")
+    if model and provider.lower() in PROVIDERS:
+        return provider.lower(), model
+    return configured_provider(), spec
+
+
+class RoleStats:
+    """Latency, token and fallback counters of one agent role."""
+
+    def __init__(self, role: str):
+        self.role = role
+        self.calls = 0
+        self.failures = 0
+        self.slo_misses = 0
+        self.fallbacks = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        # Answering model -> calls
+        self.models: Dict[str, int] = {}
+        self.latencies: Deque[float] = deque(maxlen=MAX_LATENCY_SAMPLES)
+        self.slo_seconds: Optional[float] = None
+        self._consecutive_misses = 0
+        self._demoted_until = 0.0
+        self._lock = threading.Lock()
+
+    def demoted(self) -> bool:
+        """Return True while the role is sent straight to its fallback."""
+        with self._lock:
+            return time.monotonic() < self._demoted_until
+
+    def primary_latency(self, seconds: float, slo_seconds: Optional[float]) -> bool:
+        """
+        Check a primary call's latency against the budget and update the demotion state.
+
+        Returns:
+            True if the call missed the budget
+        """
+        missed = slo_seconds is not None and seconds > slo_seconds
+        with self._lock:
+            self.slo_seconds = slo_seconds
+            if not missed:
+                self._consecutive_misses = 0
+                return False
+            self.slo_misses += 1
+            self._consecutive_misses += 1
+            cooldown = float(os.getenv("LLM_SLO_COOLDOWN", DEFAULT_SLO_COOLDOWN))
+            if self._consecutive_misses >= DEMOTE_AFTER_MISSES and cooldown > 0:
+                self._demoted_until = time.monotonic() + cooldown
+                self._consecutive_misses = 0
+            return True
+
+    def record(self, model: Optional[str], seconds: float, prompt_tokens: int,
+               completion_tokens: int, fell_back: bool) -> None:
+        """Record one finished call (model None for a failed call)."""
+        with self._lock:
+            self.calls += 1
+            self.latencies.append(seconds)
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            if fell_back:
+                self.fallbacks += 1
+            if model is None:
+                self.failures += 1
+            else:
+                self.models[model] = self.models.get(model, 0) + 1
+
+    def percentile(self, q: float) -> float:
+        """Return the q-th percentile (0-100) of the recorded latencies."""
+        with self._lock:
+            latencies = sorted(self.latencies)
+        if not latencies:
+            return 0.0
+        return latencies[min(int(round(q / 100 * (len(latencies) - 1))), len(latencies) - 1)]
+
+    def as_dict(self) -> dict:
+        """Return the counters as a JSON-serializable dict."""
+        with self._lock:
+            payload = {
+                "role": self.role,
+                "calls": self.calls,
+                "failures": self.failures,
+                "models": dict(self.models),
+                "slo_seconds": self.slo_seconds,
+                "slo_misses": self.slo_misses,
+                "fallbacks": self.fallbacks,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+            }
+        payload["p50_seconds"] = round(self.percentile(50), 3)
+        payload["p95_seconds"] = round(self.percentile(95), 3)
+        return payload
+
+    def summary(self) -> str:
+        """Return a one-line summary of this role's calls."""
+        stats = self.as_dict()
+        models = ", ".join(f"{model} {calls}" for model, calls in stats["models"].items())
+        text = (
+            f"{self.role}: {stats['calls']} calls ({models or 'none answered'}), "
+            f"p50 {stats['p50_seconds']:.1f}s / p95 {stats['p95_seconds']:.1f}s"
+        )
+        if stats["slo_seconds"]:
+            text += (f", SLO {stats['slo_seconds']:g}s missed {stats['slo_misses']}x, "
+                     f"{stats['fallbacks']} fallbacks")
+        text += f", {stats['prompt_tokens']:,} prompt + {stats['completion_tokens']:,} completion tokens"
+        if stats["failures"]:
+            text += f", {stats['failures']} failed"
+        return text
+
+
+_stats: Dict[str, RoleStats] = {}
+_stats_lock = threading.Lock()
+
+
+def role_stats(role: str) -> RoleStats:
+    """Return the process-wide counters of a role, creating them on first use."""
+    with _stats_lock:
+        if role not in _stats:
+            _stats[role] = RoleStats(role)
+        return _stats[role]
+
+
+class RoutedLLM(LLMWrapper):
+    """
+    LLM wrapper of one agent role: measures its calls and falls back on budget misses.
+
+    Usage:
+        llm = route_llm("planner", gateway_llm())
+    """
+
+    def __init__(self, llm: BaseLLM, role: str, fallback: BaseLLM = None,
+                 slo_seconds: float = None, labels: Tuple[str, str] = None):
+        """
+        Args:
+            llm: The role's primary LLM (with its request timeout set to the
+                budget when there is a fallback)
+            role: Agent role the calls are recorded under
+            fallback: Faster LLM retried when the primary misses the budget
+            slo_seconds: Latency budget per call
+            labels: Names of the primary and fallback models in the metrics
+                (default: their model names)
+        """
+        super().__init__(llm)
+        self.role = role
+        self.fallback = fallback
+        self.slo_seconds = slo_seconds
+        self.labels = labels or (llm.model, fallback.model if fallback is not None else None)
+        self.stats = role_stats(role)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        """Call the role's model, retrying on the fallback when the primary misses its budget."""
+        kwargs = dict(tools=tools, callbacks=callbacks, available_functions=available_functions,
+                      from_task=from_task, from_agent=from_agent, response_model=response_model)
+        prompt_tokens = count_tokens(_message_text(messages))
+        start = time.monotonic()
+        llm = self._llm
+        fell_back = self.fallback is not None and self.stats.demoted()
+        if fell_back:
+            llm = self.fallback
+        try:
+            try:
+                response = llm.call(messages, **kwargs)
+            except Exception as e:
+                if fell_back or self.fallback is None or not is_retryable(e):
+                    raise
+                # The primary ran out of budget (timeout) or is unavailable
+                if is_timeout(e):
+                    self.stats.primary_latency(time.monotonic() - start, self.slo_seconds)
+                llm, fell_back = self.fallback, True
+                response = llm.call(messages, **kwargs)
+            else:
+                if not fell_back:
+                    self.stats.primary_latency(time.monotonic() - start, self.slo_seconds)
+        except Exception:
+            self.stats.record(None, time.monotonic() - start, prompt_tokens, 0, fell_back)
+            raise
+        completion = response if isinstance(response, str) else str(response)
+        self.stats.record(self.labels[1] if fell_back else self.labels[0], time.monotonic() - start, prompt_tokens,
+                          count_tokens(completion), fell_back)
+        return response
+
+    async def acall(self, messages, tools=None, callbacks=None, available_functions=None,
+                    from_task=None, from_agent=None, response_model=None):
+        """Async variant of call(), run in a worker thread."""
+        return await asyncio.to_thread(
+            self.call, messages, tools=tools, callbacks=callbacks,
+            available_functions=available_functions, from_task=from_task,
+            from_agent=from_agent, response_model=response_model,
+        )
+
+
+def _with_timeout(llm: BaseLLM, seconds: float) -> BaseLLM:
+    """Copy a gateway-routed LLM with its request timeout set to a latency budget."""
+    if not isinstance(llm, GatewayLLM):
+        return llm
+    inner = copy.copy(llm._llm)
+    inner.timeout = seconds
+    # Native clients read the timeout from their OpenAI client, not the attribute
+    for name in ("client", "async_client"):
+        client = getattr(inner, name, None)
+        if client is not None and hasattr(client, "copy"):
+            setattr(inner, name, client.copy(timeout=seconds))
+    return GatewayLLM(inner, backend=llm.backend, max_retries=llm.max_retries, retry_timeouts=False)
+
+
+def route_llm(role: str, llm: BaseLLM) -> RoutedLLM:
+    """
+    Return the LLM of an agent role.
+
+    Args:
+        role: One of ROLES
+        llm: Shared gateway-routed LLM, used when the role has no model of its own
+
+    Returns:
+        RoutedLLM recording the role's calls; with the role's model,
+        fallback and budget when configured
+
+    Raises:
+        ValueError: If the role's route names an unknown provider or an invalid SLO
+    """
+    if isinstance(llm, RoutedLLM):
+        llm = llm._llm
+    route = load_route(role)
+    fallback, fallback_label = None, None
+    if route.fallback:
+        provider, model = parse_model(route.fallback)
+        fallback, fallback_label = GatewayLLM(create_provider_llm(provider, model)), f"{provider}/{model}"
+    # The budget only cuts a call short when there is a model to retry on
+    deadline = route.slo_seconds if fallback is not None else None
+    if route.model:
+        provider, model = parse_model(route.model)
+        primary = GatewayLLM(create_provider_llm(provider, model, timeout=deadline),
+                             retry_timeouts=deadline is None)
+        label = f"{provider}/{model}"
+    else:
+        primary = _with_timeout(llm, deadline) if deadline else llm
+        label = llm.model
+    return RoutedLLM(primary, role, fallback=fallback, slo_seconds=route.slo_seconds,
+                     labels=(label, fallback_label))
+
+
+def describe_routes(default_model: str) -> List[str]:
+    """
+    Return one line per role with a configured route.
+
+    Raises:
+        ValueError: If a route is invalid
+    """
+    routes = [load_route(role) for role in ROLES]
+    for route in routes:
+        for spec in (route.model, route.fallback):
+            if spec:
+                parse_model(spec)
+    return [route.describe(default_model) for route in routes if route.configured]
+
+
+def routing_metrics() -> List[dict]:
+    """Return the counters of every role that made calls in this process."""
+    with _stats_lock:
+        stats = [_stats[role] for role in ROLES if role in _stats]
+    return [s.as_dict() for s in stats if s.calls]
+
+
+def routing_summary() -> List[str]:
+    """Return one summary line per role that made calls in this process."""
+    with _stats_lock:
+        stats = [_stats[role] for role in ROLES if role in _stats]
+    return [f"LLM route {s.summary()}" for s in stats if s.calls]
@@ -0,0 +1,88 @@
+"""Base class for LLMs that wrap another crewai LLM.
+
+The response cache and the provider gateway each add behaviour around the
+calls of an LLM while everything else (model, stop words, provider, context
+window, token usage) stays that of the wrapped LLM. Wrappers nest, e.g. a
+CachedLLM around a GatewayLLM around the provider's LLM.
+"""
+from crewai.llms.base_llm import BaseLLM
+
+
+class LLMWrapper(BaseLLM):
+    """
+    crewai LLM delegating to a wrapped LLM.
+
+    Subclasses override call() and acall(); every attribute the wrapper
+    does not define itself is read from the wrapped LLM.
+    """
+
+    def __init__(self, llm: BaseLLM):
+        """
+        Args:
+            llm: The LLM to wrap
+        """
+        self._llm = llm
+        stop = list(llm.stop or [])
+        super().__init__(model=llm.model, temperature=getattr(llm, "temperature", None))
+        self._llm.stop = stop
+        self.is_litellm = getattr(llm, "is_litellm", False)
+
+    # Agents set stop words on the LLM they are given; forward them
+    @property
+    def stop(self):
+        return self._llm.stop
+
+    @stop.setter
+    def stop(self, value):
+        if hasattr(self, "_llm"):
+            self._llm.stop = value
+
+    @property
+    def provider(self) -> str:
+        return getattr(self._llm, "provider", "openai")
+
+    @provider.setter
+    def provider(self, value: str) -> None:
+        # BaseLLM.__init__ assigns a default; the wrapped LLM's provider wins
+        pass
+
+    def __getattr__(self, name: str):
+        # Only reached for attributes the wrapper does not define itself
+        if name == "_llm":
+            raise AttributeError(name)
+        return getattr(self._llm, name)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        """Call the wrapped LLM."""
+        return self._llm.call(
+            messages, tools=tools, callbacks=callbacks, available_functions=available_functions,
+            from_task=from_task, from_agent=from_agent, response_model=response_model,
+        )
+
+    async def acall(self, messages, tools=None, callbacks=None, available_functions=None,
+                    from_task=None, from_agent=None, response_model=None):
+        """Async variant of call()."""
+        return await self._llm.acall(
+            messages, tools=tools, callbacks=callbacks, available_functions=available_functions,
+            from_task=from_task, from_agent=from_agent, response_model=response_model,
+        )
+
+    def innermost(self) -> BaseLLM:
+        """Return the provider LLM at the bottom of the wrapper chain."""
+        llm = self._llm
+        while isinstance(llm, LLMWrapper):
+            llm = llm._llm
+        return llm
+
+    def supports_function_calling(self) -> bool:
+        return self._llm.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self._llm.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self._llm.get_context_window_size()
+
+    def get_token_usage_summary(self):
+        return self._llm.get_token_usage_summary()
@@ -1,6 +1,10 @@
 """
 Multi-Agent Agentic AI System for Data Science
 Main execution script for the CrewAI-based analysis system.
+
+Arguments, the dataset path and the LLM configuration are checked before
+crewai, the agents, the tools and pandas are imported, so --help and
+configuration errors return immediately.
 """
 
 # Windows compatibility patch for signal module
@@ -27,27 +31,24 @@ if sys.platform == "win32":
         signal.SIGTTOU = 22
 
 import argparse
+import contextlib
 import os
 from dotenv import load_dotenv
-from crewai import Crew, Process
-
-from agents import (
-    create_planner_agent,
-    create_data_analyst_agent,
-    create_modeling_agent,
-    create_report_writer_agent
-)
-from tasks import create_tasks
 
 
-def main():
-    """Main execution function."""
-    # Load environment variables
-    load_dotenv()
+def configure_llm():
+    """
+    Configure the LLM from environment variables.
+    
+    Exits with setup instructions when no LLM is configured.
     
+    Returns:
+        The configured provider's LLM, routed through the LLM gateway
+    """
     # Check for LLM configuration
-    use_ollama = os.getenv("USE_OLLAMA", "false").lower() == "true"
-    use_gemini = os.getenv("USE_GEMINI", "false").lower() == "true"
+    provider = os.getenv("LLM_PROVIDER", "").strip().lower()
+    use_ollama = provider == "ollama" or (not provider and os.getenv("USE_OLLAMA", "false").lower() == "true")
+    use_gemini = provider == "gemini" or (not provider and os.getenv("USE_GEMINI", "false").lower() == "true")
     has_openai = os.getenv("OPENAI_API_KEY")
     
     if not use_ollama and not use_gemini and not has_openai:
@@ -69,33 +70,34 @@ def main():
         print("      OPENAI_API_KEY=sk-your-key-here")
         print("\n" + "=" * 80)
         sys.exit(1)
+    if use_gemini and not (os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")):
+        print("ERROR: USE_GEMINI=true needs GOOGLE_API_KEY (or GEMINI_API_KEY)")
+        sys.exit(1)
+    
+    # Every provider goes through the gateway's pooled, rate-limited client
+    from llm import describe_routes, gateway_llm
+    try:
+        llm = gateway_llm()
+        routes = describe_routes(llm.model)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
     
-    # Configure LLM
-    llm = None
     if use_ollama:
-        from crewai import LLM
-        ollama_model = os.getenv("OLLAMA_MODEL", "llama2")
-        ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-        
-        # Ensure model has ollama/ prefix for LiteLLM
-        if not ollama_model.startswith("ollama/"):
-            ollama_model = f"ollama/{ollama_model}"
-            
-        print(f"🦙 Using Ollama with model: {ollama_model}")
-        print(f"   Base URL: {ollama_base_url}")
-        
-        llm = LLM(
-            model=ollama_model, 
-            base_url=ollama_base_url
-        )
+        print(f"🦙 Using Ollama with model: {llm.model}")
+        print(f"   Base URL: {llm.innermost().base_url}")
     elif use_gemini:
-        print("🔷 Using Google Gemini API")
-        # Gemini setup would go here
+        print(f"🔷 Using Google Gemini API with model: {llm.model}")
     else:
-        print(f"🤖 Using OpenAI API")
-        # OpenAI is default, no custom LLM needed
-    
+        print(f"🤖 Using OpenAI API with model: {llm.model}")
+    for route in routes:
+        print(f"   Route: {route}")
     
+    return llm
+
+
+def main():
+    """Main execution function."""
     # Parse command line arguments
     parser = argparse.ArgumentParser(
         description="Multi-Agent Data Science Analysis System"
@@ -110,107 +112,196 @@ def main():
         "--csv",
         type=str,
         required=True,
-        help="Path to the CSV dataset file"
+        help="Path to the dataset file: CSV, gzip/zstd-compressed CSV, Parquet or Feather "
+             "(detected from the file's contents)"
     )
     parser.add_argument(
         "--output",
         type=str,
         default="report_final.md",
-        help="Output filename for the final report (default: report_final.md)"
+        help="Output filename for the final report, or - for stdout (default: report_final.md); "
+             "the report is streamed into <output>.partial and renamed when complete"
+    )
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Write the report only when it is complete instead of streaming the writer's tokens"
+    )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="Run tasks strictly one after another, without concurrent scheduling or tool precompute"
+    )
+    parser.add_argument(
+        "--no-dataset-profile",
+        action="store_true",
+        help="Do not embed a precomputed dataset profile in the tasks (agents discover the data via tools)"
+    )
+    parser.add_argument(
+        "--no-context-compaction",
+        action="store_true",
+        help="Pass downstream tasks the full upstream outputs instead of bounded digests"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Restore the task outputs still valid from an earlier run of the same topic, dataset "
+             "and prompts, and run only the failed or invalidated tasks"
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        nargs="?",
+        const="trace.json",
+        default=None,
+        metavar="TRACE",
+        help="Trace tasks, tool calls and LLM calls and write a Chrome/Perfetto trace (default: trace.json)"
+    )
+    parser.add_argument(
+        "--sample",
+        type=str,
+        default=None,
+        metavar="BUDGET",
+        help="Approximate EDA: the data tools estimate statistics from a sample of this many rows "
+             "(250000, 250k, 1.5M) or drawn within this time (30s, 2min), with confidence intervals"
+    )
+    parser.add_argument(
+        "--stratify",
+        type=str,
+        default=None,
+        metavar="COLUMN",
+        help="Stratify the --sample on this column (e.g. the target)"
+    )
+    parser.add_argument(
+        "--exact-columns",
+        type=str,
+        default=None,
+        metavar="COLS",
+        help="Comma-separated columns that get exact statistics under --sample"
     )
     
     args = parser.parse_args()
     
     # Validate inputs
     if not os.path.exists(args.csv):
-        print(f"ERROR: CSV file not found: {args.csv}")
+        print(f"ERROR: Dataset file not found: {args.csv}")
         sys.exit(1)
     
     # Convert to absolute path
     csv_path = os.path.abspath(args.csv)
     
-    print("=" * 80)
-    print("MULTI-AGENT DATA SCIENCE ANALYSIS SYSTEM")
-    print("=" * 80)
-    print(f"\n📊 Business Objective: {args.topic}")
-    print(f"📁 Dataset: {csv_path}")
-    print(f"📝 Output Report: {args.output}")
-    print("\n" + "=" * 80)
-    print("INITIALIZING AGENTS")
-    print("=" * 80)
+    # Load environment variables
+    load_dotenv()
     
-    # Create agents
-    print("\n✓ Creating Project Planner Agent...")
-    planner = create_planner_agent(llm=llm)
+    # The budget parser is stdlib-only: a bad --sample (or DATA_TOOLS_SAMPLE) fails here
+    from tools.sample_budget import parse_sample_budget
+    try:
+        args.sample_budget = parse_sample_budget(
+            args.sample if args.sample is not None else os.getenv("DATA_TOOLS_SAMPLE", "")
+        )
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
     
-    print("✓ Creating Data Analyst Agent (with CSV & Stats tools)...")
-    analyst = create_data_analyst_agent(llm=llm)
+    # With --output -, stdout carries only the report; progress goes to stderr
+    report_stdout = sys.stdout
+    if args.output == "-":
+        with contextlib.redirect_stdout(sys.stderr):
+            run(args, csv_path, report_stdout)
+    else:
+        run(args, csv_path, report_stdout)
+
+
+def run(args, csv_path: str, report_stdout):
+    """
+    Configure, run and report one analysis.
     
-    print("✓ Creating Modeling Agent...")
-    modeler = create_modeling_agent(llm=llm)
+    Args:
+        args: Parsed command line arguments
+        csv_path: Absolute path to the dataset
+        report_stdout: Stream receiving the report for --output -
+    """
+    # The data tools read their sampling defaults from the environment
+    for option, variable in (("sample", "DATA_TOOLS_SAMPLE"), ("stratify", "DATA_TOOLS_STRATIFY"),
+                             ("exact_columns", "DATA_TOOLS_EXACT_COLUMNS")):
+        if getattr(args, option) is not None:
+            os.environ[variable] = getattr(args, option)
     
-    print("✓ Creating Report Writer Agent...")
-    writer = create_report_writer_agent(llm=llm)
+    llm = configure_llm()
     
+    # Heavy imports (crewai, agents, tools, pandas) only once the run can start
+    from llm import gateway_summary, llm_cache, llm_cache_enabled, routing_summary
+    from pipeline import ReportStream, RunTracer, build_analysis
+    from tools.columnar_cache import columnar_cache
+    from tools.dataset_cache import dataset_cache
     
-    print("\n" + "=" * 80)
-    print("DEFINING TASKS")
     print("=" * 80)
-    
-    # Create tasks
-    tasks = create_tasks(
-        planner=planner,
-        analyst=analyst,
-        modeler=modeler,
-        writer=writer,
-        topic=args.topic,
-        csv_path=csv_path
-    )
-    
-    print(f"\n✓ Created {len(tasks)} tasks:")
-    print("  1. Planning Task → Project Planner")
-    print("  2. EDA Task → Data Analyst")
-    print("  3. Modeling Task → ML Engineer")
-    print("  4. Report Writing Task → Technical Writer")
-    
-    print("\n" + "=" * 80)
-    print("ASSEMBLING CREW")
+    print("MULTI-AGENT DATA SCIENCE ANALYSIS SYSTEM")
     print("=" * 80)
+    print(f"\n📊 Business Objective: {args.topic}")
+    print(f"📁 Dataset: {csv_path}")
+    print(f"📝 Output Report: {args.output}")
+    if args.sample_budget:
+        print(f"🎲 Approximate EDA: sample budget {args.sample_budget}")
     
-    # Create crew
-    crew = Crew(
-        agents=[planner, analyst, modeler, writer],
-        tasks=tasks,
-        process=Process.sequential,
-        verbose=True
+    tracer = RunTracer() if args.profile else None
+    analysis = build_analysis(
+        topic=args.topic,
+        csv_path=csv_path,
+        llm=llm,
+        sequential=args.sequential,
+        dataset_profile=not args.no_dataset_profile,
+        verbose=True,
+        log=print,
+        tracer=tracer,
+        compact_context=False if args.no_context_compaction else None,
+        stream_report=False if args.no_stream else None,
+        resume=args.resume
     )
     
-    print("\n✓ Crew assembled with sequential process")
-    
     print("\n" + "=" * 80)
     print("STARTING ANALYSIS")
     print("=" * 80)
-    print("\nThis may take several minutes. The agents will work sequentially:")
-    print("Planning → EDA → Modeling → Report Writing\n")
+    if not analysis.crew.tasks:
+        print("\nEvery task was restored from its checkpoint.\n")
+    elif analysis.scheduler:
+        print("\nThis may take several minutes. The agents will work in dependency order")
+        print("(tasks joined by + run concurrently):")
+        print(f"{analysis.plan()}\n")
+    else:
+        print("\nThis may take several minutes. The agents will work sequentially:")
+        print(f"{analysis.plan()}\n")
+    
+    # The report is written as it is generated and saved atomically at the end
+    report = ReportStream(args.output, stdout=report_stdout)
     
     # Execute the crew
     try:
-        result = crew.kickoff(inputs={
-            "topic": args.topic,
-            "csv_path": csv_path
-        })
+        analysis.kickoff(report=report)
         
         print("\n" + "=" * 80)
         print("ANALYSIS COMPLETE")
         print("=" * 80)
         
-        # Save the final report
-        with open(args.output, 'w', encoding='utf-8') as f:
-            f.write(str(result))
-        
-        print(f"\n✓ Final report saved to: {args.output}")
-        print(f"✓ File size: {os.path.getsize(args.output):,} bytes")
-        
+        if report.to_stdout:
+            print("\n✓ Final report written to stdout")
+        else:
+            print(f"\n✓ Final report saved to: {args.output}")
+            print(f"✓ File size: {os.path.getsize(args.output):,} bytes")
+        print(f"✓ {report.summary()}")
+        print(f"✓ {dataset_cache.summary()}")
+        print(f"✓ {columnar_cache.summary()}")
+        print(f"✓ {analysis.turn_summary()}")
+        if analysis.scheduler:
+            print(f"✓ {analysis.scheduler.summary()}")
+        if analysis.compactor:
+            print(f"✓ {analysis.compactor.summary()}")
+        if analysis.checkpoints:
+            print(f"✓ {analysis.checkpoints.summary()}")
+        if llm_cache_enabled():
+            print(f"✓ {llm_cache.summary()}")
+        for line in gateway_summary() + routing_summary():
+            print(f"✓ {line}")
         print("\n" + "=" * 80)
         print("SUCCESS")
         print("=" * 80)
@@ -222,11 +313,23 @@ def main():
         print("ERROR DURING EXECUTION")
         print("=" * 80)
         print(f"\nAn error occurred: {str(e)}")
+        if report.partial_path and os.path.exists(report.partial_path):
+            print(f"\nThe report generated so far is in: {report.partial_path}")
+        if analysis.checkpoints and analysis.checkpoints.saved:
+            print(f"\nCompleted tasks are checkpointed in: {analysis.checkpoints.run_dir}")
+            print("Rerun with --resume to continue from the failed task.")
         print("\nPlease check:")
         print("  - Your OpenAI API key is valid")
         print("  - The CSV file is properly formatted")
         print("  - You have sufficient API credits")
         sys.exit(1)
+    finally:
+        # A failed or interrupted run is where the profile matters most
+        if tracer:
+            tracer.write_chrome_trace(args.profile)
+            print(f"\n✓ Trace saved to: {args.profile} (open in https://ui.perfetto.dev)")
+            print("\nTop time consumers:")
+            print(tracer.summary_table())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,48 @@
+"""Pipeline package initialization.
+
+Submodules import crewai, the agents and pandas; they are loaded on first use.
+"""
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pipeline.context_compaction import ContextCompactor
+    from pipeline.report_stream import ReportStream
+    from pipeline.runner import AnalysisResult, AnalysisRun, build_analysis, run_analysis
+    from pipeline.scheduler import DagScheduler, TaskGraph, tool_precompute_jobs
+    from pipeline.tracing import RunTracer
+
+# Public name -> defining module, imported on first access
+_EXPORTS = {
+    'ContextCompactor': 'pipeline.context_compaction',
+    'ReportStream': 'pipeline.report_stream',
+    'AnalysisResult': 'pipeline.runner',
+    'AnalysisRun': 'pipeline.runner',
+    'build_analysis': 'pipeline.runner',
+    'run_analysis': 'pipeline.runner',
+    'DagScheduler': 'pipeline.scheduler',
+    'TaskGraph': 'pipeline.scheduler',
+    'tool_precompute_jobs': 'pipeline.scheduler',
+    'RunTracer': 'pipeline.tracing'
+}
+
+__all__ = [
+    'ContextCompactor',
+    'ReportStream',
+    'AnalysisResult',
+    'AnalysisRun',
+    'build_analysis',
+    'run_analysis',
+    'DagScheduler',
+    'TaskGraph',
+    'tool_precompute_jobs',
+    'RunTracer'
+]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
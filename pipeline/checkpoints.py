@@ -0,0 +1,247 @@
+"""Per-task checkpoints of an analysis run, for resuming after a failure.
+
+Every task's output is saved, as soon as the task finishes, in a run
+directory keyed by the topic, the dataset's content hash and the task
+prompt version (CHECKPOINT_DIR, default .runs). A checkpoint records the
+fingerprint of what produced it: the task's description, expected output,
+agent and model, plus the outputs of the tasks it read as context. On
+resume, a task whose checkpoint fingerprint still matches is restored
+instead of executed; a changed prompt or model, or a re-executed upstream
+task with a different output, invalidates it and every task downstream of
+it, so only the failed or invalidated suffix of the pipeline runs again.
+"""
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.constants import NOT_SPECIFIED
+
+from pipeline.scheduler import TaskGraph
+
+
+# Directory holding one subdirectory per run key (overridable via CHECKPOINT_DIR)
+DEFAULT_CHECKPOINT_DIR = ".runs"
+
+# Bump when the checkpoint file layout changes
+CHECKPOINT_FORMAT_VERSION = 1
+
+
+def checkpoints_enabled() -> bool:
+    """Return True unless checkpoints are disabled via CHECKPOINTS=false."""
+    return os.getenv("CHECKPOINTS", "true").lower() != "false"
+
+
+def checkpoint_dir() -> str:
+    """Return the directory that holds the run directories."""
+    return os.getenv("CHECKPOINT_DIR", DEFAULT_CHECKPOINT_DIR)
+
+
+def run_key(topic: str, dataset_hash: str, prompt_version) -> str:
+    """
+    Return the directory name of a run.
+
+    Args:
+        topic: Business description/analysis objective
+        dataset_hash: Content hash of the dataset
+        prompt_version: Version of the task prompts
+
+    Returns:
+        Readable topic prefix followed by a hash of all three keys
+    """
+    key = hashlib.blake2b(
+        json.dumps([topic, dataset_hash, str(prompt_version)]).encode("utf-8"), digest_size=8
+    ).hexdigest()
+    slug = re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")[:40].rstrip("-")
+    return f"{slug}-{key}" if slug else key
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class Checkpoint:
+    """Saved output of one task."""
+    task: int
+    agent: str
+    fingerprint: str
+    raw: str
+    saved_at: str
+    version: int = CHECKPOINT_FORMAT_VERSION
+
+
+class RunCheckpoints:
+    """
+    Saves each task's output and restores the still-valid ones on resume.
+
+    Usage:
+        checkpoints = RunCheckpoints(tasks, topic, dataset_hash, PROMPT_VERSION)
+        restored = checkpoints.restore() if resume else []
+        pending = [task for i, task in enumerate(tasks) if i not in restored]
+        checkpoints.attach(pending)
+        Crew(tasks=pending, ...).kickoff()
+    """
+
+    def __init__(self, tasks: List[Task], topic: str, dataset_hash: str, prompt_version,
+                 directory: str = None, progress: Optional[Callable[[dict], None]] = None):
+        """
+        Args:
+            tasks: Crew tasks in their declared order
+            topic: Business description/analysis objective
+            dataset_hash: Content hash of the dataset
+            prompt_version: Version of the task prompts
+            directory: Parent of the run directories (defaults to CHECKPOINT_DIR)
+            progress: Receives a "task_restored" event per restored task
+        """
+        self.tasks = list(tasks)
+        self.graph = TaskGraph(self.tasks)
+        self.run_dir = os.path.join(directory or checkpoint_dir(), run_key(topic, dataset_hash, prompt_version))
+        self.manifest = {
+            "topic": topic,
+            "dataset_hash": dataset_hash,
+            "prompt_version": str(prompt_version),
+        }
+        self.progress = progress
+        self.restored: List[int] = []
+        self.saved: List[int] = []
+        # Hash of each available task output, as read by downstream fingerprints
+        self._output_hashes: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def path(self, index: int) -> str:
+        """Return the checkpoint file of a task."""
+        return os.path.join(self.run_dir, f"task_{index + 1}.json")
+
+    def fingerprint(self, index: int) -> str:
+        """
+        Fingerprint the inputs of a task: its prompt, agent, model and upstream outputs.
+
+        Args:
+            index: Task position
+
+        Returns:
+            Hex digest; upstream outputs must already be saved or restored
+        """
+        task = self.tasks[index]
+        agent = task.agent
+        llm = getattr(agent, "llm", None)
+        with self._lock:
+            upstream = [self._output_hashes[j] for j in self.graph.dependencies[index]]
+        return _text_hash(json.dumps({
+            "description": task.description,
+            "expected_output": task.expected_output,
+            "agent": [agent.role, agent.goal, agent.backstory] if agent else None,
+            "model": getattr(llm, "model", None) if llm is not None and not isinstance(llm, str) else llm,
+            "upstream": upstream,
+        }, sort_keys=True))
+
+    def load(self, index: int) -> Optional[Checkpoint]:
+        """Return the saved checkpoint of a task, or None if there is none."""
+        try:
+            with open(self.path(index), encoding="utf-8") as f:
+                checkpoint = Checkpoint(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        return checkpoint if checkpoint.version == CHECKPOINT_FORMAT_VERSION else None
+
+    def restore(self) -> List[int]:
+        """
+        Restore the output of every task whose checkpoint is still valid.
+
+        A checkpoint is valid when its fingerprint matches and every task it
+        depends on was restored too. Restored tasks get their saved output
+        as ``task.output``; tasks that relied on crewai handing them all
+        earlier outputs get those tasks as explicit context, since restored
+        tasks do not run in the crew.
+
+        Returns:
+            Positions of the restored tasks
+        """
+        for i, task in enumerate(self.tasks):
+            if any(j not in self.restored for j in self.graph.dependencies[i]):
+                continue
+            checkpoint = self.load(i)
+            if checkpoint is None or checkpoint.fingerprint != self.fingerprint(i):
+                continue
+            task.output = TaskOutput(
+                description=task.description,
+                expected_output=task.expected_output,
+                raw=checkpoint.raw,
+                agent=checkpoint.agent,
+            )
+            with self._lock:
+                self._output_hashes[i] = _text_hash(checkpoint.raw)
+            self.restored.append(i)
+            if self.progress:
+                self.progress({"event": "task_restored", "task": i + 1, "agent": checkpoint.agent,
+                               "saved_at": checkpoint.saved_at})
+
+        if self.restored:
+            for i, task in enumerate(self.tasks):
+                if i not in self.restored and task.context is NOT_SPECIFIED:
+                    task.context = self.tasks[:i]
+        return list(self.restored)
+
+    def attach(self, tasks: List[Task]) -> List[Task]:
+        """
+        Install the checkpoint callback on the tasks that will run.
+
+        Attach after any callback that rewrites ``output.raw`` (context
+        compaction), so the full output is what gets saved.
+
+        Args:
+            tasks: Tasks that will execute (not the restored ones)
+
+        Returns:
+            The tasks, in the same order
+        """
+        os.makedirs(self.run_dir, exist_ok=True)
+        self._write_json(os.path.join(self.run_dir, "manifest.json"), self.manifest)
+        for task in tasks:
+            task.callback = self._callback(self.tasks.index(task), task.callback)
+        return tasks
+
+    def _callback(self, index: int, previous: Optional[Callable]) -> Callable:
+        def callback(output) -> None:
+            self.save(index, output)
+            if previous:
+                previous(output)
+        return callback
+
+    def save(self, index: int, output) -> None:
+        """Save the output of a finished task atomically."""
+        raw = output.raw or ""
+        checkpoint = Checkpoint(
+            task=index + 1,
+            agent=output.agent,
+            fingerprint=self.fingerprint(index),
+            raw=raw,
+            saved_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        )
+        self._write_json(self.path(index), asdict(checkpoint))
+        with self._lock:
+            self._output_hashes[index] = _text_hash(raw)
+            self.saved.append(index)
+
+    @staticmethod
+    def _write_json(path: str, payload: dict) -> None:
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+    def summary(self) -> str:
+        """Return a one-line summary of the restored and saved tasks."""
+        def labels(indices):
+            return ", ".join(f"{i + 1}" for i in sorted(indices)) or "none"
+        return (
+            f"Checkpoints: {len(self.restored)}/{len(self.tasks)} tasks restored "
+            f"({labels(self.restored)}), {len(self.saved)} saved ({labels(self.saved)}) in {self.run_dir}"
+        )
@@ -0,0 +1,277 @@
+"""Token-budgeted compaction of task outputs passed on as context.
+
+crewai hands a task the raw outputs of its ``context`` tasks, pasted in full
+into its prompt, so the report writer's prompt carries the whole plan, EDA
+report and modeling recommendation. ContextCompactor replaces each upstream
+output, as soon as its task finishes, with an extractive digest bounded to
+CONTEXT_DIGEST_TOKENS: the section headings plus the bullets and sentences
+that carry numbers or decisions, kept in their original order. The digest
+costs no LLM call. Outputs no other task reads (the final report) are left
+untouched, and the full text of every compacted output is kept.
+"""
+from dataclasses import dataclass
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+from crewai import Task
+from crewai.utilities.constants import NOT_SPECIFIED
+from crewai.utilities.formatter import DIVIDERS
+
+from tools.compact_output import count_tokens
+
+
+# Token budget of one upstream output's digest (overridable via CONTEXT_DIGEST_TOKENS)
+DEFAULT_DIGEST_TOKENS = 400
+
+# Units longer than this many tokens are cut at a sentence or word boundary
+MAX_UNIT_TOKENS = 80
+
+# Words that mark a decision, recommendation or finding worth keeping
+DECISION_WORDS = (
+    "recommend", "propose", "should", "must", "will", "choose", "chosen", "select", "use ", "using",
+    "drop", "remove", "impute", "encode", "target", "metric", "primary", "baseline", "best",
+    "strongest", "correlat", "imbalance", "missing", "outlier", "risk", "limitation", "key",
+    "important", "significant", "conclude", "decid", "priority", "next step",
+)
+
+_NUMBER = re.compile(r"(?<![A-Za-z])[-+]?\d[\d,]*(?:\.\d+)?%?")
+_HEADING = re.compile(r"^\s*(#{1,6}\s+.+|\*\*[^*]+\*\*:?\s*|[A-Z][^.!?]{0,60}:)\s*$")
+_BULLET = re.compile(r"^\s*(?:[-*+•]|\d+[.)])\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(*])")
+
+
+def compaction_enabled() -> bool:
+    """Return True unless compaction is disabled via CONTEXT_COMPACTION=false."""
+    return os.getenv("CONTEXT_COMPACTION", "true").lower() != "false"
+
+
+def digest_budget() -> int:
+    """Return the per-output digest budget from CONTEXT_DIGEST_TOKENS."""
+    return int(os.getenv("CONTEXT_DIGEST_TOKENS", DEFAULT_DIGEST_TOKENS))
+
+
+@dataclass
+class _Unit:
+    """One heading, bullet or sentence of an output."""
+    position: int
+    text: str
+    heading: bool
+    section: int
+    score: float = 0.0
+    tokens: int = 0
+
+
+def _strip_markup(text: str) -> str:
+    text = re.sub(r"[*_`]{1,3}([^*_`]+)[*_`]{1,3}", r"\1", text)
+    return " ".join(text.split())
+
+
+def _units(text: str) -> List[_Unit]:
+    """Split Markdown into headings, bullets and paragraph sentences, in order."""
+    units: List[_Unit] = []
+    section = -1
+    paragraph: List[str] = []
+
+    def flush():
+        if paragraph:
+            for sentence in _SENTENCE_END.split(" ".join(paragraph)):
+                if sentence.strip():
+                    units.append(_Unit(len(units), _strip_markup(sentence), False, section))
+            paragraph.clear()
+
+    for line in text.splitlines():
+        if not line.strip() or set(line.strip()) <= set("-=*_|: "):
+            flush()
+        elif _HEADING.match(line) and not _BULLET.match(line):
+            flush()
+            section = len(units)
+            units.append(_Unit(len(units), _strip_markup(line.lstrip("# ")).rstrip(":"), True, section))
+        elif _BULLET.match(line) or line.lstrip().startswith("|"):
+            flush()
+            units.append(_Unit(len(units), "- " + _strip_markup(_BULLET.sub("", line)).strip("| "), False, section))
+        else:
+            paragraph.append(line.strip())
+    flush()
+    return units
+
+
+def _score(unit: _Unit) -> float:
+    text = unit.text.lower()
+    numbers = len(_NUMBER.findall(unit.text))
+    decisions = sum(word in text for word in DECISION_WORDS)
+    return 2.0 * min(numbers, 4) + 1.5 * min(decisions, 3)
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    if count_tokens(text) <= max_tokens:
+        return text
+    words = text.split()
+    # Words average well over one token; shrink until it fits
+    while words and count_tokens(" ".join(words) + " …") > max_tokens:
+        words = words[:max(int(len(words) * 0.8), len(words) - 1)]
+    return " ".join(words) + " …"
+
+
+def digest(text: str, max_tokens: int) -> str:
+    """
+    Extract a bounded digest of the facts, numbers and decisions in a text.
+
+    Args:
+        text: Task output (usually Markdown)
+        max_tokens: Token budget of the digest
+
+    Returns:
+        The digest: selected bullets and sentences under their headings, in
+        their original order; the text itself when it already fits
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    units = _units(text)
+    for unit in units:
+        if not unit.heading:
+            unit.text = _truncate(unit.text, MAX_UNIT_TOKENS)
+            unit.score = _score(unit)
+        unit.tokens = count_tokens(unit.text) + 1
+
+    # Highest information per token first; headings are charged when first used
+    candidates = sorted((u for u in units if not u.heading and u.score > 0),
+                        key=lambda u: (-u.score / u.tokens, u.position))
+    chosen: Dict[int, _Unit] = {}
+    used = 0
+    for unit in candidates:
+        heading = units[unit.section] if unit.section >= 0 else None
+        cost = unit.tokens + (heading.tokens if heading is not None and heading.position not in chosen else 0)
+        if used + cost > max_tokens:
+            continue
+        chosen[unit.position] = unit
+        if heading is not None:
+            chosen[heading.position] = heading
+        used += cost
+
+    lines = []
+    for position in sorted(chosen):
+        unit = chosen[position]
+        lines.append(f"## {unit.text}" if unit.heading else unit.text)
+    return "\n".join(lines)
+
+
+@dataclass
+class PromptTokens:
+    """Prompt size of one task with its context, before and after compaction."""
+    task: str
+    before: int
+    after: int
+
+
+class ContextCompactor:
+    """
+    Replaces the outputs that downstream tasks read with bounded digests.
+
+    Usage:
+        compactor = ContextCompactor(tasks)
+        compactor.attach()
+        crew.kickoff()
+        print(compactor.summary())
+    """
+
+    def __init__(self, tasks: List[Task], max_tokens: int = None,
+                 progress: Optional[Callable[[dict], None]] = None):
+        """
+        Args:
+            tasks: Crew tasks in their declared order
+            max_tokens: Token budget per digest (defaults to CONTEXT_DIGEST_TOKENS)
+            progress: Receives a "context_compacted" event per compacted output
+        """
+        self.tasks = list(tasks)
+        self.max_tokens = digest_budget() if max_tokens is None else max_tokens
+        self.progress = progress
+        # Full and compacted text per upstream task, keyed by task position
+        self.full: Dict[int, str] = {}
+        self.digests: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def _upstream(self, task: Task) -> List[int]:
+        if task.context is NOT_SPECIFIED:
+            # crewai hands such tasks every earlier output
+            return list(range(self.tasks.index(task)))
+        return [i for i, other in enumerate(self.tasks) if other in (task.context or [])]
+
+    def attach(self) -> List[Task]:
+        """
+        Install the compaction callback on every task whose output is read as context.
+
+        Returns:
+            The tasks, in the same order
+        """
+        read = sorted({i for task in self.tasks for i in self._upstream(task)})
+        for i in read:
+            task = self.tasks[i]
+            task.callback = self._callback(i, task.callback)
+        return self.tasks
+
+    def restore(self, task: Task) -> None:
+        """Compact the output of a task restored from a checkpoint instead of executed."""
+        index = self.tasks.index(task)
+        if any(index in self._upstream(other) for other in self.tasks):
+            self._compact(index, task.output)
+
+    def _callback(self, index: int, previous: Optional[Callable]) -> Callable:
+        def callback(output) -> None:
+            self._compact(index, output)
+            if previous:
+                previous(output)
+        return callback
+
+    def _compact(self, index: int, output) -> None:
+        full = output.raw or ""
+        compacted = digest(full, self.max_tokens)
+        with self._lock:
+            self.full[index], self.digests[index] = full, compacted
+        # Downstream tasks read the context from output.raw
+        output.raw = compacted
+        if self.progress:
+            self.progress({
+                "event": "context_compacted",
+                "task": index + 1,
+                "agent": output.agent,
+                "tokens_before": count_tokens(full),
+                "tokens_after": count_tokens(compacted),
+            })
+
+    def prompt_tokens(self) -> List[PromptTokens]:
+        """
+        Prompt tokens of every task that reads context, with full and compacted context.
+
+        Counts cover the task description, its expected output and its
+        context; the agent's role and tool instructions are the same either way.
+
+        Returns:
+            One PromptTokens per task with context whose upstream outputs exist
+        """
+        counts = []
+        for i, task in enumerate(self.tasks):
+            upstream = [j for j in self._upstream(task) if j in self.full]
+            if not upstream:
+                continue
+            base = f"{task.description}\n{task.expected_output}\n"
+            counts.append(PromptTokens(
+                task=task.name or (task.agent.role if task.agent else f"task {i + 1}"),
+                before=count_tokens(base + DIVIDERS.join(self.full[j] for j in upstream)),
+                after=count_tokens(base + DIVIDERS.join(self.digests[j] for j in upstream)),
+            ))
+        return counts
+
+    def summary(self) -> str:
+        """Return a one-line summary of prompt tokens before and after compaction."""
+        counts = self.prompt_tokens()
+        if not counts:
+            return "Context compaction: no task context compacted"
+        before = sum(c.before for c in counts)
+        after = sum(c.after for c in counts)
+        per_task = ", ".join(f"{c.task} {c.before:,}→{c.after:,}" for c in counts)
+        return (
+            f"Context compaction: prompt tokens {before:,}→{after:,} "
+            f"({(1 - after / before) * 100 if before else 0:.0f}% saved; {per_task})"
+        )
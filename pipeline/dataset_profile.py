@@ -0,0 +1,115 @@
+"""One-shot dataset profile injected into the task descriptions.
+
+Without it, the analyst discovers the dataset through ReAct round trips: every
+CSV Reader or Data Statistics call costs a full LLM generation. The profile is
+computed once, up front, with the same logic the tools use, rendered in the
+compact format and embedded in the planning, analysis and modeling tasks; the
+tools stay available for drill-down.
+"""
+from dataclasses import dataclass
+import threading
+import time
+from typing import Callable, Optional
+
+from crewai.agents.parser import AgentAction, AgentFinish
+
+from tools.compact_output import count_tokens, reader_payload, render_compact, stats_payload
+from tools.csv_preview import preview_csv, should_preview
+from tools.data_stats_tool import compute_stats
+from tools.dataset_cache import load_dataset
+from tools.sample_budget import resolve_sample_budget
+
+
+@dataclass
+class DatasetProfile:
+    """A rendered dataset profile and what it cost to build."""
+    text: str
+    seconds: float
+    tokens: int
+
+
+def build_dataset_profile(csv_path: str, num_rows: int = 5) -> DatasetProfile:
+    """
+    Profile a dataset with the CSV Reader and Data Statistics logic.
+
+    Large files follow the same paths as the tools: the schema comes from a
+    bounded preview and the statistics from a streaming pass. With a sample
+    budget (DATA_TOOLS_SAMPLE) the schema is previewed and the statistics are
+    estimated from the sample the tools will share.
+
+    Args:
+        csv_path: Path to the CSV file
+        num_rows: Number of sample rows to include
+
+    Returns:
+        DatasetProfile with the compact rendering of schema, sample rows and
+        statistics
+    """
+    start = time.perf_counter()
+
+    if should_preview(csv_path) or resolve_sample_budget():
+        preview = preview_csv(csv_path, num_rows=num_rows)
+        schema = reader_payload(
+            csv_path,
+            rows=preview.row_count,
+            n_cols=len(preview.columns),
+            dtypes={col: str(dtype) for col, dtype in preview.dtypes.items()},
+            missing={col: int(round(rate * preview.row_count))
+                     for col, rate in preview.missing_rates.items() if rate > 0},
+            head_records=preview.head.to_dict("records"),
+            estimated=not preview.row_count_exact,
+        )
+    else:
+        df = load_dataset(csv_path)
+        missing = df.isnull().sum()
+        schema = reader_payload(
+            csv_path,
+            rows=df.shape[0],
+            n_cols=df.shape[1],
+            dtypes={col: str(dtype) for col, dtype in df.dtypes.items()},
+            missing={col: int(n) for col, n in missing[missing > 0].items()},
+            head_records=df.head(num_rows).to_dict("records"),
+        )
+
+    stats = compute_stats(csv_path)
+
+    # The statistics repeat the file/rows/cols line already in the schema
+    stats_lines = render_compact(stats_payload(stats)).split("\n")[1:]
+    text = "\n".join([render_compact(schema)] + stats_lines)
+
+    # Task descriptions are templates: keep data values from looking like {placeholders}
+    text = text.replace("{", "(").replace("}", ")")
+    return DatasetProfile(text=text, seconds=time.perf_counter() - start, tokens=count_tokens(text))
+
+
+class TurnCounter:
+    """
+    Crew step callback counting agent turns and tool calls.
+
+    Every agent step is one LLM generation, ending either in a tool call or a
+    final answer; tool results passed to the same callback are not turns.
+    """
+
+    def __init__(self, progress: Optional[Callable[[dict], None]] = None):
+        """
+        Args:
+            progress: Receives a tool_call or final_answer event per turn
+        """
+        self._lock = threading.Lock()
+        self.progress = progress
+        self.turns = 0
+        self.tool_calls = 0
+
+    def __call__(self, step) -> None:
+        if not isinstance(step, (AgentAction, AgentFinish)):
+            return
+        with self._lock:
+            self.turns += 1
+            if isinstance(step, AgentAction):
+                self.tool_calls += 1
+            turn = self.turns
+        if self.progress:
+            if isinstance(step, AgentAction):
+                self.progress({"event": "tool_call", "turn": turn, "tool": step.tool})
+            else:
+                self.progress({"event": "final_answer", "turn": turn})
@@ -0,0 +1,288 @@
+"""Incremental output of the final report while the writer generates it.
+
+The report writer's LLM is switched to streaming mode and ReportStream picks
+its tokens off crewai's event bus as they arrive. Only the text after the
+ReAct "Final Answer:" marker is the report, so the agent's thought is held
+back until the marker appears. Tokens are appended and flushed to
+``<output>.partial`` next to the report, or written to stdout for
+``--output -``. When the run completes the final report text (the answer as
+crewai parsed it) replaces the partial file's content and the file is
+renamed onto the output atomically, so the output path only ever holds a
+complete report; after a crash the partial file keeps what was generated.
+
+Cached LLM responses arrive without stream events; the report is then
+written in one piece at completion.
+"""
+import copy
+from datetime import datetime, timezone
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional, TextIO
+
+from crewai import Task
+from crewai.events import BaseEventListener
+from crewai.events.types.llm_events import LLMCallStartedEvent, LLMStreamChunkEvent
+from crewai.events.types.task_events import TaskStartedEvent
+
+from llm import LLMWrapper, RoutedLLM
+
+
+# Text preceding the report in the writer's response
+FINAL_ANSWER = "Final Answer:"
+
+# Suffix of the file the report is streamed into before the final rename
+PARTIAL_SUFFIX = ".partial"
+
+# Output path meaning standard output
+STDOUT = "-"
+
+
+def streaming_enabled() -> bool:
+    """Return True unless report streaming is disabled via REPORT_STREAMING=false."""
+    return os.getenv("REPORT_STREAMING", "true").lower() != "false"
+
+
+def streaming_llm(llm):
+    """
+    Return a copy of an LLM that streams its responses.
+
+    Args:
+        llm: crewai LLM, optionally wrapped (CachedLLM, RoutedLLM, GatewayLLM)
+
+    Returns:
+        Copy of the LLM (and of the LLMs it wraps, fallback included) with
+        stream=True; the original is left unchanged
+    """
+    clone = copy.copy(llm)
+    if isinstance(llm, LLMWrapper):
+        clone._llm = streaming_llm(llm._llm)
+        if isinstance(llm, RoutedLLM) and llm.fallback is not None:
+            clone.fallback = streaming_llm(llm.fallback)
+    else:
+        clone.stream = True
+    return clone
+
+
+def _epoch(ts: datetime) -> float:
+    if ts.tzinfo is None:
+        # crewai stamps some events with naive local time
+        return ts.timestamp()
+    return ts.astimezone(timezone.utc).timestamp()
+
+
+class _Router(BaseEventListener):
+    """Process-wide listener handing report events to the stream of their task."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.streams: Dict[str, "ReportStream"] = {}
+        super().__init__()
+
+    def setup_listeners(self, crewai_event_bus) -> None:
+        # Stream chunk handlers run synchronously in emission order; the others on the bus's thread pool
+        for event_type in (LLMStreamChunkEvent, LLMCallStartedEvent, TaskStartedEvent):
+            crewai_event_bus.register_handler(event_type, self._dispatch)
+
+    def _dispatch(self, source, event) -> None:
+        task_id = event.task_id if not isinstance(event, TaskStartedEvent) else \
+            str(getattr(event.task, "id", event.task_id))
+        with self._lock:
+            stream = self.streams.get(task_id)
+        if stream is not None:
+            stream.handle(event)
+
+    def register(self, task_id: str, stream: "ReportStream") -> None:
+        with self._lock:
+            self.streams[task_id] = stream
+
+    def unregister(self, task_id: str) -> None:
+        with self._lock:
+            self.streams.pop(task_id, None)
+
+
+_router: Optional[_Router] = None
+_router_lock = threading.Lock()
+
+
+def _get_router() -> _Router:
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = _Router()
+        return _router
+
+
+class ReportStream:
+    """
+    Writes the report task's answer to the output as its tokens arrive.
+
+    Usage:
+        stream = ReportStream("report_final.md")
+        stream.start(report_task)
+        result = crew.kickoff()
+        stream.finish(str(result))
+        print(stream.summary())
+    """
+
+    def __init__(self, output: str, stdout: TextIO = None):
+        """
+        Args:
+            output: Report path, or "-" for standard output
+            stdout: Stream used for "-" (defaults to sys.stdout when created)
+        """
+        self.output = output
+        self.to_stdout = output == STDOUT
+        self.partial_path = None if self.to_stdout else output + PARTIAL_SUFFIX
+        self._stdout = stdout or sys.stdout
+        self._file = None
+        self._lock = threading.Lock()
+        self._task_id: Optional[str] = None
+        # Response of the current LLM call: text before the marker, and whether it was passed
+        self._pending = ""
+        self._answering = False
+        self._call_started: Optional[float] = None
+        self.streamed = ""
+        self.chunks = 0
+        self.restarts = 0
+        self.started: Optional[float] = None
+        self.task_started: Optional[float] = None
+        self.first_byte: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def start(self, task: Task) -> None:
+        """
+        Start streaming the answer of a task.
+
+        Args:
+            task: The report task; its writer should use a streaming_llm
+        """
+        self.started = time.time()
+        if not self.to_stdout:
+            directory = os.path.dirname(self.output)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.partial_path, "w", encoding="utf-8")
+        self._task_id = str(task.id)
+        _get_router().register(self._task_id, self)
+
+    def handle(self, event) -> None:
+        """Process a stream chunk, LLM call start or task start of the report task."""
+        with self._lock:
+            if self.finished is not None:
+                return
+            if isinstance(event, TaskStartedEvent):
+                self.task_started = _epoch(event.timestamp)
+            elif isinstance(event, LLMCallStartedEvent):
+                self._new_call(_epoch(event.timestamp))
+            elif event.tool_call is None and event.chunk:
+                if self._call_started is None:
+                    self._call_started = _epoch(event.timestamp)
+                self._feed(event.chunk)
+
+    def _new_call(self, started: float) -> None:
+        # Call-start handlers run on a thread pool and may arrive after the
+        # first chunks of their own call; only an earlier response is discarded
+        if self._call_started is not None and started < self._call_started:
+            return
+        if self._answering:
+            # The previous answer was not final (e.g. rejected and retried)
+            self.restarts += 1
+            if self._file is not None:
+                self._file.seek(0)
+                self._file.truncate()
+            else:
+                self._write("\n\n")
+            self.streamed = ""
+        self._pending, self._answering, self._call_started = "", False, None
+
+    def _feed(self, chunk: str) -> None:
+        self.chunks += 1
+        if not self._answering:
+            self._pending += chunk
+            marker = self._pending.find(FINAL_ANSWER)
+            if marker < 0:
+                return
+            chunk = self._pending[marker + len(FINAL_ANSWER):].lstrip()
+            self._pending, self._answering = "", True
+        elif not self.streamed:
+            chunk = chunk.lstrip()
+        if chunk:
+            self._write(chunk)
+            self.streamed += chunk
+
+    def _write(self, text: str) -> None:
+        if self.first_byte is None:
+            self.first_byte = time.time()
+        target = self._stdout if self._file is None else self._file
+        target.write(text)
+        target.flush()
+
+    def finish(self, report: str) -> None:
+        """
+        Complete the output with the final report text.
+
+        The partial file is rewritten with the report, synced and renamed
+        onto the output; on stdout only the part not yet streamed is written.
+
+        Args:
+            report: Final report text (str of the crew output)
+        """
+        with self._lock:
+            self.finished = time.time()
+            if self._task_id is not None:
+                _get_router().unregister(self._task_id)
+            if self._file is None:
+                if not self.to_stdout:
+                    # finish() without start(): nothing was streamed
+                    self._file = open(self.partial_path, "w", encoding="utf-8")
+                else:
+                    # Streamed text cannot be taken back; add what is missing
+                    streamed = self.streamed.rstrip()
+                    if not streamed:
+                        self._write(report + "\n")
+                    elif report.startswith(streamed):
+                        self._write(report[len(streamed):] + "\n")
+                    else:
+                        self._write("\n")
+                    return
+            self._file.seek(0)
+            self._file.truncate()
+            self._write(report)
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            os.replace(self.partial_path, self.output)
+
+    def abort(self) -> None:
+        """Stop streaming after a failed run, keeping what was written in the partial file."""
+        with self._lock:
+            self.finished = time.time()
+            if self._task_id is not None:
+                _get_router().unregister(self._task_id)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @property
+    def first_byte_seconds(self) -> Optional[float]:
+        """Seconds from start() to the first report byte written."""
+        if self.first_byte is None or self.started is None:
+            return None
+        return self.first_byte - self.started
+
+    def summary(self) -> str:
+        """Return a one-line summary of the time to first byte."""
+        if self.first_byte_seconds is None:
+            return "Report streaming: no report bytes written"
+        text = f"Report streaming: time to first byte {self.first_byte_seconds:.1f}s"
+        if self.task_started is not None:
+            text += f" ({max(self.first_byte - self.task_started, 0.0):.1f}s after the report task started)"
+        if self.streamed:
+            text += f", {len(self.streamed):,} chars in {self.chunks:,} chunks streamed"
+        else:
+            text += ", written at completion (no streamed tokens)"
+        if self.restarts:
+            text += f", {self.restarts} restarted answer(s)"
+        return text
@@ -0,0 +1,416 @@
+"""Assembly and execution of one analysis run.
+
+Shared by the single-run CLI (main.py) and the batch runner (batch.py): both
+build the four agents from their factories, define the tasks, schedule them
+and kick off the crew the same way.
+"""
+from dataclasses import dataclass
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+
+from crewai import Crew, Process, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.types.usage_metrics import UsageMetrics
+
+from agents import (
+    create_planner_agent,
+    create_data_analyst_agent,
+    create_modeling_agent,
+    create_report_writer_agent
+)
+from llm import CachedLLM, gateway_llm, llm_cache, llm_cache_enabled, route_llm
+from llm.routing import ROLES
+from pipeline.checkpoints import RunCheckpoints, checkpoints_enabled
+from pipeline.context_compaction import ContextCompactor, compaction_enabled
+from pipeline.dataset_profile import DatasetProfile, TurnCounter, build_dataset_profile
+from pipeline.report_stream import ReportStream, streaming_enabled, streaming_llm
+from pipeline.scheduler import DagScheduler, tool_precompute_jobs
+from pipeline.tracing import RunTracer
+from tasks import PROMPT_VERSION, create_tasks
+from tools.columnar_cache import columnar_cache
+
+
+# Short names of the tasks, in the order create_tasks defines them
+TASK_LABELS = ("Planning", "EDA", "Modeling", "Report Writing")
+
+
+def _quiet(message: str) -> None:
+    pass
+
+
+def _task_progress(progress: Callable[[dict], None], total: int) -> Callable:
+    """Crew task callback reporting each completed task."""
+    lock = threading.Lock()
+    done = []
+
+    def callback(output) -> None:
+        with lock:
+            done.append(output)
+            count = len(done)
+        progress({
+            "event": "task_completed",
+            "task": count,
+            "of": total,
+            "agent": output.agent,
+            "output_chars": len(output.raw or ""),
+        })
+    return callback
+
+
+@dataclass
+class AnalysisRun:
+    """A crew assembled for one topic and dataset, ready to kick off."""
+    topic: str
+    csv_path: str
+    crew: Crew
+    tasks: List[Task]
+    report_task: Optional[Task] = None
+    scheduler: Optional[DagScheduler] = None
+    compactor: Optional[ContextCompactor] = None
+    checkpoints: Optional[RunCheckpoints] = None
+    profile: Optional[DatasetProfile] = None
+    turns: Optional[TurnCounter] = None
+    tracer: Optional[RunTracer] = None
+    wall_seconds: float = 0.0
+
+    def kickoff(self, report: Optional[ReportStream] = None):
+        """
+        Run the crew and wait for any background precompute to finish.
+
+        Args:
+            report: Writes the report task's answer to its output as it is
+                generated and completes it when the crew finishes
+
+        Returns:
+            The crew output
+        """
+        if self.tracer:
+            self.tracer.start()
+        if report:
+            report.start(self.report_task)
+        start = time.perf_counter()
+        try:
+            if self.crew.tasks:
+                result = self.crew.kickoff(inputs={
+                    "topic": self.topic,
+                    "csv_path": self.csv_path
+                })
+            else:
+                # Every task was restored from its checkpoint
+                result = CrewOutput(raw=self.tasks[-1].output.raw,
+                                    tasks_output=[task.output for task in self.tasks],
+                                    token_usage=UsageMetrics())
+        except BaseException:
+            if report:
+                report.abort()
+            raise
+        finally:
+            if self.scheduler:
+                self.scheduler.wait()
+            self.wall_seconds = time.perf_counter() - start
+            if self.profile:
+                self.wall_seconds += self.profile.seconds
+            if self.tracer:
+                self._finish_trace()
+        if report:
+            report.finish(str(result))
+        return result
+
+    def _finish_trace(self) -> None:
+        # Precompute jobs are timed with perf_counter; shift them to wall-clock time
+        offset = time.time() - time.perf_counter()
+        for job in self.scheduler.jobs if self.scheduler else []:
+            if job.end is not None:
+                self.tracer.add_span(job.name, "precompute", job.start + offset, job.end + offset,
+                                     lane="precompute", error=job.error)
+        self.tracer.finish()
+
+    def plan(self) -> str:
+        """Return the order the remaining tasks run in; tasks joined by "+" run concurrently."""
+        def label(task: Task) -> str:
+            index = self.tasks.index(task)
+            return TASK_LABELS[index] if index < len(TASK_LABELS) else f"Task {index + 1}"
+
+        if self.scheduler:
+            graph = self.scheduler.graph
+            waves = [[graph.tasks[i] for i in wave] for wave in graph.waves()]
+        else:
+            waves = [[task] for task in self.crew.tasks]
+        return " → ".join(" + ".join(label(task) for task in wave) for wave in waves)
+
+    def turn_summary(self) -> str:
+        """Return a one-line summary of agent turns, tool calls and wall time."""
+        profile = (
+            f"dataset profile {self.profile.tokens} tokens in {self.profile.seconds:.2f}s"
+            if self.profile else "no dataset profile"
+        )
+        return (
+            f"Agent turns: {self.turns.turns} LLM turns, {self.turns.tool_calls} tool calls, "
+            f"{self.wall_seconds:.1f}s wall time ({profile})"
+        )
+
+
+def build_analysis(topic: str, csv_path: str, llm=None, sequential: bool = False,
+                   dataset_profile: bool = True, verbose: bool = True,
+                   log: Callable[[str], None] = None,
+                   tracer: Optional[RunTracer] = None,
+                   progress: Optional[Callable[[dict], None]] = None,
+                   compact_context: Optional[bool] = None,
+                   stream_report: Optional[bool] = None,
+                   checkpoints: Optional[bool] = None,
+                   resume: bool = False) -> AnalysisRun:
+    """
+    Create the agents, tasks and crew for one analysis.
+
+    Args:
+        topic: Business description/analysis objective
+        csv_path: Absolute path to the CSV dataset
+        llm: LLM of the agents without a model of their own (LLM_MODEL_<ROLE>),
+            routed through the LLM gateway (None uses the configured provider)
+        sequential: Run tasks strictly one after another, without
+            concurrent scheduling or tool precompute
+        dataset_profile: Profile the dataset up front and embed it in the
+            task descriptions instead of leaving discovery to tool calls
+        verbose: Let the crew log agent steps
+        log: Function receiving progress messages (silent by default)
+        tracer: Records timed spans of the dataset profile, tasks, tool
+            calls and LLM calls when given
+        progress: Receives structured progress events (dataset profile,
+            agent turns, completed tasks) as the run advances
+        compact_context: Pass downstream tasks bounded digests of the
+            upstream outputs instead of the full text (None uses
+            CONTEXT_COMPACTION)
+        stream_report: Let the report writer's LLM stream its tokens so a
+            ReportStream can write them as they arrive (None uses
+            REPORT_STREAMING)
+        checkpoints: Save each task's output in the run directory as it
+            finishes (None uses CHECKPOINTS)
+        resume: Restore the tasks whose checkpoints are still valid and
+            run only the others (implies checkpoints)
+
+    Returns:
+        AnalysisRun ready to kick off
+    """
+    log = log or _quiet
+
+    # One gateway-routed client shared by the agents without a model of their own
+    llm = gateway_llm(llm)
+    cache = llm_cache_enabled()
+    if cache and isinstance(llm, CachedLLM):
+        # Re-wrapped per role below, scoped to this dataset
+        llm = llm._llm
+
+    # Each role on its configured model, with its latency budget and fallback
+    llms = {role: route_llm(role, llm) for role in ROLES}
+
+    # Serve repeated LLM calls from disk, scoped to this exact dataset content
+    if cache:
+        namespace = columnar_cache.content_hash(csv_path)
+        llms = {role: CachedLLM(role_llm, namespace=namespace) for role, role_llm in llms.items()}
+        log(f"💾 LLM response cache enabled: {llm_cache.directory}")
+
+    log("\n" + "=" * 80)
+    log("INITIALIZING AGENTS")
+    log("=" * 80)
+
+    # Create agents
+    log("\n✓ Creating Project Planner Agent...")
+    planner = create_planner_agent(llm=llms["planner"])
+
+    log("✓ Creating Data Analyst Agent (with CSV & Stats tools)...")
+    analyst = create_data_analyst_agent(llm=llms["analyst"])
+
+    log("✓ Creating Modeling Agent...")
+    modeler = create_modeling_agent(llm=llms["modeler"])
+
+    log("✓ Creating Report Writer Agent...")
+    # Only the writer streams; the other agents' outputs are never shown as they arrive
+    writer_llm = llms["writer"]
+    if stream_report if stream_report is not None else streaming_enabled():
+        writer_llm = streaming_llm(writer_llm)
+    writer = create_report_writer_agent(llm=writer_llm)
+
+    log("\n" + "=" * 80)
+    log("DEFINING TASKS")
+    log("=" * 80)
+
+    # Profile the dataset once so the agents start from it instead of tool round trips
+    profile = None
+    if dataset_profile:
+        profile_start = time.time()
+        profile = build_dataset_profile(csv_path)
+        if tracer:
+            tracer.add_span("dataset profile", "profile", profile_start, time.time(),
+                            tokens=profile.tokens)
+        log(f"\n✓ Dataset profile computed ({profile.tokens} tokens, {profile.seconds:.2f}s)")
+        if progress:
+            progress({"event": "dataset_profile", "tokens": profile.tokens,
+                      "seconds": round(profile.seconds, 3)})
+
+    # Create tasks
+    tasks = create_tasks(
+        planner=planner,
+        analyst=analyst,
+        modeler=modeler,
+        writer=writer,
+        topic=topic,
+        csv_path=csv_path,
+        dataset_profile=profile.text if profile else ""
+    )
+
+    log(f"\n✓ Created {len(tasks)} tasks:")
+    log("  1. Planning Task → Project Planner")
+    log("  2. EDA Task → Data Analyst")
+    log("  3. Modeling Task → ML Engineer")
+    log("  4. Report Writing Task → Technical Writer")
+
+    # Restore still-valid outputs of an earlier run of the same topic, data and prompts
+    run_checkpoints = None
+    pending = tasks
+    if resume or (checkpoints if checkpoints is not None else checkpoints_enabled()):
+        run_checkpoints = RunCheckpoints(tasks, topic, columnar_cache.content_hash(csv_path),
+                                         PROMPT_VERSION, progress=progress)
+        if resume:
+            restored = run_checkpoints.restore()
+            pending = [task for i, task in enumerate(tasks) if i not in restored]
+            log(f"\n✓ Resuming: {len(restored)} of {len(tasks)} tasks restored from "
+                f"{run_checkpoints.run_dir}")
+
+    log("\n" + "=" * 80)
+    log("ASSEMBLING CREW")
+    log("=" * 80)
+
+    # Schedule independent tasks concurrently from their context edges and
+    # warm the data tools while the planner works
+    scheduler = None
+    if not sequential and pending:
+        scheduler = DagScheduler(pending)
+        pending = scheduler.schedule()
+        scheduler.precompute(tool_precompute_jobs(csv_path, profiled=profile is not None))
+
+    # Downstream tasks read digests of the upstream outputs, not the full text
+    compactor = None
+    if compact_context if compact_context is not None else compaction_enabled():
+        compactor = ContextCompactor(tasks, progress=progress)
+        tasks = compactor.attach()
+        for task in tasks:
+            if task.output is not None:
+                compactor.restore(task)
+        log(f"✓ Context compaction: upstream outputs digested to {compactor.max_tokens} tokens each")
+
+    # Save each output in full, before compaction rewrites it
+    if run_checkpoints:
+        pending = run_checkpoints.attach(pending)
+
+    # Create crew
+    turns = TurnCounter(progress=progress)
+    crew = Crew(
+        agents=[planner, analyst, modeler, writer],
+        tasks=pending,
+        process=Process.sequential,
+        verbose=verbose,
+        step_callback=turns,
+        task_callback=_task_progress(progress, len(pending)) if progress else None
+    )
+
+    if scheduler:
+        log("\n✓ Crew assembled with dependency-aware scheduling")
+    else:
+        log("\n✓ Crew assembled with sequential process")
+
+    return AnalysisRun(
+        topic=topic,
+        csv_path=csv_path,
+        crew=crew,
+        tasks=tasks,
+        report_task=next(task for task in tasks if task.agent is writer),
+        scheduler=scheduler,
+        compactor=compactor,
+        checkpoints=run_checkpoints,
+        profile=profile,
+        turns=turns,
+        tracer=tracer
+    )
+
+
+@dataclass
+class AnalysisResult:
+    """Outcome of one completed analysis."""
+    output: str
+    report_bytes: int
+    wall_seconds: float
+    turns: int = 0
+    tool_calls: int = 0
+    scheduler_summary: str = ""
+    compaction_summary: str = ""
+    first_byte_seconds: Optional[float] = None
+    checkpoint_summary: str = ""
+
+
+def run_analysis(topic: str, csv_path: str, output: str, llm=None, sequential: bool = False,
+                 dataset_profile: bool = True, verbose: bool = False,
+                 progress: Optional[Callable[[dict], None]] = None,
+                 compact_context: Optional[bool] = None,
+                 stream_report: Optional[bool] = None,
+                 resume: bool = False) -> AnalysisResult:
+    """
+    Run one analysis end to end and save the report.
+
+    Args:
+        topic: Business description/analysis objective
+        csv_path: Path to the CSV dataset
+        output: Path of the Markdown report to write
+        llm: LLM of the agents without a model of their own (None uses the
+            configured provider)
+        sequential: Run tasks strictly one after another
+        dataset_profile: Embed a precomputed dataset profile in the tasks
+        verbose: Let the crew log agent steps
+        progress: Receives structured progress events as the run advances
+        compact_context: Pass downstream tasks digests of the upstream
+            outputs (None uses CONTEXT_COMPACTION)
+        stream_report: Write the report to <output>.partial as it is
+            generated and rename it onto the output at the end (None uses
+            REPORT_STREAMING)
+        resume: Restore the task outputs still valid from an earlier run of
+            the same analysis and run only the remaining tasks
+
+    Returns:
+        AnalysisResult with the report location, size, wall time and time
+        to the first report byte
+
+    Raises:
+        FileNotFoundError: If the dataset does not exist
+    """
+    start = time.perf_counter()
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"CSV file not found: {csv_path}")
+
+    analysis = build_analysis(
+        topic=topic,
+        csv_path=os.path.abspath(csv_path),
+        llm=llm,
+        sequential=sequential,
+        dataset_profile=dataset_profile,
+        verbose=verbose,
+        progress=progress,
+        compact_context=compact_context,
+        stream_report=stream_report,
+        resume=resume
+    )
+    # Save the final report, atomically once complete
+    report = ReportStream(output)
+    analysis.kickoff(report=report)
+
+    return AnalysisResult(
+        output=output,
+        report_bytes=os.path.getsize(output),
+        wall_seconds=time.perf_counter() - start,
+        turns=analysis.turns.turns,
+        tool_calls=analysis.turns.tool_calls,
+        scheduler_summary=analysis.scheduler.summary() if analysis.scheduler else "",
+        compaction_summary=analysis.compactor.summary() if analysis.compactor else "",
+        first_byte_seconds=report.first_byte_seconds,
+        checkpoint_summary=analysis.checkpoints.summary() if analysis.checkpoints else "",
+    )
@@ -0,0 +1,246 @@
+"""Dependency-aware scheduling of crew tasks.
+
+The crew's tasks already declare their dependencies through ``context=[...]``.
+DagScheduler turns those edges into execution waves: tasks in the same wave
+have no path between them and run concurrently (via crewai's async task
+execution), while each wave waits for the previous one. Work that needs no LLM
+output at all, such as the statistics and the relationship pairs the analyst's
+tools return, starts in the background before the first task and runs while
+the planner's LLM calls are in flight.
+
+The default crew is a single dependency chain (plan → analysis → modeling →
+report), so its time is saved by that precompute, not by concurrent tasks.
+Task order, task outputs and the final result are the same as with a purely
+sequential crew; only independent work overlaps.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from crewai import Task
+from crewai.utilities.constants import NOT_SPECIFIED
+
+
+@dataclass
+class PrecomputeJob:
+    """Timing of one background precompute job."""
+    name: str
+    start: float
+    end: Optional[float] = None
+    error: Optional[str] = None
+
+
+class TaskGraph:
+    """Dependency graph of crew tasks built from their context edges."""
+
+    def __init__(self, tasks: List[Task]):
+        """
+        Args:
+            tasks: Crew tasks in their declared order
+        """
+        self.tasks = list(tasks)
+        self.dependencies: Dict[int, List[int]] = {}
+        for i, task in enumerate(self.tasks):
+            if task.context is NOT_SPECIFIED:
+                # crewai hands such tasks every earlier output: depend on all of them
+                self.dependencies[i] = list(range(i))
+            else:
+                self.dependencies[i] = [
+                    j for j, other in enumerate(self.tasks[:i]) if other in (task.context or [])
+                ]
+
+    def waves(self) -> List[List[int]]:
+        """
+        Group tasks into execution waves.
+
+        A task joins the earliest wave after all of its dependencies, provided
+        no task in that wave uses the same agent (an agent runs one task at a
+        time). Waves keep the declared task order.
+
+        Returns:
+            List of waves, each a list of task indices
+        """
+        level: Dict[int, int] = {}
+        waves: List[List[int]] = []
+        for i, task in enumerate(self.tasks):
+            wave = max((level[j] + 1 for j in self.dependencies[i]), default=0)
+            # Keep the declared order: never schedule before an earlier task's wave
+            wave = max([wave] + [level[j] for j in range(i)])
+            while wave < len(waves) and any(self.tasks[j].agent is task.agent for j in waves[wave]):
+                wave += 1
+            if wave == len(waves):
+                waves.append([])
+            waves[wave].append(i)
+            level[i] = wave
+        return waves
+
+    def critical_path(self, durations: Dict[int, float]) -> Tuple[float, List[int]]:
+        """
+        Find the longest dependency chain given measured task durations.
+
+        Args:
+            durations: Task index to wall time in seconds
+
+        Returns:
+            Tuple of (total seconds, task indices along the path)
+        """
+        finish: Dict[int, float] = {}
+        previous: Dict[int, Optional[int]] = {}
+        for i in range(len(self.tasks)):
+            before = max(self.dependencies[i], key=lambda j: finish[j], default=None)
+            finish[i] = (finish[before] if before is not None else 0.0) + durations.get(i, 0.0)
+            previous[i] = before
+        if not finish:
+            return 0.0, []
+        end = max(finish, key=finish.get)
+        path = [end]
+        while previous[path[-1]] is not None:
+            path.append(previous[path[-1]])
+        return finish[end], path[::-1]
+
+
+class DagScheduler:
+    """
+    Runs independent crew tasks and tool precomputation concurrently.
+
+    Usage:
+        scheduler = DagScheduler(tasks)
+        tasks = scheduler.schedule()
+        scheduler.precompute(tool_precompute_jobs(csv_path))
+        result = Crew(tasks=tasks, process=Process.sequential, ...).kickoff()
+        print(scheduler.summary())
+    """
+
+    def __init__(self, tasks: List[Task], max_workers: int = 2):
+        """
+        Args:
+            tasks: Crew tasks in their declared order
+            max_workers: Threads available for background precompute jobs
+        """
+        self.graph = TaskGraph(tasks)
+        self.jobs: List[PrecomputeJob] = []
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="precompute")
+        self._futures = []
+
+    def schedule(self) -> List[Task]:
+        """
+        Mark tasks that can run concurrently as asynchronous.
+
+        Within a wave, every task but the last executes asynchronously, so
+        crewai starts them together and the wave's last task waits for them.
+
+        Returns:
+            The tasks in execution order (the declared order)
+        """
+        for wave in self.graph.waves():
+            for i in wave[:-1]:
+                self.graph.tasks[i].async_execution = True
+        return self.graph.tasks
+
+    def precompute(self, jobs: List[Tuple[str, Callable[[], object]]]) -> None:
+        """
+        Start background jobs that need no LLM output.
+
+        Failures are recorded, not raised: the tools simply compute the
+        result themselves when they are called.
+
+        Args:
+            jobs: List of (name, callable) pairs
+        """
+        for name, fn in jobs:
+            job = PrecomputeJob(name=name, start=time.perf_counter())
+            self.jobs.append(job)
+            self._futures.append(self._executor.submit(self._run_job, job, fn))
+
+    @staticmethod
+    def _run_job(job: PrecomputeJob, fn: Callable[[], object]) -> None:
+        try:
+            fn()
+        except Exception as e:
+            job.error = str(e)
+        finally:
+            job.end = time.perf_counter()
+
+    def wait(self) -> None:
+        """Block until all precompute jobs have finished."""
+        for future in self._futures:
+            future.result()
+        self._executor.shutdown(wait=True)
+
+    def _durations(self) -> Dict[int, float]:
+        return {
+            i: task.execution_duration
+            for i, task in enumerate(self.graph.tasks)
+            if task.execution_duration is not None
+        }
+
+    def _overlapped_precompute(self) -> float:
+        """Seconds of precompute that finished before a tool-using task started."""
+        consumers = [
+            task.start_time for task in self.graph.tasks
+            if task.start_time is not None and task.agent is not None and task.agent.tools
+        ]
+        if not consumers or not self.jobs:
+            return 0.0
+        # Task timestamps are wall-clock; convert the consumer start to perf_counter time
+        first_consumer = min(consumers).timestamp() - time.time() + time.perf_counter()
+        overlapped = 0.0
+        for job in self.jobs:
+            if job.end is None or job.error:
+                continue
+            overlapped += max(min(job.end, first_consumer) - job.start, 0.0)
+        return overlapped
+
+    def summary(self) -> str:
+        """Return a one-line, human-readable summary of the schedule and time saved."""
+        waves = self.graph.waves()
+        overlapped = self._overlapped_precompute()
+        failed = [job.name for job in self.jobs if job.error]
+        text = f"Scheduler: {len(self.graph.tasks)} tasks in {len(waves)} waves"
+        if len(waves) < len(self.graph.tasks):
+            durations = self._durations()
+            serial = sum(durations.values())
+            critical, _ = self.graph.critical_path(durations)
+            text += f", critical path {critical:.2f}s vs {serial:.2f}s serial ({serial - critical:.2f}s saved)"
+        else:
+            text += " (one dependency chain, no concurrent tasks)"
+        text += (
+            f", {len(self.jobs) - len(failed)}/{len(self.jobs)} precompute jobs, "
+            f"{overlapped:.2f}s of tool work done during earlier tasks"
+        )
+        return text + (f" (failed: {', '.join(failed)})" if failed else "")
+
+
+def tool_precompute_jobs(csv_path: str, profiled: bool = False) -> List[Tuple[str, Callable[[], object]]]:
+    """
+    Background jobs that warm the data tools for one dataset.
+
+    The dataset is parsed into the shared cache (through its columnar sidecar)
+    and, for files that fit in memory, the statistics report and the
+    target-independent relationship pairs are computed and kept with it, so
+    the analyst's tool calls (including Relationships with the target the
+    planner picks) return without recomputing them. With a sample budget
+    (DATA_TOOLS_SAMPLE) the shared sample is drawn instead.
+
+    Args:
+        csv_path: Path to the CSV file
+        profiled: The dataset profile was built, which already computed the
+            statistics (or drew the sample)
+
+    Returns:
+        List of (name, callable) pairs for DagScheduler.precompute
+    """
+    from tools.csv_preview import should_preview
+    from tools.data_stats_tool import compute_stats, exact_stats
+    from tools.relationships_tool import find_relationships
+    from tools.sample_budget import resolve_sample_budget
+    from tools.streaming_stats import should_stream
+
+    if resolve_sample_budget():
+        return [] if profiled else [("dataset sample", lambda: compute_stats(csv_path))]
+    if should_stream(csv_path) or should_preview(csv_path):
+        # The tools will not hold these files in memory; nothing to warm
+        return []
+    jobs = [] if profiled else [("dataset statistics", lambda: exact_stats(csv_path))]
+    return jobs + [("relationship pairs", lambda: find_relationships(csv_path))]
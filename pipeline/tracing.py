@@ -0,0 +1,251 @@
+"""Per-run tracing of tasks, tool calls and LLM calls.
+
+RunTracer listens on crewai's event bus and records one timed span per task,
+per tool invocation (with its arguments and output size) and per LLM call
+(with estimated prompt and completion tokens). The spans are written in the
+Chrome trace event format, which chrome://tracing and https://ui.perfetto.dev
+load directly, and summarized as a table of the top time consumers.
+
+Event handlers run on the event bus's thread pool, so events are recorded
+with the timestamps taken when they were emitted and paired up afterwards.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+
+from crewai.events import BaseEventListener
+from crewai.events.types.llm_events import LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent
+from crewai.events.types.task_events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+from crewai.events.types.tool_usage_events import ToolUsageErrorEvent, ToolUsageFinishedEvent
+
+from tools.compact_output import count_tokens
+
+
+# Handlers run asynchronously; finish() waits this long without new events
+# (and at most DRAIN_TIMEOUT_SECONDS) before pairing them up
+DRAIN_QUIET_SECONDS = 0.2
+DRAIN_TIMEOUT_SECONDS = 5.0
+
+
+@dataclass
+class Span:
+    """One timed unit of work."""
+    name: str
+    category: str
+    start: float
+    end: float
+    lane: str
+    args: Dict[str, object] = field(default_factory=dict)
+
+    @property
+    def seconds(self) -> float:
+        return max(self.end - self.start, 0.0)
+
+
+def _epoch(ts: datetime) -> float:
+    if ts.tzinfo is None:
+        # crewai stamps some events with naive local time
+        return ts.timestamp()
+    return ts.astimezone(timezone.utc).timestamp()
+
+
+def _message_text(messages) -> str:
+    if isinstance(messages, str):
+        return messages
+    parts = []
+    for message in messages or []:
+        content = message.get("content") if isinstance(message, dict) else message
+        parts.append(content if isinstance(content, str) else json.dumps(content, default=str))
+    return "\n".join(parts)
+
+
+def _short(text: str, limit: int = 60) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+class RunTracer(BaseEventListener):
+    """
+    Event bus listener collecting spans for one run.
+
+    Usage:
+        tracer = RunTracer()
+        tracer.start()
+        crew.kickoff(...)
+        tracer.finish()
+        tracer.write_chrome_trace("trace.json")
+        print(tracer.summary_table())
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: List[tuple] = []
+        self._last_event = 0.0
+        self.active = False
+        self.spans: List[Span] = []
+        self.run_start: Optional[float] = None
+        self.run_end: Optional[float] = None
+        super().__init__()
+
+    def setup_listeners(self, crewai_event_bus) -> None:
+        # Handlers stay registered for the process; they ignore events while inactive
+        for event_type in (
+            TaskStartedEvent, TaskCompletedEvent, TaskFailedEvent,
+            ToolUsageFinishedEvent, ToolUsageErrorEvent,
+            LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent,
+        ):
+            crewai_event_bus.register_handler(event_type, self._record)
+
+    def _record(self, source, event) -> None:
+        if not self.active:
+            return
+        with self._lock:
+            self._events.append((_epoch(event.timestamp), event, source))
+            self._last_event = time.monotonic()
+
+    def start(self) -> None:
+        """Start recording events."""
+        self.run_start = time.time()
+        self.active = True
+
+    def add_span(self, name: str, category: str, start: float, end: float, lane: str = "main",
+                 **args) -> None:
+        """Record a span measured outside the event bus (epoch seconds)."""
+        with self._lock:
+            self.spans.append(Span(name, category, start, end, lane, args))
+
+    def finish(self) -> None:
+        """Stop recording, wait for in-flight handlers and pair events into spans."""
+        self.run_end = time.time()
+        deadline = time.monotonic() + DRAIN_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            with self._lock:
+                quiet = time.monotonic() - self._last_event
+            if quiet >= DRAIN_QUIET_SECONDS:
+                break
+            time.sleep(DRAIN_QUIET_SECONDS / 2)
+        self.active = False
+
+        with self._lock:
+            events = sorted(self._events, key=lambda item: item[0])
+            self._events = []
+        self.spans.extend(self._pair(events))
+
+    def _pair(self, events) -> List[Span]:
+        spans = []
+        task_starts: Dict[str, tuple] = {}
+        llm_starts: Dict[tuple, List[tuple]] = defaultdict(list)
+        for ts, event, source in events:
+            if isinstance(event, TaskStartedEvent):
+                task_starts[str(getattr(event.task, "id", event.task_id))] = (ts, event)
+            elif isinstance(event, (TaskCompletedEvent, TaskFailedEvent)):
+                key = str(getattr(event.task, "id", event.task_id))
+                start_ts, start = task_starts.pop(key, (ts, event))
+                task = event.task or start.task
+                role = task.agent.role if task is not None and task.agent is not None else "crew"
+                name = task.name or _short(task.description) if task is not None else "task"
+                args = {"agent": role}
+                if isinstance(event, TaskFailedEvent):
+                    args["error"] = str(event.error)
+                spans.append(Span(name, "task", start_ts, ts, role, args))
+            elif isinstance(event, (ToolUsageFinishedEvent, ToolUsageErrorEvent)):
+                start_ts = _epoch(event.started_at) if isinstance(event, ToolUsageFinishedEvent) else ts
+                args = {"arguments": event.tool_args}
+                if isinstance(event, ToolUsageFinishedEvent):
+                    output = str(event.output)
+                    args.update(output_chars=len(output), output_tokens=count_tokens(output),
+                                from_cache=event.from_cache)
+                    end_ts = _epoch(event.finished_at)
+                else:
+                    args["error"] = str(event.error)
+                    end_ts = ts
+                spans.append(Span(event.tool_name, "tool", start_ts, end_ts, event.agent_role or "tools", args))
+            elif isinstance(event, LLMCallStartedEvent):
+                llm_starts[(event.agent_id, event.task_id)].append((ts, event))
+            elif isinstance(event, (LLMCallCompletedEvent, LLMCallFailedEvent)):
+                pending = llm_starts.get((event.agent_id, event.task_id))
+                start_ts, start = pending.pop(0) if pending else (ts, event)
+                model = getattr(start, "model", None) or getattr(event, "model", None) or "llm"
+                prompt = _message_text(getattr(start, "messages", None) or getattr(event, "messages", None))
+                args = {"model": model, "prompt_tokens": count_tokens(prompt)}
+                if isinstance(event, LLMCallCompletedEvent):
+                    args["completion_tokens"] = count_tokens(str(event.response))
+                else:
+                    args["error"] = event.error
+                spans.append(Span(f"LLM {model}", "llm", start_ts, ts, event.agent_role or "llm", args))
+        return spans
+
+    def _origin(self) -> float:
+        # Spans added before start() (e.g. the dataset profile) open the run
+        starts = [span.start for span in self.spans]
+        if self.run_start is not None:
+            starts.append(self.run_start)
+        return min(starts, default=time.time())
+
+    def write_chrome_trace(self, path: str) -> None:
+        """
+        Write the spans in the Chrome trace event format.
+
+        Args:
+            path: Output JSON path
+        """
+        origin = self._origin()
+        lanes: Dict[str, int] = {}
+        trace_events = []
+        for span in sorted(self.spans, key=lambda s: s.start):
+            tid = lanes.setdefault(span.lane, len(lanes) + 1)
+            trace_events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": round((span.start - origin) * 1e6),
+                "dur": round(span.seconds * 1e6),
+                "pid": 1,
+                "tid": tid,
+                "args": span.args,
+            })
+        for lane, tid in lanes.items():
+            trace_events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": lane}})
+        trace_events.append({"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "analysis run"}})
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f, default=str)
+
+    def summary_table(self, top: int = 10) -> str:
+        """
+        Return a table of the top time consumers.
+
+        Spans are grouped by category and name; nested spans (e.g. LLM calls
+        inside a task) are counted in both groups, so shares can exceed 100%.
+
+        Args:
+            top: Number of rows to show
+
+        Returns:
+            Formatted table
+        """
+        wall = (self.run_end or time.time()) - self._origin()
+        groups: Dict[tuple, list] = defaultdict(lambda: [0, 0.0, 0, 0])
+        for span in self.spans:
+            group = groups[(span.category, span.name)]
+            group[0] += 1
+            group[1] += span.seconds
+            group[2] += int(span.args.get("prompt_tokens", 0) or 0)
+            group[3] += int(span.args.get("completion_tokens", 0) or 0)
+
+        lines = [
+            f"{'category':<10} {'name':<44} {'calls':>6} {'total (s)':>10} {'share':>7} {'tokens in/out':>15}"
+        ]
+        ranked = sorted(groups.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        for (category, name), (calls, seconds, tokens_in, tokens_out) in ranked:
+            share = seconds / wall * 100 if wall > 0 else 0.0
+            tokens = f"{tokens_in}/{tokens_out}" if category == "llm" else ""
+            lines.append(
+                f"{category:<10} {_short(name, 44):<44} {calls:>6} {seconds:>10.2f} {share:>6.1f}% {tokens:>15}"
+            )
+        lines.append(f"{len(self.spans)} spans over {wall:.2f}s of wall time")
+        return "\n".join(lines)
@@ -0,0 +1,429 @@
+"""
+Server mode: serve analysis jobs from a long-running process.
+
+Imports crewai, configures the LLM client once and keeps parsed datasets in
+the in-process dataset cache, so each job starts with the agents' work
+instead of a cold start. Jobs are queued and run by a bounded worker pool;
+callers follow a job's progress as a stream of JSON lines.
+
+Endpoints (TCP with --host/--port, or a Unix socket with --socket):
+    POST /jobs               {"topic", "csv", "output"? (relative to --output-dir), "sequential"?,
+                              "dataset_profile"?, "stream"?} -> 202 job
+                             (with "stream": true, the progress stream)
+    GET  /jobs               all jobs
+    GET  /jobs/<id>          one job
+    GET  /jobs/<id>/events   progress stream (JSON lines) until the job ends
+    GET  /jobs/<id>/report   the Markdown report of a finished job
+    GET  /health             workers, queue depth, caches and job latency
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+import uuid
+
+import numpy as np
+
+# main applies the Windows signal compatibility patch before crewai is imported
+from main import configure_llm
+
+from dotenv import load_dotenv
+
+from llm import llm_cache, llm_cache_enabled, routing_metrics
+from pipeline import run_analysis
+from tools.columnar_cache import columnar_cache
+from tools.dataset_cache import dataset_cache, load_dataset
+
+
+# Defaults (overridable via SERVER_WORKERS / SERVER_MAX_QUEUE / SERVER_KEEP_JOBS)
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_KEEP_JOBS = 256
+
+# Seconds between keep-alive lines on an idle progress stream
+HEARTBEAT_SECONDS = 15.0
+
+
+@dataclass
+class Job:
+    """One analysis job and its progress events."""
+    id: str
+    topic: str
+    csv: str
+    output: str
+    sequential: bool = False
+    dataset_profile: bool = True
+    status: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    turns: int = 0
+    error: str = ""
+    events: List[dict] = field(default_factory=list)
+    _changed: threading.Condition = field(default_factory=threading.Condition, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def emit(self, event: dict) -> None:
+        """Append a progress event and wake up the streams following this job."""
+        event = dict(event, job=self.id, time=round(time.time(), 3))
+        with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    def wait_events(self, start: int, timeout: float) -> List[dict]:
+        """Return events after index start, waiting up to timeout for new ones."""
+        with self._changed:
+            self._changed.wait_for(lambda: len(self.events) > start or self.done, timeout=timeout)
+            return self.events[start:]
+
+    def to_dict(self) -> dict:
+        latency = self.finished_at - self.submitted_at if self.finished_at else None
+        queued = (self.started_at or time.time()) - self.submitted_at
+        return {
+            "id": self.id,
+            "topic": self.topic,
+            "csv": self.csv,
+            "output": self.output,
+            "status": self.status,
+            "queue_seconds": round(queued, 3),
+            "latency_seconds": round(latency, 3) if latency is not None else None,
+            "llm_turns": self.turns,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Runs jobs on a bounded worker pool against a resident LLM client."""
+
+    def __init__(self, llm, workers: int, max_queue: int, output_dir: str,
+                 keep_jobs: int = DEFAULT_KEEP_JOBS):
+        """
+        Args:
+            llm: LLM shared by every agent of every job
+            workers: Number of jobs run at the same time
+            max_queue: Maximum number of jobs waiting for a worker
+            output_dir: Directory all reports are written under
+            keep_jobs: Finished jobs kept (with their events) for the
+                status, events and report endpoints; older ones are dropped
+        """
+        self.llm = llm
+        self.workers = workers
+        self.max_queue = max_queue
+        self.output_dir = output_dir
+        self.keep_jobs = keep_jobs
+        self.jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            statuses = [job.status for job in self.jobs.values()]
+        return {status: statuses.count(status) for status in ("queued", "running", "succeeded", "failed")}
+
+    def submit(self, request: dict) -> Job:
+        """
+        Validate a job request and queue it.
+
+        Raises:
+            ValueError: If topic or csv is missing, the dataset does not
+                exist or the output is not a path inside the output directory
+            OverflowError: If the queue is full
+        """
+        topic = str(request.get("topic") or "").strip()
+        csv_path = str(request.get("csv") or "").strip()
+        if not topic or not csv_path:
+            raise ValueError("'topic' and 'csv' are required")
+        csv_path = os.path.abspath(csv_path)
+        if not os.path.exists(csv_path):
+            raise ValueError(f"CSV file not found: {csv_path}")
+
+        job_id = uuid.uuid4().hex[:12]
+        stem = os.path.splitext(os.path.basename(csv_path))[0]
+        output = self._output_path(str(request.get("output") or "").strip() or f"{job_id}_{stem}_report.md")
+        job = Job(
+            id=job_id,
+            topic=topic,
+            csv=csv_path,
+            output=output,
+            sequential=bool(request.get("sequential", False)),
+            dataset_profile=bool(request.get("dataset_profile", True)),
+        )
+        with self._lock:
+            if sum(1 for j in self.jobs.values() if j.status == "queued") >= self.max_queue:
+                raise OverflowError(f"Queue is full ({self.max_queue} jobs waiting)")
+            self.jobs[job_id] = job
+        job.emit({"event": "queued"})
+        self._executor.submit(self._run, job)
+        return job
+
+    def _output_path(self, output: str) -> str:
+        """
+        Resolve a requested report path inside the output directory.
+
+        Raises:
+            ValueError: If the path is absolute, is "-" or leaves the output directory
+        """
+        if output == "-" or os.path.isabs(output):
+            raise ValueError(f"'output' must be a path relative to the output directory: {output}")
+        root = os.path.realpath(self.output_dir)
+        path = os.path.realpath(os.path.join(root, output))
+        if os.path.commonpath([root, path]) != root or path == root:
+            raise ValueError(f"'output' must stay inside the output directory: {output}")
+        return path
+
+    def _evict(self) -> None:
+        """Drop the oldest finished jobs beyond keep_jobs, with their events."""
+        with self._lock:
+            finished = sorted((job for job in self.jobs.values() if job.done), key=lambda job: job.finished_at)
+            evicted = finished[:max(len(finished) - self.keep_jobs, 0)]
+            for job in evicted:
+                del self.jobs[job.id]
+        for job in evicted:
+            with job._changed:
+                job.events.clear()
+
+    def _run(self, job: Job) -> None:
+        job.started_at = time.time()
+        job.status = "running"
+        job.emit({"event": "started", "queue_seconds": round(job.started_at - job.submitted_at, 3)})
+        try:
+            result = run_analysis(job.topic, job.csv, job.output, llm=self.llm, sequential=job.sequential,
+                                  dataset_profile=job.dataset_profile, progress=job.emit)
+            job.turns = result.turns
+            job.finished_at = time.time()
+            job.status = "succeeded"
+            job.emit({"event": "succeeded", "output": result.output, "report_bytes": result.report_bytes,
+                      "latency_seconds": round(job.finished_at - job.submitted_at, 3)})
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.finished_at = time.time()
+            job.status = "failed"
+            job.emit({"event": "failed", "error": job.error})
+        finally:
+            self._evict()
+
+    def latency(self) -> dict:
+        """p50/p95 latency (submission to completion) of the finished jobs still kept."""
+        with self._lock:
+            latencies = [job.finished_at - job.submitted_at for job in self.jobs.values() if job.finished_at]
+        if not latencies:
+            return {"jobs": 0}
+        return {
+            "jobs": len(latencies),
+            "p50_seconds": round(float(np.percentile(latencies, 50)), 3),
+            "p95_seconds": round(float(np.percentile(latencies, 95)), 3),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """HTTP interface to the job queue (server.queue)."""
+
+    server_version = "AgenticDataScientist/1.0"
+
+    def address_string(self) -> str:
+        # Unix socket peers have no host address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, job: Job) -> None:
+        """Write the job's events as JSON lines until it finishes (HTTP/1.0: ends on close)."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        sent = 0
+        try:
+            while True:
+                events = job.wait_events(sent, HEARTBEAT_SECONDS)
+                lines = events or [{"event": "heartbeat", "job": job.id, "status": job.status}]
+                self.wfile.write("".join(json.dumps(e) + "\n" for e in lines).encode("utf-8"))
+                self.wfile.flush()
+                sent += len(events)
+                if job.done and sent == len(job.events):
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            # The caller stopped following; the job keeps running
+            return
+
+    def _job(self, job_id: str) -> Optional[Job]:
+        job = self.server.queue.jobs.get(job_id)
+        if job is None:
+            self._send_json(404, {"error": f"Unknown job: {job_id}"})
+        return job
+
+    def do_GET(self) -> None:
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+        queue = self.server.queue
+        if parts == ["health"]:
+            self._send_json(200, {
+                "status": "ok",
+                "workers": queue.workers,
+                "max_queue": queue.max_queue,
+                "jobs": queue.counts(),
+                "latency": queue.latency(),
+                "dataset_cache": dataset_cache.summary(),
+                "columnar_cache": columnar_cache.summary(),
+                "llm_cache": llm_cache.summary() if llm_cache_enabled() else "disabled",
+                "llm_routes": routing_metrics(),
+            })
+        elif parts == ["jobs"]:
+            self._send_json(200, [job.to_dict() for job in list(queue.jobs.values())])
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self._job(parts[1])
+            if job:
+                self._send_json(200, job.to_dict())
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            job = self._job(parts[1])
+            if job:
+                self._stream(job)
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "report":
+            job = self._job(parts[1])
+            if not job:
+                return
+            if job.status != "succeeded":
+                self._send_json(409, {"error": f"Job is {job.status}", "job": job.to_dict()})
+                return
+            with open(job.output, "rb") as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/markdown; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path.split("?")[0].rstrip("/") != "/jobs":
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("Request body must be a JSON object")
+            job = self.server.queue.submit(request)
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except OverflowError as e:
+            self._send_json(503, {"error": str(e)})
+            return
+        if request.get("stream"):
+            self._stream(job)
+        else:
+            self._send_json(202, job.to_dict())
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded HTTP server on a Unix domain socket."""
+    daemon_threads = True
+
+
+def main(argv: Optional[List[str]] = None):
+    """Server execution function."""
+    # Load environment variables
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(
+        description="Serve Multi-Agent Data Science Analysis jobs from a long-running process"
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"TCP port (default: {DEFAULT_PORT})")
+    parser.add_argument("--socket", type=str, default=None, help="Listen on this Unix socket instead of TCP")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("SERVER_WORKERS", DEFAULT_WORKERS)),
+        help=f"Number of jobs run concurrently (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=int(os.getenv("SERVER_MAX_QUEUE", DEFAULT_MAX_QUEUE)),
+        help=f"Jobs allowed to wait for a worker before new ones are refused (default: {DEFAULT_MAX_QUEUE})"
+    )
+    parser.add_argument(
+        "--keep-jobs",
+        type=int,
+        default=int(os.getenv("SERVER_KEEP_JOBS", DEFAULT_KEEP_JOBS)),
+        help=f"Finished jobs kept with their events before the oldest are dropped (default: {DEFAULT_KEEP_JOBS})"
+    )
+    parser.add_argument("--output-dir", type=str, default="reports",
+                        help="Directory all reports are written under; a job's output is relative to it "
+                             "(default: reports)")
+    parser.add_argument("--preload", type=str, nargs="*", default=[],
+                        help="Datasets to parse into the dataset cache at startup")
+    parser.add_argument("--verbose", action="store_true", help="Log every HTTP request")
+    args = parser.parse_args(argv)
+
+    if args.socket and not hasattr(socketserver, "UnixStreamServer"):
+        print("ERROR: Unix sockets are not available on this platform; use --port")
+        sys.exit(1)
+
+    # One LLM client shared by every agent of every job
+    llm = configure_llm()
+
+    for csv_path in args.preload:
+        start = time.perf_counter()
+        df = load_dataset(os.path.abspath(csv_path))
+        print(f"✓ Preloaded {csv_path} ({df.shape[0]:,} rows) in {time.perf_counter() - start:.2f}s")
+
+    queue = JobQueue(llm, max(args.workers, 1), max(args.max_queue, 0), args.output_dir,
+                     keep_jobs=max(args.keep_jobs, 0))
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        httpd = UnixHTTPServer(args.socket, AnalysisRequestHandler)
+        where = f"unix:{args.socket}"
+    else:
+        httpd = ThreadingHTTPServer((args.host, args.port), AnalysisRequestHandler)
+        where = f"http://{args.host}:{httpd.server_address[1]}"
+    httpd.queue = queue
+    httpd.verbose = args.verbose
+
+    print("=" * 80)
+    print("ANALYSIS SERVER")
+    print("=" * 80)
+    print(f"\n🌐 Listening on {where}")
+    print(f"⚙️  Workers: {queue.workers}, queue limit: {queue.max_queue}")
+    print(f"📝 Reports: {args.output_dir}\n", flush=True)
+
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        httpd.server_close()
+        queue.shutdown()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
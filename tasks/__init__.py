@@ -1,4 +1,4 @@
 """Tasks package initialization."""
-from tasks.task_definitions import create_tasks
+from tasks.task_definitions import PROMPT_VERSION, create_tasks
 
-__all__ = ['create_tasks']
+__all__ = ['PROMPT_VERSION', 'create_tasks']
@@ -3,7 +3,25 @@ from crewai import Task
 from typing import List
 
 
-def create_tasks(planner, analyst, modeler, writer, topic: str, csv_path: str) -> List[Task]:
+# Version of the task prompts; bump when a change makes earlier task outputs
+# unusable, so checkpointed runs are not resumed across it
+PROMPT_VERSION = 1
+
+
+def _profile_section(dataset_profile: str) -> str:
+    """Render a precomputed dataset profile as a task description section."""
+    if not dataset_profile:
+        return ""
+    return (
+        f"\n\nDATASET PROFILE (precomputed with the CSV Reader and Data Statistics tools; "
+        f"'num' rows list col|mean|std|min|q1|median|q3|max|missing|outliers, "
+        f"'cat' rows list col|cardinality|missing|top values):\n"
+        f"{dataset_profile}"
+    )
+
+
+def create_tasks(planner, analyst, modeler, writer, topic: str, csv_path: str,
+                 dataset_profile: str = "") -> List[Task]:
     """
     Create all tasks for the data science crew.
     
@@ -14,10 +32,30 @@ def create_tasks(planner, analyst, modeler, writer, topic: str, csv_path: str) -
         writer: Report Writer Agent
         topic: Business description/analysis objective
         csv_path: Path to the CSV dataset
+        dataset_profile: Optional precomputed dataset profile, embedded in the
+            planning, analysis and modeling tasks so the agents do not need
+            tool round trips to discover the data
         
     Returns:
         List of Task objects in execution order
     """
+    profile = _profile_section(dataset_profile)
+    
+    if dataset_profile:
+        steps_intro = "Using the dataset profile below (and your tools for drill-down):"
+        tool_instructions = (
+            f"The dataset profile below already covers the structure, statistical summaries "
+            f"and data quality checks. Start from it; call the CSV Reader and Data Statistics "
+            f"tools only to drill down into details the profile does not cover (pass the "
+            f"columns you need as `columns` so only those are read), and the "
+            f"Relationships tool (with the target column) for correlations and associations. "
+        )
+    else:
+        steps_intro = "Use your tools to:"
+        tool_instructions = (
+            f"Your analysis should be thorough and data-driven, using the CSV Reader, "
+            f"Data Statistics and Relationships tools to extract insights. "
+        )
     
     # Task 1: Planning
     planning_task = Task(
@@ -34,6 +72,7 @@ def create_tasks(planner, analyst, modeler, writer, topic: str, csv_path: str) -
             f"The plan should be actionable and guide the entire analysis process. "
             f"Consider the dataset located at: {csv_path}\n\n"
             f"Be thorough but concise. Focus on what's important for this specific project."
+            f"{profile}"
         ),
         expected_output=(
             "A detailed, structured work plan document (500-800 words) organized with clear sections:\n"
@@ -54,17 +93,19 @@ def create_tasks(planner, analyst, modeler, writer, topic: str, csv_path: str) -
     analysis_task = Task(
         description=(
             f"Perform comprehensive exploratory data analysis on the dataset at: {csv_path}\n\n"
-            f"Follow the work plan from the Project Planner. Use your tools to:\n"
+            f"Follow the work plan from the Project Planner. {steps_intro}\n"
             f"1. Read and understand the dataset structure (columns, data types, shape)\n"
             f"2. Compute detailed statistical summaries for all features\n"
-            f"3. Identify data quality issues (missing values, outliers, duplicates)\n"
+            f"3. Identify data quality issues (missing values, outliers, duplicates; pass "
+            f"ID-like columns as `duplicate_keys` to the Data Statistics tool to check they are unique)\n"
             f"4. Analyze distributions of key variables\n"
-            f"5. Identify potential relationships and patterns\n"
+            f"5. Identify potential relationships and patterns (correlations, associations "
+            f"between features, and the features most related to the target)\n"
             f"6. Highlight important features for modeling\n\n"
-            f"Your analysis should be thorough and data-driven, using the CSV Reader "
-            f"and Data Statistics tools to extract insights. Focus on findings that are "
+            f"{tool_instructions}Focus on findings that are "
             f"relevant to the business objective: {topic}\n\n"
             f"Provide both statistical rigor and practical insights."
+            f"{profile}"
         ),
         expected_output=(
             "A comprehensive EDA report (800-1200 words) structured as:\n"
@@ -93,8 +134,13 @@ def create_tasks(planner, analyst, modeler, writer, topic: str, csv_path: str) -
             f"4. Define comprehensive evaluation metrics for the problem type\n"
             f"5. Discuss expected model performance and limitations\n"
             f"6. Provide implementation considerations\n\n"
+            f"Train the baselines on the dataset at {csv_path} with the Baseline Training tool "
+            f"(pass the target column) and base the model comparison and the expected "
+            f"performance on its measured cross-validation metrics and training times, "
+            f"quoting them as measured.\n\n"
             f"Focus on simple, interpretable baseline models that can be implemented quickly "
             f"and serve as benchmarks. Consider the data characteristics revealed in the EDA."
+            f"{profile}"
         ),
         expected_output=(
             "A structured modeling recommendation document (600-900 words) containing:\n"
@@ -109,7 +155,8 @@ def create_tasks(planner, analyst, modeler, writer, topic: str, csv_path: str) -
             "  * Secondary metrics\n"
             "  * Rationale for metric selection\n"
             "- Implementation Considerations\n"
-            "- Expected Performance Range\n\n"
+            "- Expected Performance Range (measured cross-validation metrics and training "
+            "times of the trained baselines)\n\n"
             "Provide clear, actionable recommendations grounded in ML best practices."
         ),
         agent=modeler,
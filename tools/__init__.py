@@ -1,5 +1,30 @@
-"""Custom tools initialization."""
-from tools.csv_reader_tool import csv_reader_tool
-from tools.data_stats_tool import data_stats_tool
+"""Custom tools initialization.
 
-__all__ = ['csv_reader_tool', 'data_stats_tool']
+The tools import crewai and pandas; they are loaded on first use.
+"""
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from tools.baseline_training_tool import baseline_training_tool
+    from tools.csv_reader_tool import csv_reader_tool
+    from tools.data_stats_tool import data_stats_tool
+    from tools.relationships_tool import relationships_tool
+
+# Public name -> defining module, imported on first access
+_EXPORTS = {
+    'baseline_training_tool': 'tools.baseline_training_tool',
+    'csv_reader_tool': 'tools.csv_reader_tool',
+    'data_stats_tool': 'tools.data_stats_tool',
+    'relationships_tool': 'tools.relationships_tool'
+}
+
+__all__ = ['baseline_training_tool', 'csv_reader_tool', 'data_stats_tool', 'relationships_tool']
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,162 @@
+"""BaselineTrainingTool - Trains and cross-validates baseline models on a dataset."""
+from crewai.tools import tool
+from dataclasses import replace
+import os
+
+from tools.baselines import (
+    METRIC_LABELS, BaselineReport, parse_candidates, resolve_folds, resolve_sample_rows,
+    resolve_time_budget, train_baselines
+)
+from tools.compact_output import baselines_payload, render_within_budget, resolve_output_format, resolve_token_budget
+from tools.dataset_cache import dataset_cache
+from tools.sample_budget import SampleBudget
+from tools.sampling import draw_sample
+from tools.streaming_stats import should_stream
+from tools.tool_schema import optional_args
+
+
+@optional_args
+@tool("Baseline Training")
+def baseline_training_tool(csv_path: str, target: str, models: str = "", problem: str = "",
+                           time_budget: int = 0, sample_rows: int = 0, output_format: str = "",
+                           token_budget: int = 0) -> str:
+    """
+    Trains baseline models on the actual dataset and measures their performance.
+    Cross-validates logistic regression (ridge regression for numeric targets),
+    a decision tree, a random forest and gradient boosting in parallel worker
+    processes within a wall-clock budget, dropping the weaker half of the
+    models after each round of successive halving.
+    Returns measured metrics (mean ± std across folds) and training times.
+    Use this tool to ground model recommendations and expected performance in
+    measured results instead of estimates.
+
+    Args:
+        csv_path: Path to the dataset file (CSV, gzip/zstd CSV, Parquet or Feather)
+        target: Column to predict
+        models: Comma-separated subset of linear, decision_tree, random_forest,
+            gradient_boosting (empty for all)
+        problem: "classification" or "regression" (empty to detect from the target)
+        time_budget: Wall-clock budget in seconds (0 uses BASELINE_TIME_BUDGET)
+        sample_rows: Maximum rows trained on (0 uses BASELINE_SAMPLE_ROWS)
+        output_format: "text" (default report), "json" (dense JSON) or
+            "compact" (terse table); empty uses TOOL_OUTPUT_FORMAT
+        token_budget: Maximum tokens for json/compact output (0 uses TOOL_TOKEN_BUDGET)
+
+    Returns:
+        String containing the measured baseline performance
+    """
+    try:
+        # Check if file exists
+        if not os.path.exists(csv_path):
+            return f"Error: File not found at path: {csv_path}"
+        if not target:
+            return "Error: A target column is required"
+
+        output_format = resolve_output_format(output_format)
+        report = run_baselines(csv_path, target=target, models=models, problem=problem,
+                               time_budget=time_budget, sample_rows=sample_rows)
+
+        text = format_baselines(report)
+        if output_format == "text":
+            return text
+        return render_within_budget(baselines_payload(report), output_format,
+                                    resolve_token_budget(token_budget), text)
+
+    except Exception as e:
+        return f"Error training baselines: {str(e)}"
+
+
+def run_baselines(csv_path: str, target: str, models: str = "", problem: str = "",
+                  time_budget: int = 0, sample_rows: int = 0) -> BaselineReport:
+    """
+    Train the baseline models on a file, once per file version and settings.
+
+    Files that fit in memory go through the shared dataset cache and the
+    result is kept with the cached dataset; larger files are sampled in one
+    chunked pass.
+
+    Args:
+        csv_path: Path to the dataset file
+        target: Target column
+        models: Comma-separated candidate names (empty for all)
+        problem: "classification" or "regression" (empty to detect)
+        time_budget: Wall-clock budget in seconds (0 uses BASELINE_TIME_BUDGET)
+        sample_rows: Maximum rows trained on (0 uses BASELINE_SAMPLE_ROWS)
+
+    Returns:
+        BaselineReport for the file
+    """
+    candidates = parse_candidates(models)
+    time_budget = resolve_time_budget(time_budget)
+    sample_rows = resolve_sample_rows(sample_rows)
+    options = dict(candidates=candidates, problem=problem, time_budget=time_budget,
+                   sample_rows=sample_rows, folds=resolve_folds())
+
+    if should_stream(csv_path):
+        drawn = draw_sample(csv_path, SampleBudget(rows=sample_rows))
+        return train_baselines(drawn.df, target, path=csv_path, n_rows=drawn.total_rows, **options)
+
+    report = dataset_cache.derived(
+        csv_path, f"baselines:{target}:{','.join(candidates)}:{problem}:{time_budget:g}:{sample_rows}",
+        lambda df: train_baselines(df, target, path=csv_path, **options)
+    )
+    return replace(report, path=csv_path)
+
+
+def _metric(result, name: str) -> str:
+    if name not in result.metrics:
+        return "n/a"
+    return f"{result.metrics[name]:.4f} ± {result.metrics_std[name]:.4f}"
+
+
+def format_baselines(report: BaselineReport) -> str:
+    """
+    Render a BaselineReport as the Baseline Training text report.
+
+    Args:
+        report: Measured baseline performance for one dataset
+
+    Returns:
+        String containing the measured baseline performance
+    """
+    output = []
+    output.append("=" * 80)
+    output.append("BASELINE MODEL TRAINING")
+    output.append("=" * 80)
+    output.append(f"\nDataset: {report.path}")
+    output.append(f"Target: {report.target} ({report.problem})")
+    output.append(f"Total Records: {report.n_rows:,}")
+    if report.sampled:
+        output.append(f"Mode: sampled ({report.sample_rows:,} random rows)")
+    output.append(f"Features: {len(report.numeric_features)} numeric, "
+                  f"{len(report.categorical_features)} categorical")
+    output.append(f"Validation: {report.folds}-fold cross-validation; successive halving over "
+                  f"{' → '.join(f'{rows:,}' for rows in report.round_rows)} rows")
+    output.append(f"Run: {report.seconds:.1f}s of a {report.time_budget:.0f}s budget on "
+                  f"{report.workers} CPU worker process(es)")
+    for note in report.notes:
+        output.append(note)
+
+    output.append("\n" + "=" * 80)
+    output.append(f"RESULTS (ranked by {METRIC_LABELS[report.primary_metric]})")
+    output.append("=" * 80)
+    for idx, result in enumerate(report.candidates, 1):
+        output.append(f"\n{idx}. {result.label} [{result.status}]")
+        if result.error:
+            output.append(f"  Error: {result.error}")
+        if not result.metrics:
+            output.append("  No fold finished within the time budget")
+            continue
+        output.append(f"  Evaluated on: {result.rows:,} rows (round {result.round}, {result.folds} folds)")
+        for name in result.metrics:
+            output.append(f"  {METRIC_LABELS[name]}: {_metric(result, name)}")
+        output.append(f"  Training time: {result.fit_seconds:.2f}s per fold "
+                      f"(prediction {result.predict_seconds:.2f}s)")
+
+    if report.reference:
+        output.append("\nReference (constant prediction): " + ", ".join(
+            f"{METRIC_LABELS[name]} {value:.4f}" for name, value in report.reference.items()
+        ))
+    output.append("\n" + "=" * 80)
+
+    return "\n".join(output)
@@ -0,0 +1,582 @@
+"""Cross-validated baseline models behind the Baseline Training tool.
+
+Four scikit-learn baselines are trained on the actual dataset: a linear
+model (logistic regression, or ridge regression for numeric targets), a
+decision tree, a random forest and histogram gradient boosting. Every
+(model, fold) fit is an independent task fanned out over a process pool,
+and the run is bounded by a wall-clock budget: when it runs out, the pool is
+terminated and each model keeps the results of its last completed round.
+
+Candidates are compared by successive halving. The first round
+cross-validates every model on a fraction of the rows; only the better half
+moves on to the next round, which uses HALVING_FACTOR times as many rows,
+until MIN_FINALISTS models are cross-validated on the full sample. Weak
+models are thus dropped after their cheapest fits. Everything runs on the
+CPU, with one BLAS thread per worker process.
+"""
+from dataclasses import dataclass, field
+import math
+import multiprocessing
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+from tools.relationships import ID_LIKE_RATIO, is_row_index, sample_frame
+
+
+CANDIDATES = ("linear", "decision_tree", "random_forest", "gradient_boosting")
+
+CANDIDATE_LABELS = {
+    "classification": {
+        "linear": "Logistic regression",
+        "decision_tree": "Decision tree",
+        "random_forest": "Random forest",
+        "gradient_boosting": "Gradient boosting (histogram)",
+    },
+    "regression": {
+        "linear": "Ridge regression",
+        "decision_tree": "Decision tree",
+        "random_forest": "Random forest",
+        "gradient_boosting": "Gradient boosting (histogram)",
+    },
+}
+
+PROBLEM_TYPES = ("classification", "regression")
+
+# Defaults, overridable via BASELINE_TIME_BUDGET, BASELINE_WORKERS,
+# BASELINE_SAMPLE_ROWS and BASELINE_FOLDS
+DEFAULT_TIME_BUDGET = 120.0
+DEFAULT_SAMPLE_ROWS = 50_000
+DEFAULT_FOLDS = 5
+
+# Each successive-halving round keeps 1/HALVING_FACTOR of the models and
+# gives them HALVING_FACTOR times as many rows, down to MIN_FINALISTS models
+HALVING_FACTOR = 2
+MIN_FINALISTS = 2
+
+# First-round fits use at least this many rows
+MIN_ROUND_ROWS = 1_000
+
+# Integer targets with at most this many distinct values are classes
+MAX_CLASSES = 20
+
+# Category levels one-hot encoded per column; rarer ones share a level
+MAX_LEVELS = 50
+
+# Text columns whose non-missing values parse as numbers at this rate are numeric
+NUMERIC_PARSE_RATIO = 0.95
+
+METRIC_LABELS = {
+    "roc_auc": "ROC AUC",
+    "f1": "F1",
+    "f1_macro": "F1 (macro)",
+    "accuracy": "Accuracy",
+    "r2": "R²",
+    "rmse": "RMSE",
+    "mae": "MAE",
+}
+
+# Metrics where lower is better
+LOWER_IS_BETTER = ("rmse", "mae")
+
+
+@dataclass
+class CandidateResult:
+    """Cross-validated result of one baseline model."""
+    name: str
+    label: str
+    # "finalist" (completed the last round), "stopped early" (still in the
+    # running when the budget ran out), "dropped", "timed out" or "failed"
+    status: str
+    # Round reached and rows cross-validated in it (0 rows: none)
+    round: int = 0
+    rows: int = 0
+    folds: int = 0
+    # Mean and standard deviation across folds of each metric
+    metrics: Dict[str, float] = field(default_factory=dict)
+    metrics_std: Dict[str, float] = field(default_factory=dict)
+    # Mean seconds per fold
+    fit_seconds: float = 0.0
+    predict_seconds: float = 0.0
+    error: str = ""
+
+
+@dataclass
+class BaselineReport:
+    """Measured baseline performance on one dataset."""
+    path: str
+    target: str
+    problem: str
+    primary_metric: str
+    n_rows: int
+    sample_rows: int
+    numeric_features: List[str]
+    categorical_features: List[str]
+    folds: int
+    workers: int
+    time_budget: float
+    seconds: float
+    # Rows per cross-validated fit in each successive-halving round
+    round_rows: List[int]
+    # Best first, then by the round each model reached
+    candidates: List[CandidateResult]
+    # Score of a constant prediction, for scale
+    reference: Dict[str, float] = field(default_factory=dict)
+    notes: List[str] = field(default_factory=list)
+
+    @property
+    def sampled(self) -> bool:
+        return self.sample_rows < self.n_rows
+
+
+def resolve_time_budget(time_budget: float = 0) -> float:
+    """Return the wall-clock budget in seconds, falling back to BASELINE_TIME_BUDGET."""
+    return float(time_budget or os.getenv("BASELINE_TIME_BUDGET", DEFAULT_TIME_BUDGET))
+
+
+def resolve_workers(workers: int = 0) -> int:
+    """Return the worker process count, falling back to BASELINE_WORKERS (0 = one per CPU)."""
+    workers = int(workers or os.getenv("BASELINE_WORKERS", 0))
+    return workers if workers > 0 else os.cpu_count() or 1
+
+
+def resolve_sample_rows(sample_rows: int = 0) -> int:
+    """Return the maximum rows trained on, falling back to BASELINE_SAMPLE_ROWS."""
+    return int(sample_rows or os.getenv("BASELINE_SAMPLE_ROWS", DEFAULT_SAMPLE_ROWS))
+
+
+def resolve_folds(folds: int = 0) -> int:
+    """Return the cross-validation fold count, falling back to BASELINE_FOLDS."""
+    return max(int(folds or os.getenv("BASELINE_FOLDS", DEFAULT_FOLDS)), 2)
+
+
+def parse_candidates(spec) -> List[str]:
+    """
+    Parse a candidate list.
+
+    Args:
+        spec: Comma-separated names (see CANDIDATES), a list, or empty for all
+
+    Returns:
+        Candidate names in CANDIDATES order
+
+    Raises:
+        ValueError: If a name is not a known candidate
+    """
+    if not spec:
+        return list(CANDIDATES)
+    names = spec.split(",") if isinstance(spec, str) else spec
+    names = [name.strip().lower() for name in names if name.strip()]
+    unknown = [name for name in names if name not in CANDIDATES]
+    if unknown:
+        raise ValueError(f"Unknown model(s): {', '.join(unknown)} (expected: {', '.join(CANDIDATES)})")
+    return [name for name in CANDIDATES if name in names]
+
+
+def detect_problem(y: pd.Series) -> str:
+    """Return "classification" for labels and small sets of integer codes, else "regression"."""
+    if is_bool_dtype(y) or not is_numeric_dtype(y):
+        return "classification"
+    values = y.dropna()
+    if values.nunique() <= MAX_CLASSES and np.all(np.mod(values, 1) == 0):
+        return "classification"
+    return "regression"
+
+
+def prepare_features(df: pd.DataFrame, target: str,
+                     n_rows: Optional[int] = None) -> Tuple[pd.DataFrame, List[str], List[str], List[str]]:
+    """
+    Select and type the feature columns.
+
+    Text columns that are almost entirely numbers (e.g. totals with a few
+    blank cells) become numeric; identifier-like text columns, integer row
+    numbers or sequential IDs and empty columns are dropped.
+
+    Args:
+        df: Dataset including the target column
+        target: Target column
+        n_rows: Row count of the full dataset when df is a sample
+
+    Returns:
+        Tuple of (features, numeric columns, categorical columns, dropped columns)
+    """
+    features = {}
+    numeric, categorical, dropped = [], [], []
+    for col in df.columns:
+        if col == target:
+            continue
+        values = df[col]
+        present = int(values.notna().sum())
+        if present == 0:
+            dropped.append(col)
+            continue
+        if is_bool_dtype(values):
+            values = values.astype(float)
+        elif is_row_index(values, n_rows):
+            dropped.append(col)
+            continue
+        elif not is_numeric_dtype(values):
+            parsed = pd.to_numeric(values, errors="coerce")
+            if parsed.notna().sum() >= NUMERIC_PARSE_RATIO * present:
+                values = parsed
+            elif values.nunique() > ID_LIKE_RATIO * len(values):
+                dropped.append(col)
+                continue
+            else:
+                features[col] = values.astype(str).where(values.notna(), np.nan)
+                categorical.append(col)
+                continue
+        features[col] = values
+        numeric.append(col)
+    return pd.DataFrame(features, index=df.index), numeric, categorical, dropped
+
+
+def build_model(name: str, problem: str, numeric: Sequence[str], categorical: Sequence[str], seed: int = 0):
+    """
+    Build the scikit-learn pipeline of one candidate.
+
+    Numeric columns are median-imputed (and standardized for the linear
+    model); categorical columns are one-hot encoded with rare levels pooled.
+
+    Args:
+        name: Candidate name (see CANDIDATES)
+        problem: "classification" or "regression"
+        numeric: Numeric feature columns
+        categorical: Categorical feature columns
+        seed: Random seed of the stochastic models
+
+    Returns:
+        Unfitted sklearn Pipeline
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import (
+        HistGradientBoostingClassifier, HistGradientBoostingRegressor,
+        RandomForestClassifier, RandomForestRegressor
+    )
+    from sklearn.impute import SimpleImputer
+    from sklearn.linear_model import LogisticRegression, Ridge
+    from sklearn.pipeline import Pipeline, make_pipeline
+    from sklearn.preprocessing import OneHotEncoder, StandardScaler
+    from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+    classification = problem == "classification"
+    models = {
+        "linear": lambda: LogisticRegression(max_iter=1000) if classification else Ridge(),
+        "decision_tree": lambda: (DecisionTreeClassifier if classification else DecisionTreeRegressor)(
+            max_depth=8, min_samples_leaf=5, random_state=seed),
+        "random_forest": lambda: (RandomForestClassifier if classification else RandomForestRegressor)(
+            n_estimators=100, min_samples_leaf=2, n_jobs=1, random_state=seed),
+        "gradient_boosting": lambda: (HistGradientBoostingClassifier if classification
+                                      else HistGradientBoostingRegressor)(random_state=seed),
+    }
+    numeric_steps = [SimpleImputer(strategy="median")]
+    if name == "linear":
+        numeric_steps.append(StandardScaler())
+    preprocess = ColumnTransformer([
+        ("numeric", make_pipeline(*numeric_steps), list(numeric)),
+        ("categorical", make_pipeline(
+            SimpleImputer(strategy="constant", fill_value="(missing)"),
+            OneHotEncoder(handle_unknown="infrequent_if_exist", max_categories=MAX_LEVELS)
+        ), list(categorical)),
+    ])
+    return Pipeline([("preprocess", preprocess), ("model", models[name]())])
+
+
+def score(problem: str, y_true: np.ndarray, y_pred: np.ndarray, proba: Optional[np.ndarray],
+          classes: Sequence, pos_label=None) -> Dict[str, float]:
+    """
+    Compute the metrics of one fold.
+
+    Args:
+        problem: "classification" or "regression"
+        y_true: True targets
+        y_pred: Predicted targets
+        proba: Predicted class probabilities (classification), columns in classes order
+        classes: Class labels in the model's order
+        pos_label: Positive class of a binary problem
+
+    Returns:
+        Dictionary of metric name to value
+    """
+    from sklearn import metrics
+
+    if problem == "regression":
+        return {
+            "r2": float(metrics.r2_score(y_true, y_pred)),
+            "rmse": float(math.sqrt(metrics.mean_squared_error(y_true, y_pred))),
+            "mae": float(metrics.mean_absolute_error(y_true, y_pred)),
+        }
+    result = {"accuracy": float(metrics.accuracy_score(y_true, y_pred))}
+    if len(classes) == 2:
+        result["f1"] = float(metrics.f1_score(y_true, y_pred, pos_label=pos_label, zero_division=0))
+        if proba is not None:
+            positive = list(classes).index(pos_label)
+            result["roc_auc"] = float(metrics.roc_auc_score(y_true == pos_label, proba[:, positive]))
+    else:
+        result["f1_macro"] = float(metrics.f1_score(y_true, y_pred, average="macro", zero_division=0))
+        if proba is not None and set(np.unique(y_true)) == set(classes):
+            result["roc_auc"] = float(metrics.roc_auc_score(y_true, proba, multi_class="ovr", labels=list(classes)))
+    return result
+
+
+def primary_metric(problem: str, n_classes: int) -> str:
+    """Return the metric candidates are ranked by."""
+    if problem == "regression":
+        return "r2"
+    return "roc_auc" if n_classes == 2 else "f1_macro"
+
+
+# Worker-process state, set once per process by _init_worker
+_worker = {}
+
+
+def _init_worker(features: pd.DataFrame, y: np.ndarray, problem: str, numeric: List[str],
+                 categorical: List[str], pos_label) -> None:
+    from threadpoolctl import threadpool_limits
+
+    # One process per core already; nested BLAS threads would oversubscribe
+    threadpool_limits(1)
+    _worker.update(features=features, y=y, problem=problem, numeric=numeric,
+                   categorical=categorical, pos_label=pos_label)
+
+
+def _fit_fold(name: str, train_idx: np.ndarray, test_idx: np.ndarray) -> dict:
+    """Fit one candidate on one fold in a worker process and score it."""
+    features, y, problem = _worker["features"], _worker["y"], _worker["problem"]
+    model = build_model(name, problem, _worker["numeric"], _worker["categorical"])
+    start = time.perf_counter()
+    model.fit(features.iloc[train_idx], y[train_idx])
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    X_test = features.iloc[test_idx]
+    y_pred = model.predict(X_test)
+    proba = model.predict_proba(X_test) if problem == "classification" else None
+    predict_seconds = time.perf_counter() - start
+    classes = list(model.classes_) if problem == "classification" else []
+    return {
+        "metrics": score(problem, y[test_idx], y_pred, proba, classes, _worker["pos_label"]),
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+    }
+
+
+def _round_sizes(n_rows: int, n_candidates: int) -> List[int]:
+    """Rows per round: the last round uses every row, earlier ones 1/HALVING_FACTOR as many each."""
+    rounds, alive = 1, n_candidates
+    while alive > MIN_FINALISTS:
+        alive = max(math.ceil(alive / HALVING_FACTOR), MIN_FINALISTS)
+        rounds += 1
+    sizes = [max(n_rows // HALVING_FACTOR ** (rounds - 1 - r), min(MIN_ROUND_ROWS, n_rows)) for r in range(rounds)]
+    # Rounds that would not add rows are merged into the next one
+    return sorted(set(sizes))
+
+
+def _folds(problem: str, y: np.ndarray, n_folds: int, seed: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    from sklearn.model_selection import KFold, StratifiedKFold
+
+    if problem == "classification":
+        splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+        return list(splitter.split(np.zeros(len(y)), y))
+    splitter = KFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    return list(splitter.split(np.zeros(len(y))))
+
+
+def _summarize(result: CandidateResult, fold_results: List[dict], round_index: int, rows: int) -> None:
+    names = fold_results[0]["metrics"].keys()
+    result.metrics = {m: float(np.mean([r["metrics"][m] for r in fold_results])) for m in names}
+    result.metrics_std = {m: float(np.std([r["metrics"][m] for r in fold_results])) for m in names}
+    result.fit_seconds = float(np.mean([r["fit_seconds"] for r in fold_results]))
+    result.predict_seconds = float(np.mean([r["predict_seconds"] for r in fold_results]))
+    result.round, result.rows, result.folds = round_index, rows, len(fold_results)
+
+
+def _reference(problem: str, y: np.ndarray) -> Dict[str, float]:
+    """Scores of a constant prediction (majority class, or the mean)."""
+    if problem == "regression":
+        return {"r2": 0.0, "rmse": float(np.std(y)), "mae": float(np.mean(np.abs(y - np.median(y))))}
+    _, counts = np.unique(y, return_counts=True)
+    reference = {"accuracy": float(counts.max() / counts.sum())}
+    if len(counts) == 2:
+        reference["roc_auc"] = 0.5
+    return reference
+
+
+def train_baselines(df: pd.DataFrame, target: str, path: str = "", candidates: Sequence[str] = None,
+                    problem: str = "", time_budget: float = 0, workers: int = 0, sample_rows: int = 0,
+                    folds: int = 0, n_rows: int = None, seed: int = 0) -> BaselineReport:
+    """
+    Cross-validate the baseline models on a dataset by successive halving.
+
+    Args:
+        df: The dataset (or a uniform sample of it), including the target
+        target: Target column
+        path: Source path, carried through to the report
+        candidates: Models to train (None for all of CANDIDATES)
+        problem: "classification" or "regression" (empty to detect from the target)
+        time_budget: Wall-clock budget in seconds (0 uses BASELINE_TIME_BUDGET)
+        workers: Worker processes (0 uses BASELINE_WORKERS, then one per CPU)
+        sample_rows: Maximum rows trained on (0 uses BASELINE_SAMPLE_ROWS)
+        folds: Cross-validation folds (0 uses BASELINE_FOLDS)
+        n_rows: Rows in the full dataset when df is a sample
+        seed: Random seed for the sample, the folds and the models
+
+    Returns:
+        BaselineReport with the measured metrics and training times
+
+    Raises:
+        ValueError: If the target is missing or has too few rows or classes
+    """
+    start = time.perf_counter()
+    if target not in df.columns:
+        raise ValueError(f"Target column '{target}' not found")
+    candidates = parse_candidates(candidates)
+    time_budget = resolve_time_budget(time_budget)
+    n_folds = resolve_folds(folds)
+    notes = []
+
+    total_rows = len(df) if n_rows is None else n_rows
+    data = df[df[target].notna()]
+    if len(data) < len(df):
+        notes.append(f"Dropped {len(df) - len(data):,} rows with a missing target")
+    data = sample_frame(data, resolve_sample_rows(sample_rows), seed=seed)
+    # Shuffle once, so every round trains on a uniform prefix
+    data = data.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+    problem = problem or detect_problem(data[target])
+    if problem not in PROBLEM_TYPES:
+        raise ValueError(f"problem must be one of {', '.join(PROBLEM_TYPES)}, got '{problem}'")
+    if problem == "classification":
+        labels = data[target].astype(str) if not is_numeric_dtype(data[target]) else data[target]
+        counts = labels.value_counts()
+        rare = counts[counts < n_folds]
+        if len(rare):
+            notes.append(f"Dropped classes with fewer than {n_folds} rows: {', '.join(map(str, rare.index))}")
+            keep = ~labels.isin(rare.index)
+            data, labels, counts = data[keep].reset_index(drop=True), labels[keep], counts.drop(rare.index)
+        if len(counts) < 2:
+            raise ValueError(f"Target '{target}' needs at least two classes with {n_folds} rows each")
+        y = labels.to_numpy()
+        # The minority class of a binary target is the positive one (churn, fraud, ...)
+        pos_label = counts.index[-1] if len(counts) == 2 else None
+    else:
+        y = data[target].to_numpy(dtype=np.float64)
+        pos_label = None
+        counts = None
+    if len(y) < 2 * n_folds:
+        raise ValueError(f"Too few rows with a target value to cross-validate ({len(y)})")
+
+    features, numeric, categorical, dropped = prepare_features(data, target, n_rows=total_rows)
+    if dropped:
+        notes.append(f"Not used as features (identifier-like or empty): {', '.join(dropped)}")
+    if not numeric and not categorical:
+        raise ValueError("No usable feature columns")
+
+    metric = primary_metric(problem, len(counts) if counts is not None else 0)
+    labels_for = CANDIDATE_LABELS[problem]
+    results = {name: CandidateResult(name=name, label=labels_for[name], status="finalist") for name in candidates}
+    round_rows = _round_sizes(len(y), len(candidates))
+    n_workers = min(resolve_workers(workers), len(candidates) * n_folds)
+    deadline = start + time_budget
+
+    alive = list(candidates)
+    alive_before = alive
+    completed_rounds = []
+    # spawn: callers (the job server, batch runs) are multi-threaded, which fork does not survive
+    context = multiprocessing.get_context("spawn")
+    pool = context.Pool(n_workers, initializer=_init_worker,
+                        initargs=(features, y, problem, numeric, categorical, pos_label))
+    try:
+        for round_index, rows in enumerate(round_rows):
+            if round_index and completed_rounds:
+                # Skip a round that cannot finish in the remaining time, judged by the last one
+                last_seconds, last_rows = completed_rounds[-1]
+                projected = last_seconds * rows / last_rows * len(alive) / max(len(alive_before), 1)
+                if time.perf_counter() + projected > deadline:
+                    notes.append(f"Stopped before round {round_index + 1}: projected {projected:.0f}s "
+                                 f"exceeds the remaining budget")
+                    break
+            round_start = time.perf_counter()
+            splits = _folds(problem, y[:rows], n_folds, seed)
+            # Fold-major order, so every model has some folds done if the budget runs out
+            pending = {
+                (name, fold): pool.apply_async(_fit_fold, (name, train_idx, test_idx))
+                for fold, (train_idx, test_idx) in enumerate(splits) for name in alive
+            }
+            done: Dict[str, List[dict]] = {name: [] for name in alive}
+            while pending and time.perf_counter() < deadline:
+                for key, job in list(pending.items()):
+                    if job.ready():
+                        del pending[key]
+                        try:
+                            done[key[0]].append(job.get())
+                        except Exception as e:
+                            results[key[0]].status, results[key[0]].error = "failed", str(e)
+                time.sleep(0.02)
+
+            finished = [name for name in alive if results[name].status != "failed"
+                        and len(done[name]) == n_folds]
+            for name in alive:
+                if name in finished:
+                    _summarize(results[name], done[name], round_index + 1, rows)
+                elif results[name].status != "failed":
+                    results[name].status = "timed out"
+                    # Partial folds are better than nothing, not better than a whole earlier round
+                    if done[name] and not results[name].rows:
+                        _summarize(results[name], done[name], round_index + 1, rows)
+            if pending:
+                notes.append(f"Time budget of {time_budget:.0f}s ran out during round {round_index + 1}")
+                break
+
+            alive_before = alive
+            completed_rounds.append((time.perf_counter() - round_start, rows))
+            if round_index + 1 < len(round_rows):
+                keep = max(math.ceil(len(finished) / HALVING_FACTOR), min(MIN_FINALISTS, len(finished)))
+                ranked = _rank([results[name] for name in finished], metric)
+                alive = [result.name for result in ranked[:keep]]
+                for result in ranked[keep:]:
+                    result.status = "dropped"
+            else:
+                alive = finished
+    finally:
+        pool.terminate()
+        pool.join()
+
+    for result in results.values():
+        if result.status == "finalist" and result.round < len(round_rows):
+            result.status = "stopped early"
+
+    if len(y) < total_rows:
+        notes.append(f"Trained on a uniform sample of {len(y):,} of {total_rows:,} rows")
+    return BaselineReport(
+        path=path,
+        target=target,
+        problem=problem,
+        primary_metric=metric,
+        n_rows=total_rows,
+        sample_rows=len(y),
+        numeric_features=numeric,
+        categorical_features=categorical,
+        folds=n_folds,
+        workers=n_workers,
+        time_budget=time_budget,
+        seconds=time.perf_counter() - start,
+        round_rows=round_rows,
+        candidates=_rank(list(results.values()), metric),
+        reference=_reference(problem, y),
+        notes=notes,
+    )
+
+
+def _rank(results: List[CandidateResult], metric: str) -> List[CandidateResult]:
+    """Order results by the round reached, then by the primary metric."""
+    sign = 1 if metric in LOWER_IS_BETTER else -1
+
+    def key(result: CandidateResult):
+        value = result.metrics.get(metric)
+        return (-result.round, sign * value if value is not None else math.inf)
+
+    return sorted(results, key=key)
@@ -0,0 +1,298 @@
+"""Persistent columnar sidecars with compact dtypes for parsed datasets.
+
+The first load of a CSV infers compact dtypes (categoricals for low-cardinality
+strings, Arrow-backed strings for the rest, downcast integers and lossless
+float downcasts) and writes the result as an uncompressed Arrow IPC file keyed
+by the CSV's content hash. Later loads memory-map that file instead of parsing
+text, in this process or any later run. The least recently used sidecars are
+evicted once the directory exceeds its size budget.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from tools.dataset_io import check_columns, read_table
+
+
+# Directory holding sidecar files and their size budget (overridable via
+# DATASET_SIDECAR_DIR and DATASET_SIDECAR_MAX_MB)
+DEFAULT_SIDECAR_DIR = ".dataset_cache"
+DEFAULT_SIDECAR_MAX_MB = 4096
+
+# File stats remembered in index.json (oldest dropped first)
+MAX_INDEX_ENTRIES = 1024
+
+# String columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+# Bump when the conversion rules change so old sidecars are not reused
+SIDECAR_FORMAT_VERSION = 2
+
+HASH_BLOCK_BYTES = 8 * 1024 * 1024
+
+
+def sidecars_enabled() -> bool:
+    """Return True unless sidecars are disabled via DATASET_SIDECAR=false."""
+    return os.getenv("DATASET_SIDECAR", "true").lower() != "false"
+
+
+def sidecar_dir() -> str:
+    """Return the directory that holds sidecar files."""
+    return os.getenv("DATASET_SIDECAR_DIR", DEFAULT_SIDECAR_DIR)
+
+
+def arrow_errors() -> tuple:
+    """Return the exceptions raised when Arrow cannot convert or read a table."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return (ValueError,)
+    return (pa.ArrowException, ValueError)
+
+
+def hash_file(path: str) -> str:
+    """Return the BLAKE2b content hash of a file (hex, 128-bit)."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(HASH_BLOCK_BYTES)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert columns to compact dtypes.
+
+    - integers are downcast to the smallest integer type that holds them
+    - floats are downcast to float32 only when that is lossless
+    - strings become categoricals when at most CATEGORY_MAX_RATIO of the
+      values are distinct, and Arrow-backed strings otherwise
+
+    Object columns mixing strings with other values are left as they are.
+    Date strings stay strings, so the data tools keep reporting them as
+    categorical columns.
+
+    Args:
+        df: The parsed dataset
+
+    Returns:
+        A new DataFrame with compact dtypes
+    """
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_integer_dtype(series.dtype):
+            converted[col] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series.dtype):
+            narrow = series.astype(np.float32)
+            lossless = np.array_equal(narrow.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True)
+            converted[col] = narrow if lossless else series
+        elif series.dtype == object:
+            converted[col] = _optimize_strings(series)
+        else:
+            converted[col] = series
+    return pd.DataFrame(converted, index=df.index)
+
+
+def _optimize_strings(series: pd.Series) -> pd.Series:
+    if pd.api.types.infer_dtype(series, skipna=True) != "string":
+        return series
+
+    # One hashing pass yields both the cardinality and the category codes
+    codes, uniques = pd.factorize(series)
+    if len(uniques) <= len(series) * CATEGORY_MAX_RATIO:
+        return pd.Series(pd.Categorical.from_codes(codes, categories=uniques), index=series.index, name=series.name)
+    return series.astype("string[pyarrow]")
+
+
+class ColumnarCache:
+    """
+    Content-addressed store of dtype-optimized datasets as Arrow IPC sidecars.
+
+    Keeps counters of conversions, sidecar hits, memory saved by the compact
+    dtypes and parse time saved by loading sidecars instead of CSV text.
+    """
+
+    def __init__(self, directory: str = None, max_size_bytes: int = None):
+        """
+        Args:
+            directory: Sidecar directory (defaults to DATASET_SIDECAR_DIR)
+            max_size_bytes: Size budget for all sidecars. Defaults to
+                DATASET_SIDECAR_MAX_MB (in megabytes) or DEFAULT_SIDECAR_MAX_MB.
+        """
+        self.directory = directory or sidecar_dir()
+        if max_size_bytes is None:
+            max_mb = float(os.getenv("DATASET_SIDECAR_MAX_MB", DEFAULT_SIDECAR_MAX_MB))
+            max_size_bytes = int(max_mb * 1024 * 1024)
+        self.max_size_bytes = max_size_bytes
+        self._lock = threading.Lock()
+        self.conversions = 0
+        self.evictions = 0
+        self.sidecar_hits = 0
+        self.memory_saved_bytes = 0
+        self.load_seconds_saved = 0.0
+
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, "index.json")
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def content_hash(self, csv_path: str) -> str:
+        """
+        Return the content hash of a file, reusing a stored hash while the
+        file's path, size and mtime are unchanged.
+        """
+        st = os.stat(csv_path)
+        stat_key = f"{os.path.abspath(csv_path)}|{st.st_size}|{st.st_mtime_ns}"
+        with self._lock:
+            known = self._read_index().get(stat_key)
+        if known:
+            return known
+
+        digest = hash_file(csv_path)
+        path_prefix = stat_key.rsplit("|", 2)[0] + "|"
+        with self._lock:
+            # Older stats of the same path belong to earlier versions of the file
+            index = {k: v for k, v in self._read_index().items() if not k.startswith(path_prefix)}
+            index[stat_key] = digest
+            for stale in list(index)[:max(len(index) - MAX_INDEX_ENTRIES, 0)]:
+                del index[stale]
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self._index_path()}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self._index_path())
+        return digest
+
+    def sidecar_path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.v{SIDECAR_FORMAT_VERSION}.arrow")
+
+    def load(self, csv_path: str, columns: Sequence[str] = None) -> pd.DataFrame:
+        """
+        Load a CSV as a dtype-optimized DataFrame, via its sidecar when present.
+
+        A column projection is read from the memory-mapped sidecar when there
+        is one; otherwise only those columns are parsed and no sidecar is
+        written, since that would need the whole file.
+
+        Args:
+            csv_path: Path to the CSV file (plain or compressed)
+            columns: Read only these columns (None or empty for all)
+
+        Returns:
+            The dataset with compact dtypes
+        """
+        import pyarrow as pa
+
+        check_columns(csv_path, columns)
+        path = self.sidecar_path(self.content_hash(csv_path))
+        if os.path.exists(path):
+            start = time.perf_counter()
+            with pa.memory_map(path, "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+            # Touch the sidecar so eviction drops least recently used first
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            meta = json.loads(table.schema.metadata.get(b"agentic_ds", b"{}"))
+            if columns:
+                table = table.select(list(columns))
+            df = table.to_pandas(split_blocks=True)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.sidecar_hits += 1
+                self.memory_saved_bytes += meta.get("memory_saved_bytes", 0)
+                self.load_seconds_saved += max(meta.get("csv_parse_seconds", 0.0) - elapsed, 0.0)
+            return df
+
+        if columns:
+            return optimize_dtypes(read_table(csv_path, columns))
+
+        start = time.perf_counter()
+        raw = read_table(csv_path)
+        parse_seconds = time.perf_counter() - start
+        df = optimize_dtypes(raw)
+        saved = int(raw.memory_usage(deep=True).sum() - df.memory_usage(deep=True).sum())
+        del raw
+        with self._lock:
+            self.memory_saved_bytes += saved
+
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except arrow_errors():
+            # Object columns mixing types (e.g. integers and a stray string)
+            # have no Arrow type: serve the frame as parsed, without a sidecar
+            return df
+        meta = {"memory_saved_bytes": saved, "csv_parse_seconds": parse_seconds}
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}), b"agentic_ds": json.dumps(meta).encode(),
+        })
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.conversions += 1
+        self._evict(keep=path)
+        return df
+
+    def _evict(self, keep: str) -> None:
+        """Delete least recently used sidecars until the directory fits the budget."""
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(".arrow") or entry.path == keep:
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in entries) + os.path.getsize(keep)
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_size_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        with self._lock:
+            self.evictions += evicted
+
+    def summary(self) -> str:
+        """Return a one-line, human-readable summary of the sidecar counters."""
+        with self._lock:
+            return (
+                f"Columnar sidecars: {self.sidecar_hits} loaded / {self.conversions} written, "
+                f"{self.memory_saved_bytes / 1024 / 1024:.1f} MB saved by compact dtypes, "
+                f"{self.load_seconds_saved:.2f}s parse time saved, {self.evictions} evicted"
+            )
+
+
+# Process-wide sidecar store used by the dataset cache
+columnar_cache = ColumnarCache()
@@ -0,0 +1,383 @@
+"""Token-efficient output formats for the data tools.
+
+The default text reports are written for humans: banners, emoji and padded
+tables. Everything a tool returns is pasted into the agent's prompt (and,
+through task context, into every downstream prompt), so these helpers render
+the same facts as dense JSON or a terse table, trim them to a token budget by
+dropping the least informative details first, and report the tokens saved.
+"""
+import copy
+import json
+import math
+import os
+from typing import TYPE_CHECKING, Callable, Dict, List
+
+from tools.stats_kernel import DatasetStats
+
+if TYPE_CHECKING:
+    from tools.baselines import BaselineReport
+    from tools.relationships import RelationshipReport
+
+
+OUTPUT_FORMATS = ("text", "json", "compact")
+
+# Default output format and token budget for tool results (overridable via
+# TOOL_OUTPUT_FORMAT and TOOL_TOKEN_BUDGET; a budget of 0 means unlimited)
+DEFAULT_OUTPUT_FORMAT = "text"
+DEFAULT_TOKEN_BUDGET = 0
+
+_encoding = None
+
+
+def resolve_output_format(output_format: str) -> str:
+    """Return the requested format, falling back to TOOL_OUTPUT_FORMAT."""
+    fmt = (output_format or os.getenv("TOOL_OUTPUT_FORMAT", DEFAULT_OUTPUT_FORMAT)).lower()
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"output_format must be one of {', '.join(OUTPUT_FORMATS)}, got '{fmt}'")
+    return fmt
+
+
+def resolve_token_budget(token_budget: int) -> int:
+    """Return the requested budget, falling back to TOOL_TOKEN_BUDGET."""
+    if token_budget:
+        return token_budget
+    return int(os.getenv("TOOL_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET))
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens with tiktoken's cl100k_base encoding when available.
+
+    Falls back to the common four-characters-per-token estimate when tiktoken
+    is not installed or its encoding files cannot be loaded (e.g. offline).
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def _num(value):
+    """Round a float to 4 significant digits (None for NaN) to save tokens."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, float):
+        rounded = float(f"{value:.4g}")
+        return int(rounded) if rounded.is_integer() and abs(rounded) < 1e15 else rounded
+    return value
+
+
+NUMERIC_FIELDS = ["mean", "std", "min", "q1", "median", "q3", "max", "missing", "outliers"]
+
+
+def stats_payload(stats: DatasetStats) -> dict:
+    """
+    Build a dense, JSON-serializable summary of a DatasetStats result.
+
+    Args:
+        stats: Structured statistics for one dataset
+
+    Returns:
+        Dictionary with one row per column instead of one line per figure
+    """
+    payload = {
+        "file": stats.path,
+        "rows": stats.n_rows,
+        "cols": len(stats.columns),
+    }
+    if stats.sample_rows is not None:
+        payload["approximate"] = ["rows"] + NUMERIC_FIELDS + ["card", "top"]
+        payload["sample_rows"] = stats.sample_rows
+        if stats.exact_columns:
+            payload["exact_columns"] = stats.exact_columns
+    elif stats.approximate:
+        payload["approximate"] = ["median", "q1", "q3", "outliers", "card", "top"]
+    payload["numeric_fields"] = NUMERIC_FIELDS
+    payload["numeric"] = {
+        s.name: [_num(getattr(s, f)) for f in NUMERIC_FIELDS] for s in stats.numeric
+    }
+    payload["categorical"] = {
+        s.name: {"card": s.cardinality, "missing": s.missing, "top": [[str(v), c] for v, c in s.top]}
+        for s in stats.categorical
+    }
+    intervals = {}
+    for s in stats.numeric + stats.categorical:
+        fields = [f for f in ("mean", "median", "missing") if f in s.bounds and (f != "missing" or s.missing)]
+        if fields:
+            intervals[s.name] = {f: [_num(s.bounds[f][0]), _num(s.bounds[f][1])] for f in fields}
+    if intervals:
+        payload["ci"] = {"level": stats.confidence, "columns": intervals}
+    payload["quality"] = {
+        "duplicates": stats.duplicates,
+        "duplicates_margin": stats.duplicates_margin,
+        "key_duplicates": {
+            key: [count, stats.key_duplicates_margin.get(key)] for key, count in stats.key_duplicates.items()
+        },
+        "constant": stats.constant_columns,
+        "missing_over_50pct": [c for c, n in stats.missing.items() if stats.n_rows and n / stats.n_rows > 0.5],
+    }
+    return payload
+
+
+def reader_payload(path: str, rows, n_cols: int, dtypes: Dict[str, str], missing: Dict[str, int],
+                   head_records: List[dict], estimated: bool = False) -> dict:
+    """
+    Build a dense, JSON-serializable summary of a CSV Reader result.
+
+    Args:
+        path: Path to the CSV file
+        rows: Row count (exact or estimated)
+        n_cols: Column count
+        dtypes: Column name to dtype name
+        missing: Column name to missing count (columns without missing values omitted)
+        head_records: Sample rows as a list of dictionaries
+        estimated: Whether rows and missing counts are estimates from a sample
+
+    Returns:
+        Dictionary with schema, missing counts and sample rows
+    """
+    payload = {"file": path, "rows": rows, "cols": n_cols}
+    if estimated:
+        payload["estimated"] = ["rows", "missing"]
+    payload["dtypes"] = dtypes
+    payload["missing"] = missing
+    payload["head"] = [{k: _num(v) if isinstance(v, float) else v for k, v in row.items()} for row in head_records]
+    return payload
+
+
+def relationships_payload(report: "RelationshipReport") -> dict:
+    """
+    Build a dense, JSON-serializable summary of a Relationships result.
+
+    Args:
+        report: Strongest associations for one dataset
+
+    Returns:
+        Dictionary with one row per pair, strongest first
+    """
+    payload = {
+        "file": report.path,
+        "rows": report.n_rows,
+        "cols": len(report.numeric_columns) + len(report.categorical_columns),
+    }
+    if report.sampled:
+        payload["approximate"] = ["pairs", "target_mi"] if report.target else ["pairs"]
+        payload["sample_rows"] = report.sample_rows
+    payload["pairs"] = [
+        [pair.a, pair.b, pair.kind, {m: _num(v) for m, v in pair.measures.items()}, pair.n]
+        for pair in report.pairs
+    ]
+    if report.target:
+        payload["target"] = report.target
+        payload["target_mi"] = [[a.column, _num(a.mutual_info), _num(a.normalized)] for a in report.target_mi]
+    if report.notes:
+        payload["notes"] = report.notes
+    return payload
+
+
+def baselines_payload(report: "BaselineReport") -> dict:
+    """
+    Build a dense, JSON-serializable summary of a Baseline Training result.
+
+    Args:
+        report: Measured baseline performance for one dataset
+
+    Returns:
+        Dictionary with one row per model, best first
+    """
+    payload = {
+        "file": report.path,
+        "rows": report.n_rows,
+        "cols": len(report.numeric_features) + len(report.categorical_features),
+    }
+    if report.sampled:
+        payload["sample_rows"] = report.sample_rows
+    payload.update(
+        target=report.target,
+        problem=report.problem,
+        primary=report.primary_metric,
+        folds=report.folds,
+        round_rows=report.round_rows,
+        seconds=_num(report.seconds),
+    )
+    payload["models"] = [
+        [result.name, result.status, result.rows,
+         {m: [_num(v), _num(result.metrics_std[m])] for m, v in result.metrics.items()},
+         _num(result.fit_seconds)]
+        for result in report.candidates
+    ]
+    payload["reference"] = {m: _num(v) for m, v in report.reference.items()}
+    if report.notes:
+        payload["notes"] = report.notes
+    return payload
+
+
+def _column_priority(payload: dict) -> List[str]:
+    """
+    Order columns from least to most informative.
+
+    Constant columns go first, then ID-like columns (nearly one distinct value
+    per row), then columns without missing values or outliers; ties are broken
+    by dropping later columns first.
+    """
+    rows = payload.get("rows") or 0
+    constant = set(payload.get("quality", {}).get("constant", []))
+    scores = {}
+    order = list(payload.get("numeric", {})) + list(payload.get("categorical", {}))
+    for position, col in enumerate(order):
+        if col in constant:
+            score = 0
+        elif col in payload.get("categorical", {}) and rows and payload["categorical"][col]["card"] > 0.9 * rows:
+            score = 1
+        else:
+            score = 2
+            if col in payload.get("numeric", {}):
+                values = dict(zip(NUMERIC_FIELDS, payload["numeric"][col]))
+                score += bool(values["missing"]) + bool(values["outliers"])
+            else:
+                score += bool(payload["categorical"][col]["missing"])
+        scores[col] = (score, -position)
+    return sorted(scores, key=lambda c: scores[c])
+
+
+def _reductions(payload: dict):
+    """Yield successively smaller versions of the payload."""
+    payload = copy.deepcopy(payload)
+
+    # Sample rows carry the least information per token
+    while payload.get("head"):
+        payload["head"] = payload["head"][:-1]
+        yield payload
+
+    # Then confidence intervals, keeping the point estimates
+    if payload.pop("ci", None) is not None:
+        yield payload
+
+    # Then long top-category lists
+    for keep in (3, 1):
+        for info in payload.get("categorical", {}).values():
+            info["top"] = info["top"][:keep]
+        yield payload
+
+    # Then whole columns, least informative first, listed by name only
+    for col in _column_priority(payload):
+        payload.get("numeric", {}).pop(col, None)
+        payload.get("categorical", {}).pop(col, None)
+        payload.setdefault("omitted_columns", []).append(col)
+        yield payload
+
+    # Relationship payloads: the weakest pair or target association
+    while payload.get("pairs") or payload.get("target_mi"):
+        longest = max(("pairs", "target_mi"), key=lambda key: len(payload.get(key) or []))
+        payload[longest] = payload[longest][:-1]
+        yield payload
+
+    # Reader payloads: schema entries, least informative (no missing) first
+    for col in sorted(payload.get("dtypes", {}), key=lambda c: c in payload.get("missing", {})):
+        payload["dtypes"].pop(col)
+        payload.setdefault("omitted_columns", []).append(col)
+        yield payload
+
+
+def render_json(payload: dict) -> str:
+    """Render a payload as minified JSON."""
+    return json.dumps(payload, separators=(",", ":"), default=str)
+
+
+def render_compact(payload: dict) -> str:
+    """Render a payload as a terse, pipe-separated table."""
+    lines = [f"file={payload['file']} rows={payload['rows']} cols={payload['cols']}"]
+    for key in ("approximate", "estimated"):
+        if payload.get(key):
+            lines.append(f"{key}: {','.join(payload[key])}")
+    if "dtypes" in payload:
+        lines.append("dtypes: " + ",".join(f"{c}:{t}" for c, t in payload["dtypes"].items()))
+        lines.append("missing: " + (",".join(f"{c}:{n}" for c, n in payload["missing"].items()) or "none"))
+        if payload.get("head"):
+            cols = list(payload["head"][0])
+            lines.append("head: " + "|".join(cols))
+            for row in payload["head"]:
+                lines.append("|".join("" if row[c] is None else str(row[c]) for c in cols))
+    for key in ("sample_rows", "exact_columns"):
+        if payload.get(key):
+            value = payload[key]
+            lines.append(f"{key}: {','.join(value) if isinstance(value, list) else value}")
+    if payload.get("numeric"):
+        lines.append("num: col|" + "|".join(payload["numeric_fields"]))
+        for col, values in payload["numeric"].items():
+            lines.append(f"{col}|" + "|".join("" if v is None else str(v) for v in values))
+    if payload.get("categorical"):
+        lines.append("cat: col|card|missing|top")
+        for col, info in payload["categorical"].items():
+            top = ",".join(f"{v}:{c}" for v, c in info["top"])
+            lines.append(f"{col}|{info['card']}|{info['missing']}|{top}")
+    if "pairs" in payload:
+        lines.append("pairs: a|b|kind|measures|n")
+        for a, b, kind, measures, n in payload["pairs"]:
+            lines.append(f"{a}|{b}|{kind}|" + ",".join(f"{m}:{v}" for m, v in measures.items()) + f"|{n}")
+    if "models" in payload:
+        lines.append(f"target={payload['target']} problem={payload['problem']} folds={payload['folds']} "
+                     f"rounds={'>'.join(map(str, payload['round_rows']))} seconds={payload['seconds']}")
+        lines.append(f"models (by {payload['primary']}): name|status|rows|metric:mean±std|fit_s")
+        for name, status, rows, metrics, fit_seconds in payload["models"]:
+            lines.append(f"{name}|{status}|{rows}|"
+                         + ",".join(f"{m}:{mean}±{std}" for m, (mean, std) in metrics.items()) + f"|{fit_seconds}")
+        lines.append("reference: " + ",".join(f"{m}:{v}" for m, v in payload["reference"].items()))
+    elif payload.get("target"):
+        lines.append(f"target_mi ({payload['target']}): col|mi|normalized")
+        for col, mi, normalized in payload["target_mi"]:
+            lines.append(f"{col}|{mi}|{normalized}")
+    for note in payload.get("notes", []):
+        lines.append(f"note: {note}")
+    if payload.get("ci"):
+        lines.append(f"ci{payload['ci']['level']:.0%}: col|interval")
+        for col, fields in payload["ci"]["columns"].items():
+            lines.append(f"{col}|" + ",".join(f"{f}:{lo}..{hi}" for f, (lo, hi) in fields.items()))
+    if "quality" in payload:
+        q = payload["quality"]
+        dup = "n/a" if q["duplicates"] is None else str(q["duplicates"])
+        if q.get("duplicates_margin") is not None:
+            dup = f"~{dup}±{q['duplicates_margin']}"
+        for key, (count, margin) in q.get("key_duplicates", {}).items():
+            dup += f" key[{key}]={count if margin is None else f'~{count}±{margin}'}"
+        lines.append(
+            f"quality: duplicates={dup} constant={','.join(q['constant']) or '-'} "
+            f"missing>50%={','.join(q['missing_over_50pct']) or '-'}"
+        )
+    if payload.get("omitted_columns"):
+        lines.append(f"omitted (token budget): {','.join(payload['omitted_columns'])}")
+    return "\n".join(lines)
+
+
+def render_within_budget(payload: dict, output_format: str, token_budget: int, text_report: str) -> str:
+    """
+    Render a payload in a compact format, trimmed to a token budget.
+
+    Args:
+        payload: Dense summary built by stats_payload, reader_payload,
+            relationships_payload or baselines_payload
+        output_format: "json" or "compact"
+        token_budget: Maximum tokens for the result (0 for no limit)
+        text_report: The default text report, used to measure the tokens saved
+
+    Returns:
+        The rendered result followed by a token accounting line
+    """
+    render: Callable[[dict], str] = render_json if output_format == "json" else render_compact
+    result = render(payload)
+    if token_budget:
+        for reduced in _reductions(payload):
+            if count_tokens(result) <= token_budget:
+                break
+            result = render(reduced)
+
+    used = count_tokens(result)
+    baseline = count_tokens(text_report)
+    saved_pct = (1 - used / baseline) * 100 if baseline else 0.0
+    return f"{result}\n[tokens: {used} vs {baseline} in text format, {saved_pct:.0f}% saved]"
@@ -0,0 +1,373 @@
+"""Fast, bounded-cost preview of large dataset files.
+
+The preview never parses the whole file: schema and sample rows come from the
+header plus a bounded sample, the row count comes from a quote-aware newline
+scan (or, above a size limit, from the average row width of sampled blocks),
+and missing-value rates are estimated from the sample. Parquet and Feather
+files take their row count from metadata and their sample from evenly spaced
+row ranges; compressed CSV is sampled from its head only, since it cannot be
+read from an arbitrary offset.
+"""
+from dataclasses import dataclass
+import csv
+import io
+import os
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from tools.dataset_io import (
+    CSV, FEATHER, PARQUET, check_columns, detect_format, open_binary, open_feather, parse_columns,
+    read_columns, read_table, row_count
+)
+
+
+# Files above this size (in MB) are previewed instead of fully parsed
+# (overridable via CSV_PREVIEW_THRESHOLD_MB)
+DEFAULT_PREVIEW_THRESHOLD_MB = 256
+
+# Files up to this size (in MB) get an exact row count; larger files get an
+# estimate (overridable via CSV_PREVIEW_EXACT_COUNT_MB)
+DEFAULT_EXACT_COUNT_MB = 1024
+
+# Rows sampled for dtype inference and missing-value estimates
+DEFAULT_SAMPLE_ROWS = 10_000
+
+# Size of the blocks read by the newline scan and by the samplers
+SCAN_BLOCK_BYTES = 4 * 1024 * 1024
+SAMPLE_BLOCK_BYTES = 256 * 1024
+SAMPLE_BLOCKS = 8
+
+# Records checked for a consistent field count when aligning a sampled block
+ALIGN_CHECK_RECORDS = 100
+
+_QUOTE = ord('"')
+_NEWLINE = ord("\n")
+
+
+def should_preview(csv_path: str) -> bool:
+    """Return True if the file is large enough to use the preview path."""
+    threshold_mb = float(os.getenv("CSV_PREVIEW_THRESHOLD_MB", DEFAULT_PREVIEW_THRESHOLD_MB))
+    return os.path.getsize(csv_path) > threshold_mb * 1024 * 1024
+
+
+def _count_record_breaks(block: bytes, in_quotes: bool):
+    """
+    Count newlines outside quoted fields in one block.
+
+    Args:
+        block: Raw bytes
+        in_quotes: Whether the block starts inside a quoted field
+
+    Returns:
+        Tuple of (record-terminating newline count, in_quotes state at block end)
+    """
+    if not in_quotes and b'"' not in block:
+        return block.count(b"\n"), False
+    data = np.frombuffer(block, dtype=np.uint8)
+    # Quote parity up to each byte; escaped quotes ("") toggle twice and cancel
+    parity = np.cumsum(data == _QUOTE, dtype=np.uint8) & 1
+    if in_quotes:
+        parity ^= 1
+    breaks = int(np.count_nonzero((data == _NEWLINE) & (parity == 0)))
+    return breaks, bool(parity[-1]) if data.size else in_quotes
+
+
+def _record_starts(block: bytes, in_quotes: bool) -> np.ndarray:
+    """Positions just after each newline outside quoted fields, given the state at block start."""
+    data = np.frombuffer(block, dtype=np.uint8)
+    parity = np.cumsum(data == _QUOTE, dtype=np.uint8) & 1
+    if in_quotes:
+        parity ^= 1
+    return np.flatnonzero((data == _NEWLINE) & (parity == 0)) + 1
+
+
+def _block_state(block: bytes, n_columns: int):
+    """
+    Work out whether a block read at an arbitrary offset starts inside a quoted field.
+
+    A block may start inside a quoted field that spans lines, so its first
+    newline is not necessarily a record boundary. Each quote state is tried:
+    the right one splits the records after its first boundary into exactly
+    n_columns fields each.
+
+    Args:
+        block: Raw bytes read from an arbitrary offset
+        n_columns: Number of columns in the header
+
+    Returns:
+        The quote state at block start, or None if neither state yields
+        consistent records (the block is then not used)
+    """
+    if b'"' not in block:
+        return False
+    for in_quotes in (False, True):
+        starts = _record_starts(block, in_quotes)
+        if len(starts) < 2:
+            continue
+        text = block[starts[0]:starts[-1]].decode("utf-8", errors="replace")
+        records = 0
+        consistent = True
+        for record in csv.reader(io.StringIO(text, newline="")):
+            if len(record) != n_columns:
+                consistent = False
+                break
+            records += 1
+            if records >= ALIGN_CHECK_RECORDS:
+                break
+        if consistent and records:
+            return in_quotes
+    return None
+
+
+def count_rows(csv_path: str) -> int:
+    """
+    Count data rows with a buffered, quote-aware newline scan.
+
+    Newlines inside quoted fields are not counted as record breaks, and a
+    final record without a trailing newline is included.
+
+    Args:
+        csv_path: Path to the CSV file (compressed files are decompressed
+            on the fly)
+
+    Returns:
+        Number of data rows (excluding the header)
+    """
+    records = 0
+    in_quotes = False
+    last_byte = b"\n"
+    with open_binary(csv_path) as f:
+        while True:
+            block = f.read(SCAN_BLOCK_BYTES)
+            if not block:
+                break
+            breaks, in_quotes = _count_record_breaks(block, in_quotes)
+            records += breaks
+            last_byte = block[-1:]
+    if last_byte != b"\n":
+        records += 1
+    return max(records - 1, 0)
+
+
+def _block_offsets(size: int, n_blocks: int, block_bytes: int):
+    """Evenly spaced offsets covering the file, excluding the first block."""
+    if size <= block_bytes:
+        return []
+    return [int(x) for x in np.linspace(block_bytes, size - block_bytes, n_blocks)]
+
+
+def estimate_rows(csv_path: str, header_bytes: int, n_columns: int = None) -> int:
+    """
+    Estimate the data row count from the average row width of sampled blocks.
+
+    Body blocks are only counted once their quote state at the start is
+    known (see _block_state), so quoted newlines do not bias the estimate.
+
+    Args:
+        csv_path: Path to the CSV file
+        header_bytes: Size of the header line in bytes
+        n_columns: Number of columns (read from the header when None)
+
+    Returns:
+        Estimated number of data rows
+    """
+    size = os.path.getsize(csv_path)
+    if n_columns is None:
+        n_columns = len(read_columns(csv_path))
+    sampled_bytes = 0
+    sampled_rows = 0
+    with open(csv_path, "rb") as f:
+        for offset in [0] + _block_offsets(size, SAMPLE_BLOCKS, SAMPLE_BLOCK_BYTES):
+            f.seek(offset)
+            block = f.read(SAMPLE_BLOCK_BYTES)
+            # The file starts outside quotes; body blocks start wherever they fall
+            in_quotes = False if offset == 0 else _block_state(block, n_columns)
+            if in_quotes is None:
+                continue
+            breaks, _ = _count_record_breaks(block, in_quotes)
+            sampled_bytes += len(block)
+            sampled_rows += breaks
+    if sampled_rows == 0:
+        return 1 if size > header_bytes else 0
+    return max(int(round((size - header_bytes) / (sampled_bytes / sampled_rows))), 0)
+
+
+def estimate_compressed_rows(csv_path: str) -> int:
+    """
+    Estimate the data row count of a compressed CSV from its leading blocks.
+
+    The head is decompressed until SAMPLE_BLOCKS scan blocks of text have
+    been read; the rows per compressed byte consumed are extrapolated to the
+    file. Reading that much keeps the decompressor's read-ahead, which
+    inflates the bytes consumed, to a few percent.
+
+    Args:
+        csv_path: Path to the compressed CSV file
+
+    Returns:
+        Estimated number of data rows
+    """
+    size = os.path.getsize(csv_path)
+    rows = 0
+    in_quotes = False
+    with open(csv_path, "rb") as raw, open_binary(csv_path, raw) as f:
+        for _ in range(SAMPLE_BLOCKS):
+            block = f.read(SCAN_BLOCK_BYTES)
+            if not block:
+                break
+            breaks, in_quotes = _count_record_breaks(block, in_quotes)
+            rows += breaks
+        consumed = raw.tell()
+    return max(int(round(rows * size / max(consumed, 1))) - 1, 0)
+
+
+@dataclass
+class CSVPreview:
+    """Result of a bounded-cost CSV preview."""
+    path: str
+    columns: list
+    dtypes: pd.Series
+    head: pd.DataFrame
+    sample_rows: int
+    missing_rates: Dict[str, float]
+    row_count: int
+    row_count_exact: bool
+
+
+def _compatible(frame: pd.DataFrame, head: pd.DataFrame) -> bool:
+    """Return True if a body sample agrees with the head's dtypes (numeric stays numeric)."""
+    for column in head.columns:
+        expected, actual = head[column].dtype, frame[column].dtype
+        if frame[column].isnull().all():
+            continue
+        if pd.api.types.is_numeric_dtype(expected) != pd.api.types.is_numeric_dtype(actual):
+            return False
+        if pd.api.types.is_datetime64_any_dtype(expected) != pd.api.types.is_datetime64_any_dtype(actual):
+            return False
+    return True
+
+
+def _sample_body(csv_path: str, columns: list, size: int, rows_per_block: int) -> list:
+    """
+    Parse a few rows from evenly spaced offsets in the body of the file.
+
+    Each block is cut at real record boundaries: its quote state at the
+    start is worked out first (see _block_state), and blocks whose state
+    cannot be determined are skipped.
+    """
+    frames = []
+    with open(csv_path, "rb") as f:
+        for offset in _block_offsets(size, SAMPLE_BLOCKS, SAMPLE_BLOCK_BYTES):
+            f.seek(offset)
+            block = f.read(SAMPLE_BLOCK_BYTES)
+            in_quotes = _block_state(block, len(columns))
+            if in_quotes is None:
+                continue
+            # Drop the partial record at the start and the one at the end
+            starts = _record_starts(block, in_quotes)
+            if len(starts) < 2:
+                continue
+            try:
+                frame = pd.read_csv(
+                    io.BytesIO(block[starts[0]:starts[-1]]), header=None, names=columns, nrows=rows_per_block
+                )
+            except (ValueError, pd.errors.ParserError):
+                continue
+            frames.append(frame)
+    return frames
+
+
+def _sample_table(csv_path: str, fmt: str, columns: list, skip_rows: int, rows_per_block: int) -> list:
+    """Read a few rows from evenly spaced row ranges of a Parquet or Feather file, after the head."""
+    frames = []
+    if fmt == PARQUET:
+        import pyarrow.parquet as pq
+        with pq.ParquetFile(csv_path) as parquet:
+            starts = np.cumsum([0] + [parquet.metadata.row_group(i).num_rows
+                                      for i in range(parquet.metadata.num_row_groups)])[:-1]
+            groups = [i for i, first in enumerate(starts) if first >= skip_rows]
+            if len(groups) > SAMPLE_BLOCKS:
+                groups = [groups[int(i)] for i in np.linspace(0, len(groups) - 1, SAMPLE_BLOCKS)]
+            for group in groups:
+                batch = next(parquet.iter_batches(batch_size=rows_per_block, row_groups=[group],
+                                                  columns=columns or None), None)
+                if batch is not None:
+                    frames.append(batch.to_pandas())
+    elif fmt == FEATHER:
+        table = open_feather(csv_path, columns)
+        remaining = table.num_rows - skip_rows
+        if remaining <= rows_per_block * SAMPLE_BLOCKS:
+            offsets = [skip_rows] if remaining > 0 else []
+            rows_per_block = remaining
+        else:
+            offsets = [int(x) for x in np.linspace(skip_rows, table.num_rows - rows_per_block, SAMPLE_BLOCKS)]
+        for offset in offsets:
+            frames.append(table.slice(offset, rows_per_block).to_pandas())
+    return frames
+
+
+def preview_csv(csv_path: str, num_rows: int = 5, sample_rows: int = DEFAULT_SAMPLE_ROWS,
+                columns: Sequence[str] = None) -> CSVPreview:
+    """
+    Preview a dataset file without parsing all of it.
+
+    Args:
+        csv_path: Path to the dataset file (CSV, compressed CSV, Parquet or Feather)
+        num_rows: Number of leading rows to return for display
+        sample_rows: Total rows sampled (head plus evenly spaced body blocks)
+        columns: Preview only these columns (None or empty for all)
+
+    Returns:
+        CSVPreview with inferred dtypes, head rows, estimated missing rates
+        and an exact or estimated row count
+    """
+    fmt = detect_format(csv_path)
+    projection = parse_columns(columns)
+    check_columns(csv_path, projection)
+    size = os.path.getsize(csv_path)
+    head_rows = max(sample_rows // 2, num_rows)
+    head = read_table(csv_path, projection, nrows=head_rows)
+    columns = list(head.columns)
+
+    rows_per_block = max((sample_rows - len(head)) // SAMPLE_BLOCKS, 1)
+    body = []
+    if len(head) == head_rows and fmt == CSV:
+        body = _sample_body(csv_path, read_columns(csv_path), size, rows_per_block)
+        # Blocks that disagree with the head (misaligned or malformed) would widen its dtypes
+        body = [frame[columns] for frame in body if _compatible(frame[columns], head)]
+    elif len(head) == head_rows and fmt in (PARQUET, FEATHER):
+        body = _sample_table(csv_path, fmt, projection, len(head), rows_per_block)
+    sample = pd.concat([head] + body, ignore_index=True) if body else head
+
+    # Concatenation widens the head's dtypes only within a kind (e.g. int to float for missing values)
+    dtypes = sample.dtypes
+    missing_rates = (sample.isnull().mean() if len(sample) else pd.Series(0.0, index=columns)).to_dict()
+
+    exact_limit_mb = float(os.getenv("CSV_PREVIEW_EXACT_COUNT_MB", DEFAULT_EXACT_COUNT_MB))
+    metadata_rows = row_count(csv_path)
+    if metadata_rows is not None:
+        rows, exact = metadata_rows, True
+    elif len(head) < head_rows:
+        # The whole file fit in the head sample
+        rows, exact = len(head), True
+    elif size <= exact_limit_mb * 1024 * 1024:
+        rows, exact = count_rows(csv_path), True
+    elif fmt != CSV:
+        rows, exact = estimate_compressed_rows(csv_path), False
+    else:
+        with open(csv_path, "rb") as f:
+            header_bytes = len(f.readline())
+        rows, exact = estimate_rows(csv_path, header_bytes, len(read_columns(csv_path))), False
+
+    return CSVPreview(
+        path=csv_path,
+        columns=columns,
+        dtypes=dtypes,
+        head=head.head(num_rows),
+        sample_rows=len(sample),
+        missing_rates=missing_rates,
+        row_count=rows,
+        row_count_exact=exact,
+    )
@@ -1,20 +1,37 @@
 """CSVReaderTool - Reads and previews CSV files."""
 from crewai.tools import tool
-import pandas as pd
 import os
 
+from tools.compact_output import reader_payload, render_within_budget, resolve_output_format, resolve_token_budget
+from tools.csv_preview import preview_csv, should_preview
+from tools.dataset_cache import load_dataset
+from tools.dataset_io import describe_format, is_plain_csv, parse_columns
+from tools.tool_schema import optional_args
 
+
+@optional_args
 @tool("CSV Reader")
-def csv_reader_tool(csv_path: str, num_rows: int = 5) -> str:
+def csv_reader_tool(csv_path: str, num_rows: int = 5, preview: bool = False,
+                    output_format: str = "", token_budget: int = 0, columns: str = "") -> str:
     """
-    Reads a CSV file and provides information about its structure.
+    Reads a dataset file and provides information about its structure.
+    Reads CSV, gzip/zstd-compressed CSV, Parquet and Feather files.
     Returns column names, data types, dataset shape, sample rows,
     and identifies columns with missing values.
     Use this tool to understand the structure of the dataset.
+    Very large files are previewed from a sample automatically.
     
     Args:
-        csv_path: Path to the CSV file to read
+        csv_path: Path to the dataset file to read
         num_rows: Number of sample rows to display (default: 5)
+        preview: Inspect only the header and a bounded sample instead of
+            parsing the whole file (missing values become estimates)
+        output_format: "text" (default report), "json" (dense JSON) or
+            "compact" (terse table); empty uses TOOL_OUTPUT_FORMAT
+        token_budget: Maximum tokens for json/compact output, trimming the
+            least informative details first (0 uses TOOL_TOKEN_BUDGET)
+        columns: Comma-separated columns to read (empty for all); only
+            these columns are read from the file
     
     Returns:
         String containing CSV file information
@@ -24,47 +41,153 @@ def csv_reader_tool(csv_path: str, num_rows: int = 5) -> str:
         if not os.path.exists(csv_path):
             return f"Error: File not found at path: {csv_path}"
         
-        # Read the CSV file
-        df = pd.read_csv(csv_path)
+        output_format = resolve_output_format(output_format)
         
-        # Prepare output
-        output = []
-        output.append("=" * 80)
-        output.append("CSV FILE INFORMATION")
-        output.append("=" * 80)
-        output.append(f"\nFile Path: {csv_path}")
-        output.append(f"Dataset Shape: {df.shape[0]} rows × {df.shape[1]} columns")
+        # Multi-gigabyte files are previewed without a full parse
+        if preview or should_preview(csv_path):
+            result = preview_csv(csv_path, num_rows=num_rows, columns=columns)
+            text = _format_preview(result, num_rows)
+            if output_format == "text":
+                return text
+            payload = reader_payload(
+                csv_path,
+                rows=result.row_count,
+                n_cols=len(result.columns),
+                dtypes={col: str(dtype) for col, dtype in result.dtypes.items()},
+                missing={col: int(round(rate * result.row_count))
+                         for col, rate in result.missing_rates.items() if rate > 0},
+                head_records=result.head.to_dict("records"),
+                estimated=True,
+            )
+            return render_within_budget(payload, output_format, resolve_token_budget(token_budget), text)
         
-        # Column information
-        output.append("\n" + "-" * 80)
-        output.append("COLUMN INFORMATION")
-        output.append("-" * 80)
-        output.append(f"\nTotal Columns: {len(df.columns)}")
-        output.append("\nColumn Names and Data Types:")
-        for idx, (col, dtype) in enumerate(zip(df.columns, df.dtypes), 1):
-            output.append(f"  {idx}. {col} ({dtype})")
+        # Read the CSV file (parsed once per process via the shared cache)
+        df = load_dataset(csv_path, parse_columns(columns))
+        text = _format_read(df, csv_path, num_rows)
+        if output_format == "text":
+            return text
         
-        # Missing values
         missing = df.isnull().sum()
-        if missing.sum() > 0:
-            output.append("\n" + "-" * 80)
-            output.append("MISSING VALUES")
-            output.append("-" * 80)
-            for col in missing[missing > 0].index:
-                pct = (missing[col] / len(df)) * 100
-                output.append(f"  {col}: {missing[col]} ({pct:.2f}%)")
-        else:
-            output.append("\nNo missing values detected.")
-        
-        # Sample rows
-        output.append("\n" + "-" * 80)
-        output.append(f"SAMPLE DATA (First {num_rows} rows)")
-        output.append("-" * 80)
-        output.append("\n" + df.head(num_rows).to_string())
-        
-        output.append("\n" + "=" * 80)
-        
-        return "\n".join(output)
+        payload = reader_payload(
+            csv_path,
+            rows=df.shape[0],
+            n_cols=df.shape[1],
+            dtypes={col: str(dtype) for col, dtype in df.dtypes.items()},
+            missing={col: int(n) for col, n in missing[missing > 0].items()},
+            head_records=df.head(num_rows).to_dict("records"),
+        )
+        return render_within_budget(payload, output_format, resolve_token_budget(token_budget), text)
         
     except Exception as e:
         return f"Error reading CSV file: {str(e)}"
+
+
+def _format_read(df, csv_path: str, num_rows: int) -> str:
+    """
+    Render the full-read report for a parsed CSV file.
+    
+    Args:
+        df: The parsed dataset
+        csv_path: Path to the CSV file
+        num_rows: Number of sample rows to display
+    
+    Returns:
+        String containing CSV file information
+    """
+    # Prepare output
+    output = []
+    output.append("=" * 80)
+    output.append("CSV FILE INFORMATION")
+    output.append("=" * 80)
+    output.append(f"\nFile Path: {csv_path}")
+    if not is_plain_csv(csv_path):
+        output.append(f"File Format: {describe_format(csv_path)}")
+    output.append(f"Dataset Shape: {df.shape[0]} rows × {df.shape[1]} columns")
+    
+    # Column information
+    output.append("\n" + "-" * 80)
+    output.append("COLUMN INFORMATION")
+    output.append("-" * 80)
+    output.append(f"\nTotal Columns: {len(df.columns)}")
+    output.append("\nColumn Names and Data Types:")
+    for idx, (col, dtype) in enumerate(zip(df.columns, df.dtypes), 1):
+        output.append(f"  {idx}. {col} ({dtype})")
+    
+    # Missing values
+    missing = df.isnull().sum()
+    if missing.sum() > 0:
+        output.append("\n" + "-" * 80)
+        output.append("MISSING VALUES")
+        output.append("-" * 80)
+        for col in missing[missing > 0].index:
+            pct = (missing[col] / len(df)) * 100
+            output.append(f"  {col}: {missing[col]} ({pct:.2f}%)")
+    else:
+        output.append("\nNo missing values detected.")
+    
+    # Sample rows
+    output.append("\n" + "-" * 80)
+    output.append(f"SAMPLE DATA (First {num_rows} rows)")
+    output.append("-" * 80)
+    output.append("\n" + df.head(num_rows).to_string())
+    
+    output.append("\n" + "=" * 80)
+    
+    return "\n".join(output)
+
+
+def _format_preview(result, num_rows: int) -> str:
+    """
+    Render a CSVPreview with the same sections as the full read.
+    
+    Args:
+        result: CSVPreview for the file
+        num_rows: Number of sample rows displayed
+    
+    Returns:
+        String containing CSV file information
+    """
+    n_cols = len(result.columns)
+    rows = f"{result.row_count}" if result.row_count_exact else f"~{result.row_count} (estimated)"
+    
+    output = []
+    output.append("=" * 80)
+    output.append("CSV FILE INFORMATION (PREVIEW)")
+    output.append("=" * 80)
+    output.append(f"\nFile Path: {result.path}")
+    if not is_plain_csv(result.path):
+        output.append(f"File Format: {describe_format(result.path)}")
+    output.append(f"Dataset Shape: {rows} rows × {n_cols} columns")
+    if result.sample_rows < result.row_count:
+        output.append(f"Preview based on {result.sample_rows:,} sampled rows; the file was not fully parsed.")
+    
+    # Column information
+    output.append("\n" + "-" * 80)
+    output.append("COLUMN INFORMATION")
+    output.append("-" * 80)
+    output.append(f"\nTotal Columns: {n_cols}")
+    output.append("\nColumn Names and Data Types (inferred from sample):")
+    for idx, (col, dtype) in enumerate(result.dtypes.items(), 1):
+        output.append(f"  {idx}. {col} ({dtype})")
+    
+    # Missing values (estimated)
+    missing = {col: rate for col, rate in result.missing_rates.items() if rate > 0}
+    if missing:
+        output.append("\n" + "-" * 80)
+        output.append(f"MISSING VALUES (ESTIMATED FROM {result.sample_rows:,} SAMPLED ROWS)")
+        output.append("-" * 80)
+        for col, rate in missing.items():
+            estimate = int(round(rate * result.row_count))
+            output.append(f"  {col}: ~{estimate} (~{rate * 100:.2f}%)")
+    else:
+        output.append(f"\nNo missing values detected in {result.sample_rows:,} sampled rows (estimate).")
+    
+    # Sample rows
+    output.append("\n" + "-" * 80)
+    output.append(f"SAMPLE DATA (First {num_rows} rows)")
+    output.append("-" * 80)
+    output.append("\n" + result.head.to_string())
+    
+    output.append("\n" + "=" * 80)
+    
+    return "\n".join(output)
@@ -1,21 +1,61 @@
 """DataStatsTool - Computes statistical summaries for datasets."""
 from crewai.tools import tool
-import pandas as pd
-import numpy as np
+from dataclasses import replace
 import os
+from typing import Sequence
 
+from tools.compact_output import render_within_budget, resolve_output_format, resolve_token_budget, stats_payload
+from tools.dataset_cache import dataset_cache
+from tools.dataset_io import parse_columns
+from tools.incremental_stats import incremental_stats, use_incremental
+from tools.row_fingerprints import parse_key_subsets
+from tools.sample_budget import resolve_sample_budget
+from tools.sampling import cached_sample, resolve_exact_columns, resolve_stratify, sampled_stats
+from tools.stats_kernel import DatasetStats, compute_dataset_stats
+from tools.streaming_stats import DEFAULT_CHUNK_SIZE, profile_csv_streaming, should_stream
+from tools.tool_schema import optional_args
 
+
+@optional_args
 @tool("Data Statistics")
-def data_stats_tool(csv_path: str) -> str:
+def data_stats_tool(csv_path: str, streaming: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    output_format: str = "", token_budget: int = 0, sample: str = "", stratify: str = "",
+                    exact_columns: str = "", incremental: bool = False, columns: str = "",
+                    duplicate_keys: str = "") -> str:
     """
     Computes comprehensive statistical summaries for a dataset.
     Provides descriptive statistics (mean, median, std, min, max) for numerical columns,
     cardinality and frequency analysis for categorical columns,
     missing value percentages, and distribution insights.
     Use this tool to perform exploratory data analysis.
+    Reads CSV, gzip/zstd-compressed CSV, Parquet and Feather files.
+    Very large files are processed in streaming mode automatically.
+    With a sample budget, statistics are estimated from a row sample and
+    reported with confidence intervals; exact_columns escalates chosen
+    columns to exact statistics.
+    Streaming-mode profiles are saved next to the dataset, so a file that
+    has only been appended to is profiled by reading just the new rows.
     
     Args:
-        csv_path: Path to the CSV file to analyze
+        csv_path: Path to the dataset file to analyze
+        streaming: Process the file in fixed-size chunks with bounded memory
+            (quantiles, cardinality and top categories become approximate)
+        chunk_size: Number of rows per chunk in streaming mode (default: 100000)
+        output_format: "text" (default report), "json" (dense JSON) or
+            "compact" (terse table); empty uses TOOL_OUTPUT_FORMAT
+        token_budget: Maximum tokens for json/compact output, dropping the
+            least informative columns first (0 uses TOOL_TOKEN_BUDGET)
+        sample: Sample budget, a row count ("250k") or a time ("30s");
+            "off" forces exact statistics; empty uses DATA_TOOLS_SAMPLE
+        stratify: Column to stratify the sample on (empty uses DATA_TOOLS_STRATIFY)
+        exact_columns: Comma-separated columns that get exact statistics in
+            sample mode (empty uses DATA_TOOLS_EXACT_COLUMNS)
+        incremental: Profile in streaming mode against the saved state even
+            when the file is small enough for exact statistics
+        columns: Comma-separated columns to analyze (empty for all); only
+            these columns are read from the file
+        duplicate_keys: Columns that should identify a row (e.g. "customerID"),
+            checked for duplicate values; separate several keys with ";"
     
     Returns:
         String containing statistical analysis
@@ -25,126 +65,268 @@ def data_stats_tool(csv_path: str) -> str:
         if not os.path.exists(csv_path):
             return f"Error: File not found at path: {csv_path}"
         
-        # Read the CSV file
-        df = pd.read_csv(csv_path)
-        
-        # Prepare output
-        output = []
-        output.append("=" * 80)
-        output.append("STATISTICAL ANALYSIS")
-        output.append("=" * 80)
-        output.append(f"\nDataset: {csv_path}")
-        output.append(f"Total Records: {len(df):,}")
-        output.append(f"Total Features: {len(df.columns)}")
-        
-        # Identify column types
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+        output_format = resolve_output_format(output_format)
+        stats = compute_stats(csv_path, streaming=streaming, chunk_size=chunk_size, sample=sample,
+                              stratify=stratify, exact_columns=exact_columns, incremental=incremental,
+                              columns=columns, duplicate_keys=duplicate_keys)
         
-        output.append(f"\nNumeric Columns: {len(numeric_cols)}")
-        output.append(f"Categorical Columns: {len(categorical_cols)}")
-        
-        # Numerical statistics
-        if numeric_cols:
-            output.append("\n" + "=" * 80)
-            output.append("NUMERICAL FEATURES STATISTICS")
-            output.append("=" * 80)
-            
-            for col in numeric_cols:
-                output.append(f"\n{col}:")
-                output.append(f"  Mean: {df[col].mean():.4f}")
-                output.append(f"  Median: {df[col].median():.4f}")
-                output.append(f"  Std Dev: {df[col].std():.4f}")
-                output.append(f"  Min: {df[col].min():.4f}")
-                output.append(f"  Max: {df[col].max():.4f}")
-                output.append(f"  25th Percentile: {df[col].quantile(0.25):.4f}")
-                output.append(f"  75th Percentile: {df[col].quantile(0.75):.4f}")
-                
-                missing_pct = (df[col].isnull().sum() / len(df)) * 100
-                if missing_pct > 0:
-                    output.append(f"  Missing Values: {df[col].isnull().sum()} ({missing_pct:.2f}%)")
-                
-                # Detect potential outliers (IQR method)
-                Q1 = df[col].quantile(0.25)
-                Q3 = df[col].quantile(0.75)
-                IQR = Q3 - Q1
-                outliers = ((df[col] < (Q1 - 1.5 * IQR)) | (df[col] > (Q3 + 1.5 * IQR))).sum()
-                if outliers > 0:
-                    output.append(f"  Potential Outliers: {outliers} ({(outliers/len(df)*100):.2f}%)")
-        
-        # Categorical statistics
-        if categorical_cols:
-            output.append("\n" + "=" * 80)
-            output.append("CATEGORICAL FEATURES STATISTICS")
-            output.append("=" * 80)
-            
-            for col in categorical_cols:
-                output.append(f"\n{col}:")
-                output.append(f"  Cardinality: {df[col].nunique()} unique values")
-                
-                missing_pct = (df[col].isnull().sum() / len(df)) * 100
-                if missing_pct > 0:
-                    output.append(f"  Missing Values: {df[col].isnull().sum()} ({missing_pct:.2f}%)")
-                
-                # Top categories
-                value_counts = df[col].value_counts()
-                output.append(f"  Top 5 Categories:")
-                for idx, (val, count) in enumerate(value_counts.head(5).items(), 1):
-                    pct = (count / len(df)) * 100
-                    output.append(f"    {idx}. {val}: {count} ({pct:.2f}%)")
-                
-                # Check for high cardinality
-                if df[col].nunique() > len(df) * 0.5:
-                    output.append(f"  ⚠️  High cardinality detected (may be an ID or unique identifier)")
+        text = format_stats(stats)
+        if output_format == "text":
+            return text
+        return render_within_budget(stats_payload(stats), output_format, resolve_token_budget(token_budget), text)
         
-        # Overall missing value summary
+    except Exception as e:
+        return f"Error computing statistics: {str(e)}"
+
+
+def compute_stats(csv_path: str, streaming: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  sample: str = "", stratify: str = "", exact_columns: str = "",
+                  incremental: bool = False, columns: str = "", duplicate_keys: str = "") -> DatasetStats:
+    """
+    Compute the Data Statistics result in the mode the arguments call for.
+    
+    A sample budget (argument or DATA_TOOLS_SAMPLE) selects sampled
+    estimates, large files or streaming=True the chunked streaming pass, and
+    everything else exact statistics. Streaming passes reuse the saved
+    mergeable state when the file has only been appended to (see
+    tools/incremental_stats.py); incremental=True or
+    DATA_STATS_INCREMENTAL=true takes that path for every file. A column
+    projection is pushed down into every reader.
+    
+    Args:
+        csv_path: Path to the dataset file
+        streaming: Force the streaming pass
+        chunk_size: Number of rows per chunk for streaming and sampling
+        sample: Sample budget (see tools/sampling.py)
+        stratify: Column to stratify the sample on
+        exact_columns: Comma-separated columns escalated to exact statistics
+        incremental: Force the incremental streaming pass
+        columns: Comma-separated columns (or a list) to analyze; empty for all
+        duplicate_keys: Key-column subsets to check for duplicate values
+            ("id" or "id;first,last")
+    
+    Returns:
+        DatasetStats for the file
+    """
+    columns = parse_columns(columns)
+    keys = parse_key_subsets(duplicate_keys)
+    budget = resolve_sample_budget(sample)
+    if budget:
+        drawn = cached_sample(csv_path, budget, stratify=resolve_stratify(stratify),
+                              exact_columns=resolve_exact_columns(exact_columns), columns=columns)
+        return replace(sampled_stats(drawn), path=csv_path)
+    
+    # Saved state covers every column and no keys, so projections and key checks take a fresh pass
+    if not columns and not keys and use_incremental(csv_path, incremental or streaming):
+        return incremental_stats(csv_path, chunk_size=chunk_size)
+    
+    # Larger-than-memory files are profiled in a single chunked pass
+    if streaming or should_stream(csv_path):
+        profiler = profile_csv_streaming(csv_path, chunk_size=chunk_size, columns=columns, duplicate_keys=keys)
+        try:
+            return profiler.to_stats(csv_path, chunk_size=chunk_size)
+        finally:
+            profiler.close()
+    return exact_stats(csv_path, columns=columns, duplicate_keys=keys)
+
+
+def exact_stats(csv_path: str, columns: Sequence[str] = None,
+                duplicate_keys: Sequence[Sequence[str]] = ()) -> DatasetStats:
+    """
+    Compute exact statistics for an in-memory dataset, once per file version.
+    
+    The file is parsed once per process via the shared cache, and the result
+    is kept with the cached dataset so repeated calls (or a background
+    precompute) are served without recomputation.
+    
+    Args:
+        csv_path: Path to the dataset file
+        columns: Analyze only these columns (None or empty for all); key
+            columns missing from the projection are added to it
+        duplicate_keys: Key-column subsets to check for duplicate values
+    
+    Returns:
+        DatasetStats for the file
+    """
+    if columns and duplicate_keys:
+        columns = parse_columns(list(columns) + [col for key in duplicate_keys for col in key])
+    name = "stats:" + ";".join(",".join(key) for key in duplicate_keys) if duplicate_keys else "stats"
+    stats = dataset_cache.derived(
+        csv_path, name, lambda df: compute_dataset_stats(df, path=csv_path, duplicate_keys=duplicate_keys),
+        columns=columns
+    )
+    return replace(stats, path=csv_path)
+
+
+def format_stats(stats: DatasetStats) -> str:
+    """
+    Render a DatasetStats result as the Data Statistics text report.
+    
+    Figures that come from sketches or samples are prefixed with "~" when the
+    result is approximate; sample estimates are followed by their confidence
+    interval in brackets.
+    
+    Args:
+        stats: Structured statistics for one dataset
+    
+    Returns:
+        String containing statistical analysis
+    """
+    n_rows = stats.n_rows
+    sampled = stats.sample_rows is not None
+    
+    def interval(col, name: str, fmt: str = ".4f") -> str:
+        if name not in col.bounds:
+            return ""
+        lo, hi = col.bounds[name]
+        return f" [{stats.confidence:.0%} CI {lo:{fmt}} to {hi:{fmt}}]"
+    
+    # Prepare output
+    output = []
+    output.append("=" * 80)
+    output.append("STATISTICAL ANALYSIS")
+    output.append("=" * 80)
+    output.append(f"\nDataset: {stats.path}")
+    output.append(f"Total Records: {'~' if sampled else ''}{n_rows:,}")
+    output.append(f"Total Features: {len(stats.columns)}")
+    for note in stats.notes:
+        output.append(note)
+    
+    output.append(f"\nNumeric Columns: {len(stats.numeric)}")
+    output.append(f"Categorical Columns: {len(stats.categorical)}")
+    
+    # Numerical statistics
+    if stats.numeric:
         output.append("\n" + "=" * 80)
-        output.append("MISSING VALUES SUMMARY")
+        output.append("NUMERICAL FEATURES STATISTICS")
         output.append("=" * 80)
-        total_missing = df.isnull().sum().sum()
-        total_cells = df.shape[0] * df.shape[1]
-        output.append(f"\nTotal Missing Values: {total_missing:,} ({(total_missing/total_cells*100):.2f}% of all data)")
-        
-        missing_by_col = df.isnull().sum()
-        if missing_by_col.sum() > 0:
-            output.append("\nColumns with Missing Values:")
-            for col in missing_by_col[missing_by_col > 0].sort_values(ascending=False).index:
-                pct = (missing_by_col[col] / len(df)) * 100
-                output.append(f"  {col}: {missing_by_col[col]:,} ({pct:.2f}%)")
-        else:
-            output.append("\n✓ No missing values in any column")
         
-        # Data quality insights
+        for col in stats.numeric:
+            exact = col.name in stats.exact_columns
+            # Sketch-based figures are approximate; in sample mode every figure is
+            approx = "~" if stats.approximate and not exact else ""
+            estimate = approx if sampled else ""
+            output.append(f"\n{col.name}:" + (" (exact)" if exact else ""))
+            output.append(f"  Mean: {estimate}{col.mean:.4f}{interval(col, 'mean')}")
+            output.append(f"  Median: {approx}{col.median:.4f}{interval(col, 'median')}")
+            output.append(f"  Std Dev: {estimate}{col.std:.4f}{interval(col, 'std')}")
+            output.append(f"  Min: {col.min:.4f}" + (" (in sample)" if estimate else ""))
+            output.append(f"  Max: {col.max:.4f}" + (" (in sample)" if estimate else ""))
+            output.append(f"  25th Percentile: {approx}{col.q1:.4f}{interval(col, 'q1')}")
+            output.append(f"  75th Percentile: {approx}{col.q3:.4f}{interval(col, 'q3')}")
+            
+            if col.missing > 0:
+                missing_pct = (col.missing / n_rows) * 100
+                output.append(f"  Missing Values: {estimate}{col.missing} ({missing_pct:.2f}%)"
+                              f"{interval(col, 'missing', ',.0f')}")
+            
+            # Potential outliers (IQR method)
+            if col.outliers > 0:
+                output.append(f"  Potential Outliers: {approx}{col.outliers} ({(col.outliers/n_rows*100):.2f}%)"
+                              f"{interval(col, 'outliers', ',.0f')}")
+    
+    # Categorical statistics
+    if stats.categorical:
         output.append("\n" + "=" * 80)
-        output.append("DATA QUALITY INSIGHTS")
+        output.append("CATEGORICAL FEATURES STATISTICS")
         output.append("=" * 80)
         
-        insights = []
-        
-        # Check for duplicates
-        duplicates = df.duplicated().sum()
-        if duplicates > 0:
-            insights.append(f"⚠️  Found {duplicates} duplicate rows ({(duplicates/len(df)*100):.2f}%)")
+        for col in stats.categorical:
+            exact = col.name in stats.exact_columns
+            approx = "~" if stats.approximate and not exact else ""
+            estimate = approx if sampled else ""
+            output.append(f"\n{col.name}:" + (" (exact)" if exact else ""))
+            if estimate:
+                output.append(f"  Cardinality: >={col.cardinality} unique values (seen in sample)")
+            else:
+                output.append(f"  Cardinality: {approx}{col.cardinality} unique values")
+            
+            if col.missing > 0:
+                missing_pct = (col.missing / n_rows) * 100
+                output.append(f"  Missing Values: {estimate}{col.missing} ({missing_pct:.2f}%)"
+                              f"{interval(col, 'missing', ',.0f')}")
+            
+            # Top categories (streaming counts are lower bounds once the summary overflows)
+            if col.top_error:
+                output.append(f"  Top 5 Categories (counts may be low by up to {col.top_error:,}):")
+            else:
+                output.append(f"  Top 5 Categories:")
+            for idx, (val, count) in enumerate(col.top, 1):
+                pct = (count / n_rows) * 100
+                bounds = ""
+                if idx <= len(col.top_bounds):
+                    lo, hi = col.top_bounds[idx - 1]
+                    bounds = f" [{stats.confidence:.0%} CI {lo:,.0f} to {hi:,.0f}]"
+                output.append(f"    {idx}. {val}: {estimate}{count} ({pct:.2f}%){bounds}")
+            if not col.top and col.top_error:
+                output.append("    (no value is frequent enough to be tracked)")
+            
+            # Check for high cardinality (relative to the rows it was counted on)
+            if col.cardinality > (stats.sample_rows if estimate else n_rows) * 0.5:
+                output.append(f"  ⚠️  High cardinality detected (may be an ID or unique identifier)")
+    
+    # Overall missing value summary
+    output.append("\n" + "=" * 80)
+    output.append("MISSING VALUES SUMMARY")
+    output.append("=" * 80)
+    total_missing = sum(stats.missing.values())
+    total_cells = n_rows * len(stats.columns)
+    missing_share = (total_missing / total_cells * 100) if total_cells else 0.0
+    estimate = "~" if sampled else ""
+    output.append(f"\nTotal Missing Values: {estimate}{total_missing:,} ({missing_share:.2f}% of all data)")
+    
+    missing_by_col = {col: n for col, n in stats.missing.items() if n > 0}
+    if missing_by_col:
+        output.append("\nColumns with Missing Values:")
+        for col, n in sorted(missing_by_col.items(), key=lambda item: item[1], reverse=True):
+            pct = (n / n_rows) * 100
+            marker = "" if col in stats.exact_columns else estimate
+            output.append(f"  {col}: {marker}{n:,} ({pct:.2f}%)")
+    else:
+        output.append("\n✓ No missing values in any column")
+    
+    # Data quality insights
+    output.append("\n" + "=" * 80)
+    output.append("DATA QUALITY INSIGHTS")
+    output.append("=" * 80)
+    
+    insights = []
+    
+    # Check for duplicates
+    if stats.duplicates is None:
+        insights.append(f"ℹ️  Duplicate-row check skipped in {'sampled' if sampled else 'streaming'} mode")
+    elif stats.duplicates_margin is not None:
+        insights.append(f"{'⚠️ ' if stats.duplicates > stats.duplicates_margin else 'ℹ️ '} "
+                        f"~{stats.duplicates} duplicate rows (±{stats.duplicates_margin} at 95%, estimated)")
+    elif stats.duplicates > 0:
+        insights.append(f"⚠️  Found {stats.duplicates} duplicate rows ({(stats.duplicates/n_rows*100):.2f}%)")
+    else:
+        insights.append("✓ No duplicate rows detected")
+    
+    # Check key columns for duplicate values
+    for key, count in stats.key_duplicates.items():
+        margin = stats.key_duplicates_margin.get(key)
+        if margin is not None:
+            insights.append(f"{'⚠️ ' if count > margin else 'ℹ️ '} Key ({key}): "
+                            f"~{count} duplicate values (±{margin} at 95%, estimated)")
+        elif count > 0:
+            insights.append(f"⚠️  Key ({key}) is not unique: {count} duplicate values "
+                            f"({(count/n_rows*100):.2f}%)")
         else:
-            insights.append("✓ No duplicate rows detected")
-        
-        # Check for constant columns
-        constant_cols = [col for col in df.columns if df[col].nunique() == 1]
-        if constant_cols:
-            insights.append(f"⚠️  Constant columns (single value): {', '.join(constant_cols)}")
-        
-        # Check for high missing percentage columns
-        high_missing = [col for col in df.columns if (df[col].isnull().sum() / len(df)) > 0.5]
-        if high_missing:
-            insights.append(f"⚠️  Columns with >50% missing values: {', '.join(high_missing)}")
-        
-        if insights:
-            for insight in insights:
-                output.append(f"\n{insight}")
-        
-        output.append("\n" + "=" * 80)
-        
-        return "\n".join(output)
-        
-    except Exception as e:
-        return f"Error computing statistics: {str(e)}"
+            insights.append(f"✓ Key ({key}) is unique")
+    
+    # Check for constant columns
+    if stats.constant_columns:
+        insights.append(f"⚠️  Constant columns (single value): {', '.join(stats.constant_columns)}")
+    
+    # Check for high missing percentage columns
+    high_missing = [col for col, n in stats.missing.items() if n_rows and n / n_rows > 0.5]
+    if high_missing:
+        insights.append(f"⚠️  Columns with >50% missing values: {', '.join(high_missing)}")
+    
+    for insight in insights:
+        output.append(f"\n{insight}")
+    
+    output.append("\n" + "=" * 80)
+    
+    return "\n".join(output)
@@ -0,0 +1,271 @@
+"""DatasetCache - Shared in-process cache of parsed datasets for the data tools."""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Sequence
+
+import pandas as pd
+
+from tools.columnar_cache import arrow_errors, columnar_cache, sidecars_enabled
+from tools.dataset_io import is_csv, parse_columns, read_table
+
+
+# Default memory budget for cached DataFrames (overridable via DATASET_CACHE_MAX_MB)
+DEFAULT_MAX_MEMORY_MB = 2048
+
+
+@dataclass
+class _CacheEntry:
+    """A parsed dataset held by the cache."""
+    df: pd.DataFrame
+    nbytes: int
+    parse_seconds: float
+    derived: Dict[str, Any] = field(default_factory=dict)
+
+
+def file_key(csv_path: str) -> tuple:
+    """
+    Build the cache key for a file on disk.
+
+    The key changes whenever the file is rewritten, so a stale DataFrame is
+    never served after the underlying CSV has been modified.
+
+    Args:
+        csv_path: Path to the dataset file
+
+    Returns:
+        Tuple of (absolute path, size in bytes, modification time in ns)
+    """
+    st = os.stat(csv_path)
+    return (os.path.abspath(csv_path), st.st_size, st.st_mtime_ns)
+
+
+def _entry_key(csv_path: str, columns: Sequence[str]) -> tuple:
+    """Cache key of a file version plus its column projection (None for all columns)."""
+    return file_key(csv_path) + (tuple(columns) if columns else None,)
+
+
+class DatasetCache:
+    """
+    LRU cache of parsed DataFrames shared by the CSV Reader and Data Statistics tools.
+
+    Entries are keyed on path, size, mtime and column projection and held
+    under a memory budget; the least recently used DataFrames are evicted
+    first. A projection of a file whose full frame is cached is sliced from
+    it instead of read again. Cached DataFrames are
+    shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_memory_bytes: int = None):
+        """
+        Args:
+            max_memory_bytes: Memory budget for cached DataFrames. Defaults to
+                DATASET_CACHE_MAX_MB (in megabytes) or DEFAULT_MAX_MEMORY_MB.
+        """
+        if max_memory_bytes is None:
+            max_mb = float(os.getenv("DATASET_CACHE_MAX_MB", DEFAULT_MAX_MEMORY_MB))
+            max_memory_bytes = int(max_mb * 1024 * 1024)
+        self.max_memory_bytes = max_memory_bytes
+
+        self._entries = OrderedDict()
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self._memory_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.parse_seconds = 0.0
+        self.parse_seconds_saved = 0.0
+
+    def load(self, csv_path: str, columns: Sequence[str] = None) -> pd.DataFrame:
+        """
+        Return the parsed DataFrame for a dataset file, parsing it only on a miss.
+
+        Args:
+            csv_path: Path to the dataset file (CSV, compressed CSV, Parquet or Feather)
+            columns: Read only these columns (None or empty for all)
+
+        Returns:
+            The parsed DataFrame (shared, do not modify in place)
+        """
+        columns = parse_columns(columns)
+        key = _entry_key(csv_path, columns)
+
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry.df
+        if columns:
+            full = self._lookup(_entry_key(csv_path, None))
+            if full is not None and all(col in full.df.columns for col in columns):
+                return full.df[columns]
+
+        # Serialize parses of the same file so concurrent callers parse it once
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry.df
+
+            start = time.perf_counter()
+            df = self._parse(csv_path, columns)
+            elapsed = time.perf_counter() - start
+            self._store(key, df, elapsed)
+
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return df
+
+    def derived(self, csv_path: str, name: str, compute: Callable[[pd.DataFrame], Any],
+                columns: Sequence[str] = None) -> Any:
+        """
+        Return a result computed from a cached dataset, computing it only once.
+
+        Derived results (e.g. the statistics report) live with the dataset's
+        cache entry and are dropped with it when the file changes or is evicted.
+        Frames too large to cache, and projections sliced from a cached full
+        frame, are recomputed on every call.
+
+        Args:
+            csv_path: Path to the dataset file
+            name: Name of the derived result
+            compute: Function computing the result from the parsed DataFrame
+            columns: Compute from only these columns (None or empty for all)
+
+        Returns:
+            The derived result (shared, do not modify in place)
+        """
+        columns = parse_columns(columns)
+        df = self.load(csv_path, columns)
+        key = _entry_key(csv_path, columns)
+        with self._lock:
+            derived_lock = self._key_locks.setdefault((key, name), threading.Lock())
+        with derived_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and name in entry.derived:
+                    return entry.derived[name]
+            value = compute(df)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.derived[name] = value
+        with self._lock:
+            self._key_locks.pop((key, name), None)
+        return value
+
+    @staticmethod
+    def _parse(csv_path: str, columns: Sequence[str]) -> pd.DataFrame:
+        """Parse a file, preferring a CSV's dtype-optimized columnar sidecar."""
+        # Parquet and Feather are already columnar and typed: read them directly
+        if sidecars_enabled() and is_csv(csv_path):
+            try:
+                return columnar_cache.load(csv_path, columns)
+            except (ImportError, OSError):
+                # No pyarrow or an unwritable sidecar directory: parse the text
+                pass
+            except arrow_errors():
+                # A sidecar Arrow cannot read or a frame it cannot hold
+                pass
+        return read_table(csv_path, columns)
+
+    def _lookup(self, key: tuple):
+        """Return the entry for key (marking it most recently used), counting the hit."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.parse_seconds_saved += entry.parse_seconds
+            return entry
+
+    def _store(self, key: tuple, df: pd.DataFrame, parse_seconds: float) -> None:
+        """Insert a freshly parsed DataFrame and evict entries over the budget."""
+        nbytes = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            self.misses += 1
+            self.parse_seconds += parse_seconds
+
+            # Frames larger than the whole budget are served but never cached
+            if nbytes > self.max_memory_bytes:
+                return
+
+            # Drop older versions of the same file (it was modified on disk)
+            for stale in [k for k in self._entries if k[0] == key[0] and k[1:3] != key[1:3]]:
+                self._memory_bytes -= self._entries.pop(stale).nbytes
+
+            self._entries[key] = _CacheEntry(df=df, nbytes=nbytes, parse_seconds=parse_seconds)
+            self._memory_bytes += nbytes
+
+            while self._memory_bytes > self.max_memory_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._memory_bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def invalidate(self, csv_path: str = None) -> None:
+        """
+        Drop cached entries.
+
+        Args:
+            csv_path: Drop only entries for this file; drop everything if omitted
+        """
+        with self._lock:
+            if csv_path is None:
+                self._entries.clear()
+                self._memory_bytes = 0
+                return
+            path = os.path.abspath(csv_path)
+            for key in [k for k in self._entries if k[0] == path]:
+                self._memory_bytes -= self._entries.pop(key).nbytes
+
+    def stats(self) -> dict:
+        """
+        Return cache counters.
+
+        Returns:
+            Dictionary with hits, misses, evictions, entries, memory usage,
+            total parse time and parse time saved by hits
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "parse_seconds": self.parse_seconds,
+                "parse_seconds_saved": self.parse_seconds_saved,
+            }
+
+    def summary(self) -> str:
+        """Return a one-line, human-readable summary of the cache counters."""
+        s = self.stats()
+        lookups = s["hits"] + s["misses"]
+        hit_rate = (s["hits"] / lookups * 100) if lookups else 0.0
+        return (
+            f"Dataset cache: {s['hits']} hits / {s['misses']} misses ({hit_rate:.1f}% hit rate), "
+            f"{s['evictions']} evictions, {s['memory_bytes'] / 1024 / 1024:.1f} MB cached, "
+            f"{s['parse_seconds']:.2f}s parsing, {s['parse_seconds_saved']:.2f}s saved"
+        )
+
+
+# Process-wide cache shared by all data tools
+dataset_cache = DatasetCache()
+
+
+def load_dataset(csv_path: str, columns: Sequence[str] = None) -> pd.DataFrame:
+    """
+    Load a dataset file through the shared dataset cache.
+
+    Args:
+        csv_path: Path to the dataset file
+        columns: Read only these columns (None or empty for all)
+
+    Returns:
+        The parsed DataFrame (shared, do not modify in place)
+    """
+    return dataset_cache.load(csv_path, columns)
@@ -0,0 +1,306 @@
+"""Format detection and column-projecting readers for dataset files.
+
+The data tools accept plain CSV, gzip- or zstd-compressed CSV, Parquet and
+Feather (Arrow IPC) files. The format is detected from the file's leading
+bytes, not its extension. Column projection is pushed down into each reader:
+Parquet and Feather read only the requested columns from disk and CSV parses
+only them.
+"""
+import gzip
+import os
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+
+CSV = "csv"
+CSV_GZIP = "csv.gz"
+CSV_ZSTD = "csv.zst"
+PARQUET = "parquet"
+FEATHER = "feather"
+
+FORMAT_LABELS = {
+    CSV: "CSV",
+    CSV_GZIP: "gzip-compressed CSV",
+    CSV_ZSTD: "zstd-compressed CSV",
+    PARQUET: "Parquet",
+    FEATHER: "Feather (Arrow IPC)",
+}
+
+# Compression names understood by pandas.read_csv
+_CSV_COMPRESSION = {CSV: None, CSV_GZIP: "gzip", CSV_ZSTD: "zstd"}
+
+_MAGIC = (
+    (b"PAR1", PARQUET),
+    (b"ARROW1", FEATHER),
+    (b"FEA1", FEATHER),
+    (b"\x1f\x8b", CSV_GZIP),
+    (b"\x28\xb5\x2f\xfd", CSV_ZSTD),
+)
+
+
+def detect_format(path: str) -> str:
+    """
+    Detect a dataset file's format from its leading bytes.
+
+    Args:
+        path: Path to the dataset file
+
+    Returns:
+        One of CSV, CSV_GZIP, CSV_ZSTD, PARQUET or FEATHER; anything
+        unrecognized is treated as plain CSV
+    """
+    with open(path, "rb") as f:
+        head = f.read(8)
+    for magic, fmt in _MAGIC:
+        if head.startswith(magic):
+            return fmt
+    return CSV
+
+
+def is_plain_csv(path: str) -> bool:
+    """Return True for uncompressed CSV, the only format with seekable text rows."""
+    return detect_format(path) == CSV
+
+
+def is_csv(path: str) -> bool:
+    """Return True for plain or compressed CSV."""
+    return detect_format(path) in _CSV_COMPRESSION
+
+
+def parse_columns(spec) -> List[str]:
+    """
+    Parse a column projection from a comma-separated string or a sequence.
+
+    Args:
+        spec: "a,b,c", a list of names, or empty for every column
+
+    Returns:
+        Column names in the given order, without duplicates
+    """
+    if not spec:
+        return []
+    names = spec.split(",") if isinstance(spec, str) else spec
+    return list(dict.fromkeys(name.strip() for name in names if name.strip()))
+
+
+def open_binary(path: str, raw=None):
+    """
+    Open a CSV file as a stream of decompressed bytes.
+
+    Args:
+        path: Path to a plain or compressed CSV file
+        raw: Already-open binary file of path to read through (plain CSV
+            returns it as is); None opens path
+
+    Returns:
+        Binary file object (close it, or use it as a context manager)
+    """
+    fmt = detect_format(path)
+    source = path if raw is None else raw
+    if fmt == CSV_GZIP:
+        return gzip.open(source, "rb")
+    if fmt == CSV_ZSTD:
+        import zstandard
+        return zstandard.open(source, "rb", closefd=raw is None)
+    if fmt == CSV:
+        return open(path, "rb") if raw is None else raw
+    raise ValueError(f"{FORMAT_LABELS[fmt]} files have no text rows")
+
+
+def is_feather_v1(path: str) -> bool:
+    """Return True for a Feather v1 file, which is not an Arrow IPC file."""
+    with open(path, "rb") as f:
+        return f.read(4) == b"FEA1"
+
+
+def open_feather(path: str, columns: Sequence[str] = None):
+    """
+    Open a Feather file as a memory-mapped Arrow table.
+
+    Only the projected columns are read; compressed files decompress just
+    those, and uncompressed files page in only the rows that are converted.
+
+    Args:
+        path: Path to the Feather file
+        columns: Columns to read (None or empty for all)
+
+    Returns:
+        pyarrow.Table backed by the memory map
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    return feather.read_table(pa.memory_map(path, "r"), columns=list(columns) if columns else None,
+                              memory_map=True)
+
+
+def read_columns(path: str) -> List[str]:
+    """
+    Return a dataset's column names without reading its rows.
+
+    Args:
+        path: Path to the dataset file
+
+    Returns:
+        Column names in file order
+    """
+    fmt = detect_format(path)
+    if fmt == PARQUET:
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+    if fmt == FEATHER:
+        if is_feather_v1(path):
+            # Never compressed: the memory-mapped table costs no row reads
+            return list(open_feather(path).schema.names)
+        import pyarrow as pa
+        with pa.memory_map(path, "r") as source:
+            return list(pa.ipc.open_file(source).schema.names)
+    return list(pd.read_csv(path, nrows=0, compression=_CSV_COMPRESSION[fmt]).columns)
+
+
+def check_columns(path: str, columns: Sequence[str]) -> None:
+    """
+    Raise ValueError if any projected column is not in the file.
+
+    Args:
+        path: Path to the dataset file
+        columns: Requested columns
+    """
+    if not columns:
+        return
+    available = set(read_columns(path))
+    missing = [col for col in columns if col not in available]
+    if missing:
+        raise ValueError(f"Column(s) not found: {', '.join(missing)}")
+
+
+def row_count(path: str) -> Optional[int]:
+    """
+    Return the row count from file metadata.
+
+    Args:
+        path: Path to the dataset file
+
+    Returns:
+        Number of rows for Parquet and Feather, None for CSV (which has to
+        be scanned)
+    """
+    fmt = detect_format(path)
+    if fmt == PARQUET:
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    if fmt == FEATHER:
+        if is_feather_v1(path):
+            return open_feather(path).num_rows
+        # Counted from the record batch headers, without decompressing any batch
+        import pyarrow.dataset as ds
+        return ds.dataset(path, format="ipc").count_rows()
+    return None
+
+
+def read_table(path: str, columns: Sequence[str] = None, nrows: int = None) -> pd.DataFrame:
+    """
+    Read a dataset file into a DataFrame, reading only the projected columns.
+
+    Args:
+        path: Path to the dataset file
+        columns: Columns to read (None or empty for all), in this order
+        nrows: Read only the first nrows rows
+
+    Returns:
+        The dataset (or its projection)
+
+    Raises:
+        ValueError: If a projected column does not exist
+    """
+    columns = parse_columns(columns)
+    check_columns(path, columns)
+    fmt = detect_format(path)
+    if fmt == PARQUET:
+        if nrows is None:
+            return pd.read_parquet(path, columns=columns or None)
+        frames, remaining = [], nrows
+        for chunk in iter_chunks(path, max(nrows, 1), columns):
+            if remaining <= 0:
+                break
+            frames.append(chunk.head(remaining))
+            remaining -= len(frames[-1])
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns or read_columns(path))
+    if fmt == FEATHER:
+        table = open_feather(path, columns)
+        if nrows is not None:
+            table = table.slice(0, nrows)
+        return table.to_pandas()
+    df = pd.read_csv(path, usecols=columns or None, nrows=nrows, compression=_CSV_COMPRESSION[fmt])
+    # usecols keeps file order; honour the requested order
+    return df[columns] if columns else df
+
+
+def scan_chunks(path: str, chunk_size: int, columns: Sequence[str] = None) -> Iterator[Tuple[pd.DataFrame, float]]:
+    """
+    Yield a dataset file as DataFrames of at most chunk_size rows, with progress.
+
+    Memory stays bounded by one chunk: CSV is parsed incrementally (through
+    a streaming decompressor when compressed), Parquet decoded batch by
+    batch and Feather sliced from a memory map.
+
+    Args:
+        path: Path to the dataset file
+        chunk_size: Maximum rows per chunk
+        columns: Columns to read (None or empty for all)
+
+    Yields:
+        Tuples of (chunk, share of the file consumed so far); the share is
+        measured in on-disk bytes for CSV and in rows for Parquet and Feather
+    """
+    columns = parse_columns(columns)
+    check_columns(path, columns)
+    fmt = detect_format(path)
+    if fmt in (PARQUET, FEATHER):
+        total = row_count(path) or 1
+        rows = 0
+        for chunk in _iter_columnar(path, fmt, chunk_size, columns):
+            rows += len(chunk)
+            yield chunk, rows / total
+        return
+
+    size = max(os.path.getsize(path), 1)
+    with open(path, "rb") as raw, open_binary(path, raw) as stream:
+        with pd.read_csv(stream, chunksize=chunk_size, usecols=columns or None) as reader:
+            for chunk in reader:
+                # Read-ahead buffering makes this a slight overestimate
+                yield (chunk[columns] if columns else chunk), min(raw.tell() / size, 1.0)
+
+
+def _iter_columnar(path: str, fmt: str, chunk_size: int, columns: List[str]) -> Iterator[pd.DataFrame]:
+    if fmt == PARQUET:
+        import pyarrow.parquet as pq
+        with pq.ParquetFile(path) as parquet:
+            for batch in parquet.iter_batches(batch_size=chunk_size, columns=columns or None):
+                yield batch.to_pandas()
+        return
+    table = open_feather(path, columns)
+    for offset in range(0, table.num_rows, chunk_size):
+        yield table.slice(offset, chunk_size).to_pandas()
+
+
+def iter_chunks(path: str, chunk_size: int, columns: Sequence[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield a dataset file as DataFrames of at most chunk_size rows.
+
+    Args:
+        path: Path to the dataset file
+        chunk_size: Maximum rows per chunk
+        columns: Columns to read (None or empty for all)
+
+    Yields:
+        DataFrame chunks in file order (see scan_chunks)
+    """
+    for chunk, _ in scan_chunks(path, chunk_size, columns):
+        yield chunk
+
+
+def describe_format(path: str) -> str:
+    """Return a human-readable label for a dataset file's format."""
+    return FORMAT_LABELS[detect_format(path)]
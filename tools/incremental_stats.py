@@ -0,0 +1,271 @@
+"""Incremental streaming statistics for append-only datasets.
+
+The streaming profiler's state (counts, moment sums, quantile sketches,
+distinct-count sketches and top-K counters) is mergeable, so it is saved in
+the sidecar directory after each pass together with the byte offset it
+covers and a checksum of the bytes before that offset. When the file has
+only been appended to since, the next pass parses just the new tail and
+merges it into the saved state, so the cost scales with the new rows.
+
+The state is a pickle: the sidecar directory (DATASET_SIDECAR_DIR) must be
+trusted, like any directory code is loaded from. States in a file that is
+not owned by the current user, or that others can write to, are ignored.
+"""
+import hashlib
+import io
+import os
+import pickle
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+
+from tools.columnar_cache import sidecar_dir, sidecars_enabled
+from tools.dataset_io import is_plain_csv
+from tools.stats_kernel import DatasetStats
+from tools.streaming_stats import DEFAULT_CHUNK_SIZE, StreamingProfiler, should_stream
+
+
+# Bump when the profiler or state layout changes so old states are not reused
+STATE_FORMAT_VERSION = 3
+
+# The prefix checksum hashes every byte before the offset by default;
+# DATA_STATS_INCREMENTAL_VERIFY=sampled covers only the head, the last bytes
+# before the offset and evenly spaced blocks in between
+FINGERPRINT_EDGE_BYTES = 1024 * 1024
+FINGERPRINT_BLOCKS = 16
+FINGERPRINT_BLOCK_BYTES = 64 * 1024
+
+INCREMENTAL_MODES = ("auto", "true", "false")
+
+
+def incremental_mode() -> str:
+    """
+    Return the incremental profiling mode from DATA_STATS_INCREMENTAL.
+
+    "auto" (default) keeps state for files profiled in streaming mode, "true"
+    profiles every file incrementally and "false" disables saved state.
+    """
+    mode = os.getenv("DATA_STATS_INCREMENTAL", "auto").strip().lower() or "auto"
+    if mode not in INCREMENTAL_MODES:
+        raise ValueError(
+            f"Invalid DATA_STATS_INCREMENTAL '{mode}' (expected one of: {', '.join(INCREMENTAL_MODES)})"
+        )
+    return mode
+
+
+def use_incremental(csv_path: str, incremental: bool = False) -> bool:
+    """
+    Return True if the file should be profiled against saved state.
+
+    Only uncompressed CSV qualifies: appended rows are found by byte offset.
+
+    Args:
+        csv_path: Path to the CSV file
+        incremental: Force incremental profiling regardless of file size
+
+    Returns:
+        True when saved state is enabled for this file
+    """
+    mode = incremental_mode()
+    if mode == "false" or not sidecars_enabled() or not is_plain_csv(csv_path):
+        return False
+    return incremental or mode == "true" or should_stream(csv_path)
+
+
+@dataclass
+class ProfileState:
+    """Saved streaming profile of the first `offset` bytes of a file."""
+    path: str
+    offset: int
+    fingerprint: str
+    verify: str
+    profiler: StreamingProfiler
+
+
+def state_path(csv_path: str) -> str:
+    """Return the state file for a dataset, keyed by its absolute path."""
+    key = hashlib.blake2b(os.path.abspath(csv_path).encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(sidecar_dir(), f"{key}.stats.v{STATE_FORMAT_VERSION}.pkl")
+
+
+def _verify_mode() -> str:
+    return "sampled" if os.getenv("DATA_STATS_INCREMENTAL_VERIFY", "").strip().lower() == "sampled" else "full"
+
+
+def prefix_fingerprint(csv_path: str, offset: int, verify: str = "full") -> str:
+    """
+    Return a checksum of the first `offset` bytes of a file.
+
+    Args:
+        csv_path: Path to the file
+        offset: Number of leading bytes covered
+        verify: "full" hashes every byte; "sampled" hashes the head, the last
+            bytes before the offset and evenly spaced blocks in between, so
+            an in-place edit between the sampled blocks goes unnoticed
+
+    Returns:
+        Hex BLAKE2b digest
+    """
+    if verify == "full" or offset <= 2 * FINGERPRINT_EDGE_BYTES:
+        ranges = [(0, offset)]
+    else:
+        ranges = [(0, FINGERPRINT_EDGE_BYTES), (offset - FINGERPRINT_EDGE_BYTES, offset)]
+        span = offset - 2 * FINGERPRINT_EDGE_BYTES
+        step = span // (FINGERPRINT_BLOCKS + 1)
+        for i in range(1, FINGERPRINT_BLOCKS + 1):
+            start = FINGERPRINT_EDGE_BYTES + i * step
+            ranges.append((start, min(start + FINGERPRINT_BLOCK_BYTES, offset - FINGERPRINT_EDGE_BYTES)))
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(offset).encode())
+    with open(csv_path, "rb") as f:
+        for start, end in sorted(ranges):
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                block = f.read(min(remaining, 8 * 1024 * 1024))
+                if not block:
+                    break
+                digest.update(block)
+                remaining -= len(block)
+    return digest.hexdigest()
+
+
+def _trusted(f) -> bool:
+    """Return False for a state file owned by another user or writable by others."""
+    if not hasattr(os, "getuid"):
+        return True
+    info = os.fstat(f.fileno())
+    return info.st_uid == os.getuid() and not info.st_mode & 0o022
+
+
+def load_state(csv_path: str) -> Optional[ProfileState]:
+    """
+    Return the saved state for a dataset, or None if there is none.
+
+    The state is unpickled, so the sidecar directory must be trusted; files
+    owned by another user or writable by others are ignored.
+    """
+    try:
+        with open(state_path(csv_path), "rb") as f:
+            if not _trusted(f):
+                return None
+            state = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+    return state if isinstance(state, ProfileState) else None
+
+
+def save_state(csv_path: str, state: ProfileState) -> None:
+    """Write the state for a dataset atomically."""
+    path = state_path(csv_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of a binary file that stops at a fixed end offset."""
+
+    def __init__(self, f, end: int):
+        self._f = f
+        self._end = end
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        remaining = self._end - self._f.tell()
+        if remaining <= 0:
+            return 0
+        view = memoryview(buffer)
+        return self._f.readinto(view[:min(len(view), remaining)])
+
+
+def _profile_range(csv_path: str, start: int, end: int, chunk_size: int,
+                   columns: Optional[list] = None) -> StreamingProfiler:
+    """Profile bytes [start, end) of a CSV; a start past the header needs the column names."""
+    profiler = StreamingProfiler()
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        stream = io.BufferedReader(_ByteRange(f, end))
+        if columns is None:
+            reader = pd.read_csv(stream, chunksize=chunk_size)
+        else:
+            reader = pd.read_csv(stream, chunksize=chunk_size, header=None, names=columns)
+        with reader:
+            for chunk in reader:
+                profiler.update(chunk)
+    return profiler
+
+
+def _ends_with_newline(csv_path: str, offset: int) -> bool:
+    if offset == 0:
+        return False
+    with open(csv_path, "rb") as f:
+        f.seek(offset - 1)
+        return f.read(1) == b"\n"
+
+
+def incremental_stats(csv_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> DatasetStats:
+    """
+    Profile a CSV in streaming mode, reusing saved state for unchanged bytes.
+
+    When the saved state's prefix checksum still matches, only the bytes
+    appended since the last run are parsed and merged into it; otherwise the
+    whole file is profiled. The updated state is saved for the next run when
+    the file ends on a complete row.
+
+    Args:
+        csv_path: Path to the CSV file
+        chunk_size: Number of rows per chunk
+
+    Returns:
+        DatasetStats flagged as approximate, with a note on the rows reused
+    """
+    start = time.perf_counter()
+    # Bytes appended while this pass runs are left for the next one
+    size = os.path.getsize(csv_path)
+    verify = _verify_mode()
+    state = load_state(csv_path)
+
+    reused = 0
+    if (state is not None and state.profiler.columns and state.offset <= size
+            and state.verify == verify
+            and prefix_fingerprint(csv_path, state.offset, verify) == state.fingerprint):
+        profiler = state.profiler
+        reused = profiler.rows
+        if size > state.offset:
+            tail = _profile_range(csv_path, state.offset, size, chunk_size, columns=profiler.columns)
+            profiler.merge(tail)
+            tail.close()
+        note = (f"Incremental: reused saved state for {reused:,} rows and profiled "
+                f"{profiler.rows - reused:,} appended rows")
+        if verify == "sampled":
+            note += " (unchanged prefix verified from sampled blocks only; in-place edits may go unnoticed)"
+    else:
+        profiler = _profile_range(csv_path, 0, size, chunk_size)
+        note = ("Incremental: file changed other than by appending; profiled all rows"
+                if state is not None else "Incremental: no saved state; profiled all rows")
+
+    if profiler.columns and _ends_with_newline(csv_path, size):
+        save_state(csv_path, ProfileState(
+            path=os.path.abspath(csv_path),
+            offset=size,
+            fingerprint=prefix_fingerprint(csv_path, size, verify),
+            verify=verify,
+            profiler=profiler,
+        ))
+    elif profiler.columns:
+        note += " (state not saved: the file does not end with a newline)"
+
+    try:
+        stats = profiler.to_stats(csv_path, chunk_size=chunk_size)
+    finally:
+        profiler.close()
+    stats.notes.append(f"{note} in {time.perf_counter() - start:.2f}s")
+    return stats
@@ -0,0 +1,540 @@
+"""Scalable pairwise association measures behind the Relationships tool.
+
+Four measures, each matched to the column types involved:
+
+- Pearson and Spearman correlation between numeric columns
+- Cramér's V (bias-corrected) between categorical columns
+- Correlation ratio (eta) between a categorical and a numeric column
+- Mutual information between every column and a target column
+
+Everything is computed with blocked matrix products instead of per-pair
+loops: numeric columns as (value, missing-mask) matrices, so that pairwise-
+complete correlations fall out of a few BLAS calls per block of columns, and
+categorical columns as integer category codes expanded block by block into
+one-hot matrices whose products are every contingency table at once. Large
+tables are analyzed on a uniform row sample, and only the strongest pairs
+are kept.
+"""
+from dataclasses import dataclass, field, replace
+import heapq
+import itertools
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Rows analyzed at most (overridable via RELATIONSHIPS_SAMPLE_ROWS), further
+# capped so that rows x columns stays under SAMPLE_CELLS on wide tables
+DEFAULT_SAMPLE_ROWS = 100_000
+SAMPLE_CELLS = 20_000_000
+
+DEFAULT_TOP_K = 20
+
+# Numeric columns per block of the correlation matrices
+NUMERIC_BLOCK_COLUMNS = 256
+
+# Category levels (one-hot columns) per block of the contingency products
+CATEGORICAL_BLOCK_LEVELS = 512
+
+# Categories kept per column; rarer ones are pooled into one level
+MAX_LEVELS = 50
+
+# Categorical columns with more distinct values than this share of rows are
+# identifiers, not features
+ID_LIKE_RATIO = 0.5
+
+# Integer columns with a distinct value per row whose values span at most
+# this many times the row count are row numbers or sequential IDs
+ROW_INDEX_SPAN = 2
+
+# Quantile bins used to discretize numeric columns for mutual information
+MI_BINS = 10
+
+# Pairs observed on fewer rows than this are not reported
+MIN_PAIR_ROWS = 10
+
+
+def is_row_index(values: pd.Series, n_rows: Optional[int] = None) -> bool:
+    """
+    Return True for an integer column that numbers the rows (e.g. ``id`` = 0..n).
+
+    Args:
+        values: The column (of the full dataset or of a uniform sample)
+        n_rows: Row count of the full dataset when values is a sample
+
+    Returns:
+        True if every row has a distinct value and the values span a dense
+        range (at most ROW_INDEX_SPAN times the row count)
+    """
+    if (not pd.api.types.is_integer_dtype(values) or pd.api.types.is_bool_dtype(values)
+            or len(values) < 2 or values.isna().any()):
+        return False
+    span = int(values.max()) - int(values.min()) + 1
+    return span <= ROW_INDEX_SPAN * max(n_rows or 0, len(values)) and values.is_unique
+
+
+@dataclass
+class Relationship:
+    """Association between two columns."""
+    a: str
+    b: str
+    kind: str  # "num-num", "cat-cat" or "num-cat"
+    measures: Dict[str, float]
+    n: int
+
+    @property
+    def strength(self) -> float:
+        return max(abs(v) for v in self.measures.values())
+
+
+@dataclass
+class TargetAssociation:
+    """Mutual information between one column and the target."""
+    column: str
+    mutual_info: float
+    normalized: float
+    n: int
+
+
+@dataclass
+class RelationshipReport:
+    """Strongest associations found in one dataset."""
+    path: str
+    n_rows: int
+    sample_rows: Optional[int]
+    numeric_columns: List[str]
+    categorical_columns: List[str]
+    pairs: List[Relationship]
+    target: str = ""
+    target_mi: List[TargetAssociation] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+    # Mutual information codes of the analyzed columns, kept on target-less
+    # reports so a target's associations can be added without re-ranking
+    mi_codes: Optional[Dict[str, Tuple[np.ndarray, int]]] = field(default=None, repr=False, compare=False)
+
+    @property
+    def sampled(self) -> bool:
+        return self.sample_rows is not None
+
+
+def resolve_sample_rows(sample_rows: int, n_cols: int) -> int:
+    """Row budget for a table of n_cols columns (0 uses RELATIONSHIPS_SAMPLE_ROWS)."""
+    rows = sample_rows or int(os.getenv("RELATIONSHIPS_SAMPLE_ROWS", DEFAULT_SAMPLE_ROWS))
+    return max(min(rows, SAMPLE_CELLS // max(n_cols, 1)), 1000)
+
+
+def sample_frame(df: pd.DataFrame, max_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Uniform sample of at most max_rows rows (the frame itself when smaller)."""
+    if len(df) <= max_rows:
+        return df
+    return df.sample(n=max_rows, random_state=seed)
+
+
+def encode_categories(series: pd.Series, max_levels: int = MAX_LEVELS) -> Tuple[np.ndarray, int]:
+    """
+    Integer category codes for a column, -1 for missing values.
+
+    The max_levels - 1 most frequent categories keep their own code; any
+    others share the last one.
+
+    Returns:
+        Tuple of (codes, number of levels)
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    n_levels = len(uniques)
+    if n_levels <= max_levels:
+        return codes.astype(np.int32), n_levels
+    counts = np.bincount(codes[codes >= 0], minlength=n_levels)
+    keep = np.argsort(-counts, kind="stable")[:max_levels - 1]
+    remap = np.full(n_levels, max_levels - 1, dtype=np.int32)
+    remap[keep] = np.arange(max_levels - 1, dtype=np.int32)
+    return np.where(codes >= 0, remap[np.maximum(codes, 0)], -1).astype(np.int32), max_levels
+
+
+def _level_blocks(levels: List[int], max_levels: int = CATEGORICAL_BLOCK_LEVELS) -> List[Tuple[int, int]]:
+    """Split coded columns into consecutive (start, stop) blocks of at most max_levels levels."""
+    blocks, start, total = [], 0, 0
+    for i, k in enumerate(levels):
+        if i > start and total + k > max_levels:
+            blocks.append((start, i))
+            start, total = i, 0
+        total += k
+    if levels:
+        blocks.append((start, len(levels)))
+    return blocks
+
+
+def _one_hot(codes: np.ndarray, levels: List[int], dtype=np.float64) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Dense 0/1 matrix with one column per category of every coded column.
+
+    Args:
+        codes: Category codes, rows x columns, -1 for missing values
+        levels: Number of levels of each column
+        dtype: Matrix dtype
+
+    Returns:
+        Tuple of (rows x total levels matrix, start offset of each column's
+        levels plus the total)
+    """
+    offsets = np.concatenate([[0], np.cumsum(levels)]).astype(np.int64)
+    # Flat positions of the ones; missing values land in a scratch column
+    # that is sliced off
+    width = offsets[-1] + 1
+    flat = np.where(codes >= 0, codes + offsets[:-1], offsets[-1]).astype(np.int64)
+    flat += (np.arange(codes.shape[0], dtype=np.int64) * width)[:, None]
+    matrix = np.zeros((codes.shape[0], width), dtype=dtype)
+    matrix.reshape(-1)[flat.ravel()] = 1
+    return matrix[:, :-1], offsets
+
+
+def _group_sum(values: np.ndarray, offsets: np.ndarray, axis: int) -> np.ndarray:
+    """Sum the levels of each coded column along one axis."""
+    return np.add.reduceat(values, offsets[:-1], axis=axis)
+
+
+def _centered(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, bool]:
+    """Center columns on their means; missing entries become 0 with a 0 mask."""
+    mask = ~np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        means = np.nanmean(np.where(mask.any(axis=0), values, 0.0), axis=0)
+    centered = np.where(mask, values - means, 0.0)
+    return centered, mask.astype(np.float64), bool(mask.all())
+
+
+def _block_correlation(xi, mi, xj, mj, complete: bool):
+    """
+    Pairwise-complete Pearson correlation between two column blocks.
+
+    Args:
+        xi, xj: Centered values, 0 where missing (rows x block columns)
+        mi, mj: 1/0 masks of present values
+        complete: Neither block has missing values
+
+    Returns:
+        Tuple of (correlations, pair counts), each block_i x block_j
+    """
+    if complete:
+        n = np.full((xi.shape[1], xj.shape[1]), float(xi.shape[0]))
+        cov = xi.T @ xj
+        vx = np.square(xi).sum(axis=0)[:, None]
+        vy = np.square(xj).sum(axis=0)[None, :]
+    else:
+        n = mi.T @ mj
+        safe_n = np.maximum(n, 1.0)
+        sx = xi.T @ mj
+        sy = mi.T @ xj
+        cov = xi.T @ xj - sx * sy / safe_n
+        vx = np.square(xi).T @ mj - np.square(sx) / safe_n
+        vy = mi.T @ np.square(xj) - np.square(sy) / safe_n
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = cov / np.sqrt(vx * vy)
+    r[(n < MIN_PAIR_ROWS) | ~np.isfinite(r)] = np.nan
+    return np.clip(r, -1.0, 1.0), n
+
+
+def _block_cramers_v(tables: np.ndarray, offsets_i: np.ndarray, offsets_j: np.ndarray):
+    """
+    Bias-corrected Cramér's V (Bergsma, 2013) for every pair of two column blocks.
+
+    Args:
+        tables: Product of the two blocks' one-hot matrices; rows are the
+            levels of block i, columns the levels of block j, so each pair's
+            contingency table is one sub-matrix
+        offsets_i, offsets_j: Level offsets of the columns in each block
+
+    Returns:
+        Tuple of (V, rows counted), each block_i x block_j columns; V is NaN
+        where undefined
+    """
+    col_i = np.repeat(np.arange(len(offsets_i) - 1), np.diff(offsets_i))
+    col_j = np.repeat(np.arange(len(offsets_j) - 1), np.diff(offsets_j))
+    # Marginals of each pair's table, over the rows where both columns are present
+    row_totals = _group_sum(tables, offsets_j, axis=1)  # levels_i x columns_j
+    col_totals = _group_sum(tables, offsets_i, axis=0)  # columns_i x levels_j
+    n = _group_sum(row_totals, offsets_i, axis=0)       # columns_i x columns_j
+    with np.errstate(invalid="ignore", divide="ignore"):
+        expected = row_totals[:, col_j] * col_totals[col_i, :] / n[col_i][:, col_j]
+        cells = np.where(expected > 0, np.square(tables - expected) / expected, 0.0)
+        chi2 = _group_sum(_group_sum(cells, offsets_i, axis=0), offsets_j, axis=1)
+        # Table shape without empty rows and columns
+        r = _group_sum((row_totals > 0).astype(np.float64), offsets_i, axis=0)
+        k = _group_sum((col_totals > 0).astype(np.float64), offsets_j, axis=1)
+        phi2 = np.maximum(chi2 / n - (k - 1) * (r - 1) / (n - 1), 0.0)
+        r_corr = r - np.square(r - 1) / (n - 1)
+        k_corr = k - np.square(k - 1) / (n - 1)
+        denominator = np.minimum(k_corr - 1, r_corr - 1)
+        v = np.sqrt(phi2 / denominator)
+    v[(n < MIN_PAIR_ROWS) | (r < 2) | (k < 2) | (denominator <= 0) | ~np.isfinite(v)] = np.nan
+    return np.minimum(v, 1.0), n
+
+
+def _block_correlation_ratio(onehot: np.ndarray, offsets: np.ndarray, xc: np.ndarray, mask: np.ndarray):
+    """
+    Correlation ratio (eta) for every categorical column of a one-hot block
+    against every numeric column of a value block.
+
+    Returns:
+        Tuple of (eta, rows counted), each categorical x numeric columns; eta
+        is NaN where undefined
+    """
+    # Per-category counts, sums and sums of squares for every numeric column
+    counts = onehot.T @ mask
+    sums = onehot.T @ xc
+    squares = onehot.T @ np.square(xc)
+    n = _group_sum(counts, offsets, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        grand = np.square(_group_sum(sums, offsets, axis=0)) / n
+        ss_total = _group_sum(squares, offsets, axis=0) - grand
+        ss_between = _group_sum(np.square(sums) / np.where(counts > 0, counts, 1.0), offsets, axis=0) - grand
+        eta = np.sqrt(np.clip(ss_between / ss_total, 0.0, 1.0))
+    groups = _group_sum((counts > 0).astype(np.float64), offsets, axis=0)
+    eta[(n < MIN_PAIR_ROWS) | ~(ss_total > 0) | (groups < 2)] = np.nan
+    return eta, n
+
+
+_tie_breaker = itertools.count()
+
+
+def _collect_top(heap: list, top_k: int, strength: np.ndarray, build) -> None:
+    """
+    Push the top_k entries of a block's strength matrix onto a bounded min-heap.
+
+    Args:
+        heap: Heap of (strength, tie-breaker, Relationship), at most top_k long
+        top_k: Number of pairs kept overall
+        strength: Block of pair strengths, NaN for pairs not to report
+        build: Function (row, column) -> Relationship for a kept entry
+    """
+    flat = np.where(np.isnan(strength), -1.0, strength).ravel()
+    k = min(top_k, flat.size)
+    if not k:
+        return
+    for idx in np.argpartition(-flat, k - 1)[:k]:
+        if flat[idx] < 0 or (len(heap) >= top_k and flat[idx] <= heap[0][0]):
+            continue
+        item = (float(flat[idx]), next(_tie_breaker), build(*divmod(int(idx), strength.shape[1])))
+        if len(heap) < top_k:
+            heapq.heappush(heap, item)
+        else:
+            heapq.heapreplace(heap, item)
+
+
+def _numeric_pairs(names: List[str], xc: np.ndarray, mask: np.ndarray, complete: bool,
+                   ranks: np.ndarray, top_k: int) -> List[Relationship]:
+    """Strongest Pearson/Spearman pairs, computed block by block."""
+    rc, _, _ = _centered(ranks)
+    heap = []
+    p = len(names)
+    for i0 in range(0, p, NUMERIC_BLOCK_COLUMNS):
+        bi = slice(i0, min(i0 + NUMERIC_BLOCK_COLUMNS, p))
+        for j0 in range(i0, p, NUMERIC_BLOCK_COLUMNS):
+            bj = slice(j0, min(j0 + NUMERIC_BLOCK_COLUMNS, p))
+            pearson, n = _block_correlation(xc[:, bi], mask[:, bi], xc[:, bj], mask[:, bj], complete)
+            spearman, _ = _block_correlation(rc[:, bi], mask[:, bi], rc[:, bj], mask[:, bj], complete)
+            strength = np.fmax(np.abs(pearson), np.abs(spearman))
+            if i0 == j0:
+                strength[np.tril_indices_from(strength)] = np.nan
+            _collect_top(heap, top_k, strength, lambda a, b: Relationship(
+                a=names[i0 + a], b=names[j0 + b], kind="num-num",
+                measures={"pearson": float(pearson[a, b]), "spearman": float(spearman[a, b])},
+                n=int(n[a, b]),
+            ))
+    return [item[2] for item in heap]
+
+
+def _categorical_pairs(names: List[str], codes: np.ndarray, levels: List[int],
+                       top_k: int) -> List[Relationship]:
+    """Strongest Cramér's V pairs from blockwise one-hot products."""
+    heap = []
+    blocks = _level_blocks(levels)
+    # Counts are exact in float32 up to 2**24 rows, at twice the BLAS speed
+    dtype = np.float32 if len(codes) < 2 ** 24 else np.float64
+    for bi, (i0, i1) in enumerate(blocks):
+        zi, oi = _one_hot(codes[:, i0:i1], levels[i0:i1], dtype)
+        for j0, j1 in blocks[bi:]:
+            zj, oj = (zi, oi) if j0 == i0 else _one_hot(codes[:, j0:j1], levels[j0:j1], dtype)
+            # Every contingency table between the two blocks in one product
+            v, n = _block_cramers_v((zi.T @ zj).astype(np.float64), oi, oj)
+            if j0 == i0:
+                v[np.tril_indices_from(v)] = np.nan
+            _collect_top(heap, top_k, v, lambda a, b: Relationship(
+                a=names[i0 + a], b=names[j0 + b], kind="cat-cat",
+                measures={"cramers_v": float(v[a, b])}, n=int(n[a, b]),
+            ))
+    return [item[2] for item in heap]
+
+
+def _mixed_pairs(num_names: List[str], xc: np.ndarray, mask: np.ndarray, cat_names: List[str],
+                 codes: np.ndarray, levels: List[int], top_k: int) -> List[Relationship]:
+    """Strongest correlation ratios between categorical and numeric columns."""
+    heap = []
+    p = len(num_names)
+    for i0, i1 in _level_blocks(levels):
+        onehot, offsets = _one_hot(codes[:, i0:i1], levels[i0:i1])
+        for j0 in range(0, p, NUMERIC_BLOCK_COLUMNS):
+            bj = slice(j0, min(j0 + NUMERIC_BLOCK_COLUMNS, p))
+            eta, n = _block_correlation_ratio(onehot, offsets, xc[:, bj], mask[:, bj])
+            _collect_top(heap, top_k, eta, lambda a, b: Relationship(
+                a=cat_names[i0 + a], b=num_names[j0 + b], kind="num-cat",
+                measures={"correlation_ratio": float(eta[a, b])}, n=int(n[a, b]),
+            ))
+    return [item[2] for item in heap]
+
+
+def _quantile_codes(ranks: np.ndarray, bins: int = MI_BINS) -> List[np.ndarray]:
+    """Discretize numeric columns into quantile bins using their ranks."""
+    counts = (~np.isnan(ranks)).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        binned = np.floor((ranks - 1) / np.maximum(counts, 1) * bins)
+    codes = np.where(np.isnan(binned), -1, np.clip(binned, 0, bins - 1)).astype(np.int32)
+    return [codes[:, j] for j in range(codes.shape[1])]
+
+
+def mutual_information(table: np.ndarray) -> Tuple[float, float, int]:
+    """
+    Mutual information (nats) of a contingency table.
+
+    Returns:
+        Tuple of (MI, MI normalized by the smaller marginal entropy, rows counted)
+    """
+    n = table.sum()
+    if n < MIN_PAIR_ROWS:
+        return float("nan"), float("nan"), int(n)
+    joint = table / n
+    px = joint.sum(axis=1, keepdims=True)
+    py = joint.sum(axis=0, keepdims=True)
+    nonzero = joint > 0
+    mi = float((joint[nonzero] * np.log(joint[nonzero] / (px @ py)[nonzero])).sum())
+    entropy = min(-(p[p > 0] * np.log(p[p > 0])).sum() for p in (px.ravel(), py.ravel()))
+    return max(mi, 0.0), (float(mi / entropy) if entropy > 0 else 0.0), int(n)
+
+
+def _target_mi(target_codes: np.ndarray, target_levels: int, names: List[str],
+               codes: List[np.ndarray], levels: List[int], top_k: int) -> List[TargetAssociation]:
+    """Mutual information of every coded column with the target."""
+    results = []
+    for name, code, k in zip(names, codes, levels):
+        present = (target_codes >= 0) & (code >= 0)
+        table = np.bincount(target_codes[present].astype(np.int64) * k + code[present],
+                            minlength=target_levels * k).reshape(target_levels, k)
+        mi, normalized, n = mutual_information(table)
+        if not np.isnan(mi):
+            results.append(TargetAssociation(column=name, mutual_info=mi, normalized=normalized, n=n))
+    results.sort(key=lambda r: r.mutual_info, reverse=True)
+    return results[:top_k]
+
+def _mi_codes(numeric_cols: List[str], ranks: np.ndarray, categorical_cols: List[str],
+              encoded: List[Tuple[np.ndarray, int]]) -> Dict[str, Tuple[np.ndarray, int]]:
+    """Codes and level counts of the analyzed columns for mutual information (quantile bins for numeric ones)."""
+    codes = {col: (code.astype(np.int8), MI_BINS) for col, code in zip(numeric_cols, _quantile_codes(ranks))}
+    codes.update((col, (code.astype(np.int8), levels)) for col, (code, levels) in zip(categorical_cols, encoded))
+    return codes
+
+
+def _target_associations(sample: pd.DataFrame, target: str, numeric_cols: List[str],
+                         codes: Dict[str, Tuple[np.ndarray, int]], top_k: int) -> List[TargetAssociation]:
+    """Mutual information of every analyzed column with the target."""
+    if target in numeric_cols and sample[target].nunique() > MAX_LEVELS:
+        target_codes, target_levels = codes[target]
+    else:
+        target_codes, target_levels = encode_categories(sample[target])
+    names = [col for col in codes if col != target]
+    return _target_mi(target_codes, target_levels, names, [codes[col][0] for col in names],
+                      [codes[col][1] for col in names], top_k)
+
+
+def compute_relationships(df: pd.DataFrame, path: str = "", target: str = "", top_k: int = DEFAULT_TOP_K,
+                          sample_rows: int = 0, seed: int = 0, n_rows: Optional[int] = None,
+                          pairs_from: Optional[RelationshipReport] = None) -> RelationshipReport:
+    """
+    Find the strongest pairwise associations in a DataFrame.
+
+    Args:
+        df: The dataset (or a uniform sample of it)
+        path: Source path, carried through to the result for display
+        target: Column to rank every other column against by mutual
+            information (empty to skip)
+        top_k: Number of pairs (and target associations) to keep
+        sample_rows: Maximum rows analyzed (0 uses RELATIONSHIPS_SAMPLE_ROWS)
+        seed: Random seed of the row sample
+        n_rows: Row count of the full dataset when df is already a sample
+        pairs_from: Report computed without a target from the same df and
+            settings; its pairs are reused and only the target associations
+            are computed (ignored when it skipped the target column)
+
+    Returns:
+        RelationshipReport with the top_k strongest pairs across all measures
+
+    Raises:
+        ValueError: If the target column does not exist
+    """
+    if target and target not in df.columns:
+        raise ValueError(f"Target column '{target}' not found")
+    total_rows = n_rows if n_rows is not None else len(df)
+    notes = []
+
+    max_rows = resolve_sample_rows(sample_rows, df.shape[1])
+    sample = sample_frame(df, max_rows, seed)
+    sampled = total_rows > len(sample)
+
+    # The target only changes which columns are skipped when it would be
+    # skipped itself; otherwise the pairs of a target-less report still hold
+    if target and pairs_from is not None and pairs_from.mi_codes and target in pairs_from.mi_codes:
+        target_mi = _target_associations(sample, target, pairs_from.numeric_columns, pairs_from.mi_codes, top_k)
+        return replace(pairs_from, path=path, target=target, target_mi=target_mi, mi_codes=None)
+
+    numeric_cols = sample.select_dtypes(include=[np.number]).columns.tolist()
+    categorical_cols = sample.select_dtypes(include=["object", "category", "string", "bool"]).columns.tolist()
+
+    # Identifier-like and constant columns carry no association signal
+    distinct = sample[numeric_cols + categorical_cols].nunique()
+    id_like = [col for col in numeric_cols + categorical_cols
+               if col != target and (is_row_index(sample[col], total_rows) if col in numeric_cols
+                                     else distinct[col] > ID_LIKE_RATIO * len(sample))]
+    constant = [col for col in numeric_cols + categorical_cols if distinct[col] <= 1]
+    skipped = set(id_like) | set(constant)
+    numeric_cols = [col for col in numeric_cols if col not in skipped]
+    categorical_cols = [col for col in categorical_cols if col not in skipped]
+    if id_like:
+        notes.append(f"Skipped identifier-like columns: {', '.join(id_like)}")
+    if constant:
+        notes.append(f"Skipped constant columns: {', '.join(constant)}")
+
+    values = sample[numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    xc, mask, complete = _centered(values)
+    del values
+    ranks = sample[numeric_cols].rank(method="average").to_numpy(dtype=np.float64, na_value=np.nan)
+    encoded = [encode_categories(sample[col]) for col in categorical_cols]
+    cat_codes = np.empty((len(sample), len(categorical_cols)), dtype=np.int32)
+    for j, (codes, _) in enumerate(encoded):
+        cat_codes[:, j] = codes
+    cat_levels = [levels for _, levels in encoded]
+    pooled = [col for col in categorical_cols if distinct[col] > MAX_LEVELS]
+    if pooled:
+        notes.append(f"Categories beyond the {MAX_LEVELS - 1} most frequent pooled for: {', '.join(pooled)}")
+
+    pairs = (
+        _numeric_pairs(numeric_cols, xc, mask, complete, ranks, top_k)
+        + _categorical_pairs(categorical_cols, cat_codes, cat_levels, top_k)
+        + _mixed_pairs(numeric_cols, xc, mask, categorical_cols, cat_codes, cat_levels, top_k)
+    )
+    pairs.sort(key=lambda rel: rel.strength, reverse=True)
+
+    codes = _mi_codes(numeric_cols, ranks, categorical_cols, encoded)
+    target_mi = _target_associations(sample, target, numeric_cols, codes, top_k) if target else []
+
+    return RelationshipReport(
+        path=path,
+        n_rows=total_rows,
+        sample_rows=len(sample) if sampled else None,
+        numeric_columns=numeric_cols,
+        categorical_columns=categorical_cols,
+        pairs=pairs[:top_k],
+        target=target,
+        target_mi=target_mi,
+        notes=notes,
+        mi_codes=None if target else codes,
+    )
@@ -0,0 +1,173 @@
+"""RelationshipsTool - Finds the strongest associations between dataset columns."""
+from crewai.tools import tool
+from dataclasses import replace
+import os
+
+from tools.compact_output import (
+    relationships_payload, render_within_budget, resolve_output_format, resolve_token_budget
+)
+from tools.dataset_cache import dataset_cache
+from tools.dataset_io import read_columns
+from tools.relationships import DEFAULT_TOP_K, RelationshipReport, compute_relationships, resolve_sample_rows
+from tools.sample_budget import SampleBudget, resolve_sample_budget
+from tools.sampling import cached_sample, draw_sample, resolve_stratify
+from tools.streaming_stats import should_stream
+from tools.tool_schema import optional_args
+
+
+MEASURE_LABELS = {
+    "pearson": "Pearson r",
+    "spearman": "Spearman rho",
+    "cramers_v": "Cramér's V",
+    "correlation_ratio": "Correlation ratio (eta)",
+}
+
+
+@optional_args
+@tool("Relationships")
+def relationships_tool(csv_path: str, target: str = "", top_k: int = DEFAULT_TOP_K, sample_rows: int = 0,
+                       output_format: str = "", token_budget: int = 0) -> str:
+    """
+    Finds the strongest relationships between columns of a dataset.
+    Measures Pearson and Spearman correlation between numeric columns,
+    Cramér's V between categorical columns and the correlation ratio between
+    categorical and numeric columns, and ranks every column by mutual
+    information with a target column when one is given.
+    Only the strongest pairs are returned. Large datasets are analyzed on a
+    uniform row sample.
+    Use this tool to find correlated features, redundant columns and the
+    features most related to the target.
+
+    Args:
+        csv_path: Path to the dataset file (CSV, gzip/zstd CSV, Parquet or Feather)
+        target: Target column to rank features against (optional)
+        top_k: Number of strongest pairs to return (default: 20)
+        sample_rows: Maximum rows analyzed (0 uses RELATIONSHIPS_SAMPLE_ROWS)
+        output_format: "text" (default report), "json" (dense JSON) or
+            "compact" (terse table); empty uses TOOL_OUTPUT_FORMAT
+        token_budget: Maximum tokens for json/compact output, dropping the
+            weakest pairs first (0 uses TOOL_TOKEN_BUDGET)
+
+    Returns:
+        String containing the strongest relationships
+    """
+    try:
+        # Check if file exists
+        if not os.path.exists(csv_path):
+            return f"Error: File not found at path: {csv_path}"
+
+        output_format = resolve_output_format(output_format)
+        report = find_relationships(csv_path, target=target, top_k=top_k, sample_rows=sample_rows)
+
+        text = format_relationships(report)
+        if output_format == "text":
+            return text
+        return render_within_budget(relationships_payload(report), output_format,
+                                    resolve_token_budget(token_budget), text)
+
+    except Exception as e:
+        return f"Error computing relationships: {str(e)}"
+
+
+def find_relationships(csv_path: str, target: str = "", top_k: int = DEFAULT_TOP_K,
+                       sample_rows: int = 0) -> RelationshipReport:
+    """
+    Compute the relationships report for a file, once per file version.
+
+    Files that fit in memory go through the shared dataset cache and the
+    result is kept with the cached dataset, the target-independent pairs
+    separately so every target reuses them; larger files are sampled in one
+    chunked pass. When a data tools sample budget is set (DATA_TOOLS_SAMPLE)
+    and sample_rows is not, the sample shared with the Data Statistics tool
+    is used.
+
+    Args:
+        csv_path: Path to the CSV file
+        target: Target column for mutual information (empty to skip)
+        top_k: Number of strongest pairs to keep
+        sample_rows: Maximum rows analyzed (0 uses RELATIONSHIPS_SAMPLE_ROWS)
+
+    Returns:
+        RelationshipReport for the file
+    """
+    budget = None if sample_rows else resolve_sample_budget()
+    if budget:
+        drawn = cached_sample(csv_path, budget, stratify=resolve_stratify())
+        return compute_relationships(drawn.df, path=csv_path, target=target, top_k=top_k,
+                                     n_rows=drawn.total_rows)
+
+    if should_stream(csv_path):
+        n_cols = len(read_columns(csv_path))
+        drawn = draw_sample(csv_path, SampleBudget(rows=resolve_sample_rows(sample_rows, n_cols)))
+        return compute_relationships(drawn.df, path=csv_path, target=target, top_k=top_k,
+                                     sample_rows=sample_rows, n_rows=drawn.total_rows)
+
+    # The pairs do not depend on the target: compute them once (or take them
+    # from the scheduler's precompute) and add each target's associations
+    pairs = dataset_cache.derived(
+        csv_path, f"relationships::{top_k}:{sample_rows}",
+        lambda df: compute_relationships(df, path=csv_path, top_k=top_k, sample_rows=sample_rows)
+    )
+    if target:
+        pairs = dataset_cache.derived(
+            csv_path, f"relationships:{target}:{top_k}:{sample_rows}",
+            lambda df: compute_relationships(df, path=csv_path, target=target, top_k=top_k,
+                                             sample_rows=sample_rows, pairs_from=pairs)
+        )
+    return replace(pairs, path=csv_path)
+
+
+def format_relationships(report: RelationshipReport) -> str:
+    """
+    Render a RelationshipReport as the Relationships text report.
+
+    Args:
+        report: Strongest associations for one dataset
+
+    Returns:
+        String containing the strongest relationships
+    """
+    output = []
+    output.append("=" * 80)
+    output.append("RELATIONSHIP ANALYSIS")
+    output.append("=" * 80)
+    output.append(f"\nDataset: {report.path}")
+    output.append(f"Total Records: {report.n_rows:,}")
+    if report.sampled:
+        output.append(f"Mode: sampled ({report.sample_rows:,} random rows; measures are estimates)")
+    output.append(f"Numeric Columns Analyzed: {len(report.numeric_columns)}")
+    output.append(f"Categorical Columns Analyzed: {len(report.categorical_columns)}")
+    for note in report.notes:
+        output.append(note)
+
+    output.append("\n" + "=" * 80)
+    output.append(f"STRONGEST PAIRWISE RELATIONSHIPS (top {len(report.pairs)})")
+    output.append("=" * 80)
+    if not report.pairs:
+        output.append("\nNo pair of columns could be measured")
+    for idx, pair in enumerate(report.pairs, 1):
+        output.append(f"\n{idx}. {pair.a} ~ {pair.b} ({pair.kind}, {pair.n:,} rows)")
+        for measure, value in pair.measures.items():
+            output.append(f"  {MEASURE_LABELS[measure]}: {value:.4f}")
+        if pair.kind == "num-num":
+            pearson, spearman = pair.measures["pearson"], pair.measures["spearman"]
+            if abs(spearman) - abs(pearson) > 0.1:
+                output.append("  ℹ️  Monotonic but non-linear (Spearman well above Pearson)")
+        if pair.strength > 0.9:
+            output.append("  ⚠️  Near-duplicate information (possible redundancy or leakage)")
+
+    if report.target:
+        output.append("\n" + "=" * 80)
+        output.append(f"MUTUAL INFORMATION WITH TARGET: {report.target}")
+        output.append("=" * 80)
+        if not report.target_mi:
+            output.append("\nNo column could be measured against the target")
+        for idx, assoc in enumerate(report.target_mi, 1):
+            output.append(
+                f"  {idx}. {assoc.column}: {assoc.mutual_info:.4f} nats "
+                f"(normalized {assoc.normalized:.3f}, {assoc.n:,} rows)"
+            )
+
+    output.append("\n" + "=" * 80)
+
+    return "\n".join(output)
@@ -0,0 +1,304 @@
+"""Memory-bounded duplicate-row detection from 64-bit row fingerprints.
+
+Each row is reduced to a 64-bit fingerprint by hashing its columns one array
+at a time and combining the per-column hashes, so memory stays at a few
+arrays of one uint64 per row instead of a hash table of whole rows. The
+fingerprints of a dataset (or of a stream of chunks) are counted exactly:
+in memory while they fit DUPLICATES_MEMORY_MB, and in hash partitions
+spilled to disk beyond it. Two distinct rows share a fingerprint with
+probability 2**-64, so the expected number of false matches among n rows is
+about n**2 / 2**65 (below 3e-4 for 10**8 rows).
+
+In-memory fingerprint sets are kept when a counter is pickled, so an
+incremental profile stays exact across runs while its fingerprints fit the
+budget. A HyperLogLog of the fingerprints is kept alongside. It is what
+remains when spilled fingerprints cannot be carried over to the next run,
+or when spilling is disabled and the budget is exceeded; the duplicate count
+then becomes an estimate with a stated 95% margin.
+"""
+from dataclasses import dataclass
+import math
+import os
+import tempfile
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_integer_dtype, is_numeric_dtype
+
+from tools.sketches import HyperLogLog
+
+
+# Memory budget for in-memory fingerprint sets (overridable via DUPLICATES_MEMORY_MB)
+DEFAULT_MEMORY_MB = 256
+
+# Fingerprint sets over budget are split into this many files by their top bits
+SPILL_PARTITIONS = 256
+
+# HyperLogLog precision for the fallback estimate (0.41% standard error)
+HLL_PRECISION = 16
+
+# Leading rows inspected to decide whether a column is hashed by its distinct values
+CATEGORIZE_PROBE_ROWS = 1024
+
+_MULTIPLIER = np.uint64(0x100000001B3)
+# Mixed into the hashes of non-integral floats so their bit patterns never alias an integer's
+_FLOAT_SALT = np.uint64(0x9E3779B97F4A7C15)
+_Z95 = 1.96
+
+
+def memory_budget_bytes() -> int:
+    """Return the fingerprint memory budget from DUPLICATES_MEMORY_MB."""
+    return int(float(os.getenv("DUPLICATES_MEMORY_MB", DEFAULT_MEMORY_MB)) * 1024 * 1024)
+
+
+def spill_enabled() -> bool:
+    """Return True unless spilling is disabled via DUPLICATES_SPILL=false."""
+    return os.getenv("DUPLICATES_SPILL", "true").lower() != "false"
+
+
+def parse_key_subsets(spec) -> List[List[str]]:
+    """
+    Parse duplicate-check key subsets.
+
+    Args:
+        spec: "id" or "id;first,last" (subsets separated by ";", columns by
+            ","), or a list of column lists; empty for none
+
+    Returns:
+        List of column subsets
+    """
+    if not spec:
+        return []
+    groups = spec.split(";") if isinstance(spec, str) else spec
+    subsets = []
+    for group in groups:
+        names = group.split(",") if isinstance(group, str) else group
+        columns = list(dict.fromkeys(name.strip() for name in names if name.strip()))
+        if columns and columns not in subsets:
+            subsets.append(columns)
+    return subsets
+
+
+def subset_label(columns: Sequence[str]) -> str:
+    """Return the display label of a key subset ("a,b")."""
+    return ",".join(columns)
+
+
+def _hash_values(values, categorize: bool) -> np.ndarray:
+    return pd.util.hash_pandas_object(pd.Series(values, copy=False), index=False,
+                                      categorize=categorize).to_numpy(dtype=np.uint64)
+
+
+def _column_hash(values: pd.Series) -> np.ndarray:
+    # Hashing the distinct values once only pays off for repetitive columns;
+    # both paths give the same hashes
+    head = values.iloc[:CATEGORIZE_PROBE_ROWS]
+    categorize = head.nunique(dropna=False) <= len(head) // 2
+    if is_bool_dtype(values) or not is_numeric_dtype(values):
+        return _hash_values(values, categorize)
+
+    # Integers hash as int64, exactly even beyond 2**53 (e.g. snowflake IDs)
+    if is_integer_dtype(values) and not values.hasnans:
+        return _hash_values(values.to_numpy(dtype=np.int64), categorize)
+
+    # Numbers hash by value, so a column parsed as int in one chunk and float
+    # in another (or 0.0 and -0.0) still matches: integral floats hash like
+    # the integer they equal, the others by their float64 value
+    floats = values.to_numpy(dtype=np.float64, na_value=np.nan) + 0.0
+    integral = np.isfinite(floats) & (np.floor(floats) == floats) & (np.abs(floats) < 2.0 ** 63)
+    hashes = _hash_values(floats, categorize) ^ _FLOAT_SALT
+    if integral.any():
+        ints = values[integral].to_numpy(dtype=np.int64) if is_integer_dtype(values) else floats[integral].astype(np.int64)
+        hashes[integral] = _hash_values(ints, categorize)
+    return hashes
+
+
+def row_fingerprints(df: pd.DataFrame, columns: Sequence[str] = None) -> np.ndarray:
+    """
+    Compute a 64-bit fingerprint per row from the column arrays.
+
+    Args:
+        df: Rows to fingerprint
+        columns: Columns that make up the row (None for all)
+
+    Returns:
+        uint64 array with one fingerprint per row
+    """
+    columns = list(columns) if columns else list(df.columns)
+    fingerprints = np.zeros(len(df), dtype=np.uint64)
+    for position, col in enumerate(columns):
+        fingerprints ^= _column_hash(df[col])
+        fingerprints *= _MULTIPLIER
+        fingerprints += np.uint64(position + 1)
+    return fingerprints
+
+
+@dataclass
+class DuplicateCount:
+    """Result of a duplicate count over some rows."""
+    rows: int
+    duplicates: int
+    exact: bool = True
+    # 95% margin of an approximate count
+    margin: int = 0
+    # Disk partitions used when the fingerprints did not fit in memory
+    partitions: int = 0
+
+
+class DuplicateCounter:
+    """
+    Counts rows whose fingerprint was already seen, within a memory budget.
+
+    Fingerprints are deduplicated in memory until they exceed the budget,
+    then written to SPILL_PARTITIONS files by their top bits and counted
+    one partition at a time at the end. Pickling keeps in-memory
+    fingerprints but not spilled ones; a counter restored without its
+    fingerprints (or merged with one) gives estimates.
+    """
+
+    def __init__(self, memory_bytes: int = None, spill: bool = None):
+        """
+        Args:
+            memory_bytes: Budget for in-memory fingerprints (defaults to DUPLICATES_MEMORY_MB)
+            spill: Spill to disk over budget instead of falling back to the
+                estimate (defaults to DUPLICATES_SPILL)
+        """
+        self.memory_bytes = memory_budget_bytes() if memory_bytes is None else memory_bytes
+        self.spill = spill_enabled() if spill is None else spill
+        self.rows = 0
+        self.exact = True
+        self.sketch = HyperLogLog(p=HLL_PRECISION)
+        self._parts: List[np.ndarray] = []
+        self._buffered = 0
+        self._spill_dir: Optional[tempfile.TemporaryDirectory] = None
+        self._files = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        if self.exact and self._files is None:
+            merged = np.unique(np.concatenate(self._parts)) if self._parts else np.empty(0, dtype=np.uint64)
+            state.update(_parts=[merged], _buffered=merged.nbytes)
+        else:
+            state.update(exact=False, _parts=[], _buffered=0)
+        state.update(_spill_dir=None, _files=None)
+        return state
+
+    def update(self, fingerprints: np.ndarray) -> None:
+        """Add a batch of row fingerprints."""
+        if len(fingerprints) == 0:
+            return
+        self.rows += len(fingerprints)
+        self.sketch.update_hashes(fingerprints)
+        if not self.exact:
+            return
+        if self._files is not None:
+            self._write_partitions(fingerprints)
+            return
+        unique = np.unique(fingerprints)
+        self._parts.append(unique)
+        self._buffered += unique.nbytes
+        if self._buffered > self.memory_bytes:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Merge the in-memory sets; spill (or give up exactness) if still over half the budget."""
+        merged = np.unique(np.concatenate(self._parts))
+        self._parts, self._buffered = [merged], merged.nbytes
+        if self._buffered <= self.memory_bytes // 2:
+            return
+        self._parts, self._buffered = [], 0
+        if not self.spill:
+            self.exact = False
+            return
+        self._spill_dir = tempfile.TemporaryDirectory(prefix="duplicates_", dir=os.getenv("DUPLICATES_SPILL_DIR"))
+        self._files = [open(os.path.join(self._spill_dir.name, f"{i:03d}.u64"), "wb")
+                       for i in range(SPILL_PARTITIONS)]
+        self._write_partitions(merged)
+
+    def _write_partitions(self, fingerprints: np.ndarray) -> None:
+        shift = np.uint64(64 - int(math.log2(SPILL_PARTITIONS)))
+        partition = (fingerprints >> shift).astype(np.intp)
+        order = np.argsort(partition, kind="stable")
+        bounds = np.searchsorted(partition[order], np.arange(SPILL_PARTITIONS + 1))
+        ordered = fingerprints[order]
+        for i in np.flatnonzero(np.diff(bounds)):
+            self._files[i].write(ordered[bounds[i]:bounds[i + 1]].tobytes())
+
+    def merge(self, other: "DuplicateCounter") -> None:
+        """Merge the counts of another counter; stays exact only if both are in memory."""
+        self.rows += other.rows
+        self.sketch.merge(other.sketch)
+        if self.exact and other.exact and self._files is None and other._files is None:
+            self._parts.extend(other._parts)
+            self._buffered += other._buffered
+            if self._buffered > self.memory_bytes:
+                self._compact()
+        else:
+            self.exact = False
+            self._parts, self._buffered = [], 0
+
+    def result(self) -> DuplicateCount:
+        """Return the duplicate count of everything added so far."""
+        if not self.exact:
+            distinct = min(self.sketch.estimate(), self.rows)
+            margin = int(math.ceil(_Z95 * 1.04 / math.sqrt(self.sketch.m) * distinct))
+            return DuplicateCount(rows=self.rows, duplicates=self.rows - distinct, exact=False, margin=margin)
+        if self._files is None:
+            distinct = len(np.unique(np.concatenate(self._parts))) if self._parts else 0
+            return DuplicateCount(rows=self.rows, duplicates=self.rows - distinct)
+        distinct = 0
+        for f in self._files:
+            f.flush()
+            distinct += len(np.unique(np.fromfile(f.name, dtype=np.uint64)))
+        return DuplicateCount(rows=self.rows, duplicates=self.rows - distinct, partitions=SPILL_PARTITIONS)
+
+    def close(self) -> None:
+        """Delete spilled partitions."""
+        if self._files is not None:
+            for f in self._files:
+                f.close()
+            self._files = None
+        if self._spill_dir is not None:
+            self._spill_dir.cleanup()
+            self._spill_dir = None
+
+
+def count_duplicates(df: pd.DataFrame, columns: Sequence[str] = None) -> DuplicateCount:
+    """
+    Count duplicate rows of an in-memory DataFrame (rows equal to an earlier row).
+
+    Args:
+        df: The dataset
+        columns: Compare only these columns, e.g. key columns (None for all)
+
+    Returns:
+        DuplicateCount (exact up to 64-bit fingerprint collisions)
+    """
+    counter = DuplicateCounter()
+    try:
+        counter.update(row_fingerprints(df, columns))
+        return counter.result()
+    finally:
+        counter.close()
+
+
+def key_duplicate_counts(df: pd.DataFrame, subsets: Sequence[Sequence[str]]) -> Dict[str, DuplicateCount]:
+    """
+    Count duplicate values of each key subset of an in-memory DataFrame.
+
+    Args:
+        df: The dataset
+        subsets: Column subsets (see parse_key_subsets)
+
+    Returns:
+        Dictionary of subset label to DuplicateCount
+
+    Raises:
+        ValueError: If a key column does not exist
+    """
+    for columns in subsets:
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Key column(s) not found: {', '.join(missing)}")
+    return {subset_label(columns): count_duplicates(df, columns) for columns in subsets}
@@ -0,0 +1,62 @@
+"""Sample budgets of the approximate EDA mode.
+
+Parsing needs neither pandas nor the tools, so the CLI can validate a
+--sample value before its heavy imports.
+"""
+from dataclasses import dataclass
+import os
+import re
+from typing import Optional
+
+
+# Budget values that turn sampling off (and override DATA_TOOLS_SAMPLE)
+EXACT_VALUES = ("", "0", "off", "none", "exact", "false")
+
+_ROW_SUFFIXES = {"": 1, "k": 10 ** 3, "m": 10 ** 6, "b": 10 ** 9}
+_TIME_SUFFIXES = {"s": 1, "sec": 1, "min": 60, "h": 3600}
+_BUDGET = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([a-z]*)\s*$", re.IGNORECASE)
+
+
+@dataclass
+class SampleBudget:
+    """How much of a file approximate mode may look at."""
+    rows: Optional[int] = None
+    seconds: Optional[float] = None
+
+    def __str__(self) -> str:
+        if self.seconds is not None:
+            return f"{self.seconds:g}s"
+        return f"{self.rows:,} rows"
+
+
+def parse_sample_budget(spec: str) -> Optional[SampleBudget]:
+    """
+    Parse a sample budget such as "250000", "250k", "1.5M", "30s" or "2min".
+
+    Row counts accept k/M/B suffixes; time budgets end in s, sec, min or h.
+
+    Args:
+        spec: Budget string; "", "0", "off", "none" or "exact" mean no sampling
+
+    Returns:
+        SampleBudget, or None for exact mode
+
+    Raises:
+        ValueError: If the budget cannot be parsed
+    """
+    if spec is None or str(spec).strip().lower() in EXACT_VALUES:
+        return None
+    match = _BUDGET.match(str(spec))
+    suffix = match.group(2).lower() if match else None
+    if suffix in _TIME_SUFFIXES:
+        return SampleBudget(seconds=float(match.group(1)) * _TIME_SUFFIXES[suffix])
+    if suffix in _ROW_SUFFIXES:
+        return SampleBudget(rows=max(int(float(match.group(1)) * _ROW_SUFFIXES[suffix]), 1))
+    raise ValueError(
+        f"Invalid sample budget '{spec}': use a row count (250000, 250k, 1.5M) or a time (30s, 2min)"
+    )
+
+
+def resolve_sample_budget(sample: str = "") -> Optional[SampleBudget]:
+    """Return the requested budget, falling back to DATA_TOOLS_SAMPLE."""
+    return parse_sample_budget(sample if sample else os.getenv("DATA_TOOLS_SAMPLE", ""))
@@ -0,0 +1,341 @@
+"""Approximate EDA: row samples drawn under a budget, with error bounds.
+
+For exploration, exact statistics over hundreds of millions of rows are not
+worth the wait. A sample budget (a row count or a time limit) makes the data
+tools draw a uniform, or proportionally stratified, sample of the CSV in one
+chunked pass, compute their statistics on it, and annotate every estimate
+with a confidence interval. Selected columns can be escalated to exact
+statistics, which are gathered during the same pass.
+"""
+from collections import OrderedDict
+from contextlib import closing
+from dataclasses import dataclass, field, replace
+import math
+import os
+from statistics import NormalDist
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from tools.dataset_cache import file_key
+from tools.dataset_io import parse_columns, read_columns, read_table, scan_chunks
+from tools.sample_budget import SampleBudget
+from tools.stats_kernel import DatasetStats, compute_dataset_stats
+from tools.streaming_stats import DEFAULT_CHUNK_SIZE
+
+
+# Rows kept when only a time budget is given
+DEFAULT_TIME_BUDGET_ROWS = 1_000_000
+
+DEFAULT_CONFIDENCE = 0.95
+
+# Stratifying on a column with more distinct values than this is refused
+MAX_STRATA = 100
+
+# Drawn samples kept for reuse by later tool calls
+MAX_CACHED_SAMPLES = 4
+
+
+def resolve_stratify(stratify: str = "") -> str:
+    """Return the requested stratification column, falling back to DATA_TOOLS_STRATIFY."""
+    return stratify or os.getenv("DATA_TOOLS_STRATIFY", "")
+
+
+def resolve_exact_columns(exact_columns: str = "") -> List[str]:
+    """Parse a comma-separated column list, falling back to DATA_TOOLS_EXACT_COLUMNS."""
+    spec = exact_columns or os.getenv("DATA_TOOLS_EXACT_COLUMNS", "")
+    return [col.strip() for col in spec.split(",") if col.strip()]
+
+
+@dataclass
+class CSVSample:
+    """A row sample of one CSV file and how it was drawn."""
+    path: str
+    df: pd.DataFrame
+    total_rows: int
+    rows_scanned: int
+    complete: bool
+    coverage: float
+    budget: SampleBudget
+    seconds: float
+    stratify: str = ""
+    strata: Dict[str, int] = field(default_factory=dict)
+    exact: Optional[pd.DataFrame] = None
+
+
+def _keep_smallest(kept: Dict, stratum, frame: pd.DataFrame, keys: np.ndarray, k: int) -> None:
+    """Add rows to a stratum's reservoir, keeping the k with the smallest random keys."""
+    if stratum in kept:
+        old_frame, old_keys = kept[stratum]
+        frame = pd.concat([old_frame, frame], ignore_index=True)
+        keys = np.concatenate([old_keys, keys])
+    if len(frame) > k:
+        smallest = np.argpartition(keys, k)[:k]
+        frame, keys = frame.iloc[smallest].reset_index(drop=True), keys[smallest]
+    kept[stratum] = (frame, keys)
+
+
+def _allocate(kept: Dict, strata: Dict[str, int], n: int) -> pd.DataFrame:
+    """Proportional allocation: each stratum keeps its share of n (at least one row)."""
+    total = sum(strata.values())
+    frames = []
+    for stratum, population in strata.items():
+        frame, keys = kept[stratum]
+        share = max(int(round(n * population / total)), 1)
+        frames.append(frame.iloc[np.argsort(keys, kind="stable")[:share]])
+    return pd.concat(frames, ignore_index=True)
+
+
+def draw_sample(csv_path: str, budget: SampleBudget, stratify: str = "", exact_columns: Sequence[str] = (),
+                seed: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE, columns: Sequence[str] = ()) -> CSVSample:
+    """
+    Draw a uniform or stratified row sample of a dataset file in one chunked pass.
+
+    Every row gets a random key and the rows with the smallest keys are kept
+    (bottom-k sampling, equivalent to a reservoir), so memory stays at one
+    chunk plus the sample. With stratify, a reservoir is kept per value of
+    that column and the final sample allocates rows to each stratum in
+    proportion to its size, so it remains self-weighting. Under a time
+    budget, reading stops at the deadline: the sample is uniform over the
+    rows scanned so far and the row count is extrapolated from the share of
+    the file read.
+
+    Args:
+        csv_path: Path to the dataset file (CSV, compressed CSV, Parquet or Feather)
+        budget: Row or time budget
+        stratify: Column to stratify on (empty for a uniform sample)
+        exact_columns: Columns collected in full for exact statistics
+        seed: Random seed
+        chunk_size: Number of rows per chunk
+        columns: Read only these columns (plus stratify and exact_columns);
+            empty reads every column
+
+    Returns:
+        CSVSample with the sampled rows, the (estimated) total row count and,
+        for exact_columns, every value of those columns
+
+    Raises:
+        ValueError: If a requested column does not exist or stratify has
+            more than MAX_STRATA values
+    """
+    start = time.perf_counter()
+    deadline = start + budget.seconds if budget.seconds is not None else None
+    k = budget.rows or DEFAULT_TIME_BUDGET_ROWS
+    rng = np.random.default_rng(seed)
+
+    header = read_columns(csv_path)
+    for col in ([stratify] if stratify else []) + list(exact_columns):
+        if col not in header:
+            raise ValueError(f"Column '{col}' not found")
+    projection = parse_columns(columns)
+    if projection:
+        projection = parse_columns(projection + ([stratify] if stratify else []) + list(exact_columns))
+        header = [col for col in header if col in projection]
+
+    kept, strata, exact_parts = {}, {}, []
+    rows, complete, coverage = 0, True, 1.0
+    with closing(scan_chunks(csv_path, chunk_size, projection)) as chunks:
+        for chunk, progress in chunks:
+            rows += len(chunk)
+            keys = rng.random(len(chunk))
+            if exact_columns:
+                exact_parts.append(chunk[list(exact_columns)])
+            if stratify:
+                labels = chunk[stratify].astype(str).where(chunk[stratify].notna(), "(missing)")
+                for stratum, idx in labels.groupby(labels, sort=False).indices.items():
+                    strata[stratum] = strata.get(stratum, 0) + len(idx)
+                    _keep_smallest(kept, stratum, chunk.iloc[idx], keys[idx], k)
+                if len(strata) > MAX_STRATA:
+                    raise ValueError(f"Cannot stratify on '{stratify}': more than {MAX_STRATA} distinct values")
+            else:
+                _keep_smallest(kept, None, chunk, keys, k)
+            if deadline is not None and time.perf_counter() > deadline:
+                if progress < 1.0:
+                    complete, coverage = False, progress
+                break
+
+    if stratify:
+        df = _allocate(kept, strata, min(k, rows)) if strata else pd.DataFrame(columns=header)
+    else:
+        df = kept[None][0] if kept else pd.DataFrame(columns=header)
+
+    exact = None
+    if exact_columns:
+        if complete:
+            exact = pd.concat(exact_parts, ignore_index=True) if exact_parts else pd.DataFrame(columns=exact_columns)
+        else:
+            # Escalated columns are exact by definition: finish them in their own pass
+            exact = read_table(csv_path, exact_columns)
+
+    return CSVSample(
+        path=csv_path,
+        df=df,
+        total_rows=rows if complete else int(round(rows / max(coverage, 1e-9))),
+        rows_scanned=rows,
+        complete=complete,
+        coverage=coverage,
+        budget=budget,
+        seconds=time.perf_counter() - start,
+        stratify=stratify,
+        strata=strata,
+        exact=exact,
+    )
+
+
+_samples: "OrderedDict[tuple, CSVSample]" = OrderedDict()
+_samples_lock = threading.Lock()
+
+
+def cached_sample(csv_path: str, budget: SampleBudget, stratify: str = "",
+                  exact_columns: Sequence[str] = (), columns: Sequence[str] = ()) -> CSVSample:
+    """
+    Draw a sample once per file version and budget, and reuse it afterwards.
+
+    Later tool calls (statistics, relationships, drill-downs) see the same
+    rows, so their estimates are consistent with each other.
+    """
+    key = (file_key(csv_path), budget.rows, budget.seconds, stratify, tuple(exact_columns), tuple(columns))
+    with _samples_lock:
+        if key in _samples:
+            _samples.move_to_end(key)
+            return _samples[key]
+    sample = draw_sample(csv_path, budget, stratify=stratify, exact_columns=exact_columns, columns=columns)
+    with _samples_lock:
+        _samples[key] = sample
+        while len(_samples) > MAX_CACHED_SAMPLES:
+            _samples.popitem(last=False)
+    return sample
+
+
+def _proportion_bounds(hits: int, n: int, z: float, fpc: float) -> Tuple[float, float]:
+    """
+    Wilson score interval for a proportion.
+
+    The finite population correction enters as a larger effective sample
+    size, so the interval still contains the estimate and shrinks to it when
+    the sample is the whole population.
+    """
+    if n == 0:
+        return 0.0, 1.0
+    p = hits / n
+    if fpc == 0:
+        return p, p
+    n_eff = n / (fpc * fpc)
+    denominator = 1 + z * z / n_eff
+    center = (p + z * z / (2 * n_eff)) / denominator
+    half = z * math.sqrt(p * (1 - p) / n_eff + z * z / (4 * n_eff * n_eff)) / denominator
+    return max(center - half, 0.0), min(center + half, 1.0)
+
+
+def _quantile_bounds(ordered: np.ndarray, q: float, z: float, fpc: float) -> Tuple[float, float]:
+    """Distribution-free confidence interval for a quantile from order statistics."""
+    m = len(ordered)
+    if m == 0:
+        return float("nan"), float("nan")
+    half = z * math.sqrt(m * q * (1 - q)) * fpc
+    lo = min(max(int(math.floor(m * q - half)) - 1, 0), m - 1)
+    hi = min(int(math.ceil(m * q + half)), m - 1)
+    return float(ordered[lo]), float(ordered[hi])
+
+
+def sampled_stats(sample: CSVSample, confidence: float = DEFAULT_CONFIDENCE) -> DatasetStats:
+    """
+    Estimate dataset statistics from a sample, with confidence intervals.
+
+    Means and standard deviations use normal-theory intervals, quantiles
+    distribution-free intervals from order statistics, and counts (missing values, outliers, category
+    frequencies) Wilson intervals on the sampled proportion, scaled to the
+    total row count. All intervals include the finite population correction.
+    Intervals assume simple random sampling and are conservative for
+    stratified samples. Columns in sample.exact get exact statistics.
+
+    Args:
+        sample: Drawn sample
+        confidence: Confidence level of the intervals
+
+    Returns:
+        DatasetStats flagged as approximate, with per-column bounds
+    """
+    df = sample.df
+    n, total = len(df), sample.total_rows
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    fpc = math.sqrt(max(total - n, 0) / (total - 1)) if total > 1 else 0.0
+    scale = total / n if n else 0.0
+
+    def scaled(hits: int) -> Tuple[int, Tuple[float, float]]:
+        lo, hi = _proportion_bounds(hits, n, z, fpc)
+        return int(round(hits * scale)), (lo * total, hi * total)
+
+    base = compute_dataset_stats(df, path=sample.path, check_duplicates=False)
+    missing = {}
+    numeric = []
+    for col in base.numeric:
+        ordered = np.sort(df[col.name].dropna().to_numpy(dtype=np.float64))
+        m = len(ordered)
+        missing[col.name], missing_bounds = scaled(col.missing)
+        outliers, outlier_bounds = scaled(col.outliers)
+        bounds = {"missing": missing_bounds, "outliers": outlier_bounds}
+        if m > 1:
+            half = z * col.std / math.sqrt(m) * fpc
+            bounds["mean"] = (col.mean - half, col.mean + half)
+            spread = z / math.sqrt(2 * (m - 1)) * fpc
+            bounds["std"] = (col.std * max(1 - spread, 0.0), col.std * (1 + spread))
+        for name, q in (("q1", 0.25), ("median", 0.5), ("q3", 0.75)):
+            bounds[name] = _quantile_bounds(ordered, q, z, fpc)
+        numeric.append(replace(col, count=total - missing[col.name], missing=missing[col.name],
+                               outliers=outliers, bounds=bounds))
+
+    categorical = []
+    for col in base.categorical:
+        missing[col.name], missing_bounds = scaled(col.missing)
+        top, top_bounds = [], []
+        for value, count in col.top:
+            estimate, bounds = scaled(count)
+            top.append((value, estimate))
+            top_bounds.append(bounds)
+        categorical.append(replace(col, missing=missing[col.name], top=top, top_bounds=top_bounds,
+                                   bounds={"missing": missing_bounds}))
+
+    exact_columns = []
+    if sample.exact is not None and len(sample.exact.columns):
+        exact = compute_dataset_stats(sample.exact, path=sample.path, check_duplicates=False)
+        exact_columns = list(sample.exact.columns)
+        by_name = {s.name: s for s in exact.numeric + exact.categorical}
+        numeric = [by_name.get(s.name, s) for s in numeric]
+        categorical = [by_name.get(s.name, s) for s in categorical]
+        missing.update(exact.missing)
+
+    for col in base.columns:
+        missing.setdefault(col, int(round(base.missing[col] * scale)))
+
+    how = f"stratified on '{sample.stratify}' ({len(sample.strata)} strata)" if sample.stratify else "uniform"
+    notes = [
+        f"Mode: sampled ({n:,} of {total:,} rows, {how}, budget {sample.budget}; "
+        f"~ marks estimates, brackets give {confidence:.0%} confidence intervals)"
+    ]
+    if not sample.complete:
+        notes.append(
+            f"Time budget reached after scanning ~{sample.coverage:.0%} of the file: the row count is "
+            f"extrapolated and rows later in the file are not represented"
+        )
+    if exact_columns:
+        notes.append(f"Exact statistics (full pass) for: {', '.join(exact_columns)}")
+
+    return DatasetStats(
+        path=sample.path,
+        n_rows=total,
+        columns=base.columns,
+        numeric=numeric,
+        categorical=categorical,
+        missing={col: missing[col] for col in base.columns},
+        constant_columns=base.constant_columns,
+        duplicates=None,
+        approximate=True,
+        notes=notes,
+        sample_rows=n,
+        confidence=confidence,
+        exact_columns=exact_columns,
+    )
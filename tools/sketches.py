@@ -0,0 +1,250 @@
+"""Mergeable streaming sketches used by the chunked statistics engine.
+
+Every sketch consumes NumPy/pandas batches, holds bounded memory regardless of
+how many rows it has seen, and can be merged with another sketch of the same
+kind so partial results from separate chunks or runs combine exactly.
+"""
+import numpy as np
+import pandas as pd
+
+
+class RunningMoments:
+    """
+    Count, mean, variance, min and max via a Welford-style accumulator.
+
+    Batches are folded in with Chan et al.'s pairwise update, which is
+    numerically stable and makes the accumulator mergeable.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray) -> None:
+        """Fold a batch of values into the accumulator (NaNs are ignored)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        batch_mean = values.mean()
+        batch_m2 = np.square(values - batch_mean).sum()
+        self._combine(values.size, batch_mean, batch_m2, values.min(), values.max())
+
+    def merge(self, other: "RunningMoments") -> None:
+        """Merge another accumulator into this one."""
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+
+    def _combine(self, n_b: int, mean_b: float, m2_b: float, min_b: float, max_b: float) -> None:
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * n_a * n_b / n
+        self.count = n
+        self.min = min(self.min, float(min_b))
+        self.max = max(self.max, float(max_b))
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1, matching pandas)."""
+        if self.count < 2:
+            return float("nan")
+        return float(np.sqrt(self.m2 / (self.count - 1)))
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang and Liberty, 2016).
+
+    Items live in a stack of compactors; level ``h`` carries weight ``2**h``.
+    When a level overflows it is sorted and every other item (random offset)
+    is promoted to the next level. Memory is O(k) and the rank error is
+    roughly 1.7 / k with high probability.
+    """
+
+    def __init__(self, k: int = 200, seed: int = None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a batch of values to the sketch (NaNs are ignored)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.n += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        """Merge another KLL sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def _compress(self) -> None:
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self.levels)):
+                if self.levels[level].size <= self._capacity(level):
+                    continue
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(self.levels[level])
+                # An odd item out stays behind so no weight is lost
+                leftover = items[-1:] if items.size % 2 else items[:0]
+                items = items[:items.size - leftover.size]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level] = leftover
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                compacted = True
+
+    def _weighted_items(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(level_items.size, 2 ** level, dtype=np.float64)
+            for level, level_items in enumerate(self.levels)
+        ])
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantiles(self, qs) -> np.ndarray:
+        """
+        Estimate quantiles.
+
+        Args:
+            qs: Iterable of quantile fractions in [0, 1]
+
+        Returns:
+            Array of estimated quantile values (NaN if the sketch is empty)
+        """
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        items, weights = self._weighted_items()
+        cumulative = np.cumsum(weights)
+        targets = qs * cumulative[-1]
+        idx = np.searchsorted(cumulative, targets, side="left")
+        return items[np.clip(idx, 0, items.size - 1)]
+
+    def rank(self, value: float, inclusive: bool = True) -> float:
+        """
+        Estimate the fraction of values <= value (or < value if not inclusive).
+        """
+        if self.n == 0:
+            return float("nan")
+        items, weights = self._weighted_items()
+        side = "right" if inclusive else "left"
+        below = np.searchsorted(items, value, side=side)
+        return float(weights[:below].sum() / weights.sum())
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-count sketch over 64-bit hashes.
+
+    With the default precision (p=14, 16 KB of registers) the standard error
+    is about 1.04 / sqrt(2**14) = 0.8%. Small cardinalities fall back to
+    linear counting and are effectively exact.
+    """
+
+    def __init__(self, p: int = 14):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def update(self, values) -> None:
+        """Add a batch of values (hashed with pandas' stable 64-bit hash)."""
+        values = np.asarray(values)
+        if values.size == 0:
+            return
+        self.update_hashes(pd.util.hash_array(values))
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        """Add a batch of precomputed uint64 hashes."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        tail_bits = 64 - self.p
+        idx = (hashes >> np.uint64(tail_bits)).astype(np.intp)
+        tail = hashes & np.uint64((1 << tail_bits) - 1)
+        # Position of the leading one bit in the tail (frexp is exact below 2**53)
+        _, bit_length = np.frexp(tail.astype(np.float64))
+        rank = (tail_bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Merge another sketch of the same precision into this one."""
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        """Return the estimated number of distinct values."""
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m * self.m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * self.m and zeros:
+            return int(round(self.m * np.log(self.m / zeros)))
+        return int(round(raw))
+
+
+class FrequentItems:
+    """
+    Misra-Gries heavy-hitters summary with at most ``capacity`` counters.
+
+    Counts are exact while the number of distinct values stays within the
+    capacity; beyond that every count is an underestimate by at most
+    ``error`` (which is bounded by n / (capacity + 1)).
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.n = 0
+        self.error = 0
+
+    def update(self, values: pd.Series) -> None:
+        """Add a batch of values (NaNs are ignored)."""
+        self.update_counts(values.value_counts())
+
+    def update_counts(self, counts: pd.Series) -> None:
+        """Add a batch of pre-aggregated value counts."""
+        if counts.empty:
+            return
+        self.n += int(counts.sum())
+        self._add(counts)
+
+    def merge(self, other: "FrequentItems") -> None:
+        """Merge another summary into this one (errors add up)."""
+        self.n += other.n
+        self.error += other.error
+        if not other.counts.empty:
+            self._add(other.counts)
+
+    def _add(self, counts: pd.Series) -> None:
+        combined = pd.concat([self.counts, counts.astype(np.int64)])
+        self.counts = combined.groupby(level=0, sort=False).sum()
+        self._reduce()
+
+    def _reduce(self) -> None:
+        if len(self.counts) <= self.capacity:
+            return
+        cut = int(self.counts.nlargest(self.capacity + 1).iloc[-1])
+        reduced = self.counts - cut
+        self.counts = reduced[reduced > 0]
+        self.error += cut
+
+    def top(self, k: int = 5) -> pd.Series:
+        """Return the k most frequent values with their (lower-bound) counts."""
+        return self.counts.sort_values(ascending=False, kind="stable").head(k)
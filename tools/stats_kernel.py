@@ -0,0 +1,218 @@
+"""Vectorized columnar statistics kernel behind the Data Statistics tool.
+
+Numeric moments, quantiles and IQR outlier counts are computed for whole
+blocks of columns at once with NumPy, and null/unique counts are computed
+exactly once per column. Duplicate rows are counted from 64-bit row
+fingerprints (see tools/row_fingerprints.py). Results come back as plain dataclasses that the
+tool's text renderer (or any other consumer) formats.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from tools.row_fingerprints import count_duplicates, key_duplicate_counts
+
+
+# Numeric columns are processed in blocks of this many columns to bound the
+# size of the temporary float64 matrix on very wide tables
+NUMERIC_BLOCK_COLUMNS = 256
+
+
+@dataclass
+class NumericColumnStats:
+    """Descriptive statistics for one numeric column."""
+    name: str
+    count: int
+    missing: int
+    mean: float
+    median: float
+    std: float
+    min: float
+    max: float
+    q1: float
+    q3: float
+    outliers: int
+    # Confidence intervals of sample estimates, keyed by field name
+    bounds: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+
+
+@dataclass
+class CategoricalColumnStats:
+    """Cardinality and frequency statistics for one categorical column."""
+    name: str
+    missing: int
+    cardinality: int
+    top: List[Tuple[object, int]]
+    top_error: int = 0
+    # Confidence intervals of sample estimates (top_bounds follows top)
+    bounds: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    top_bounds: List[Tuple[float, float]] = field(default_factory=list)
+
+
+@dataclass
+class DatasetStats:
+    """Structured result of a statistical analysis of one dataset."""
+    path: str
+    n_rows: int
+    columns: List[str]
+    numeric: List[NumericColumnStats]
+    categorical: List[CategoricalColumnStats]
+    missing: Dict[str, int]
+    constant_columns: List[str]
+    duplicates: Optional[int] = None
+    # 95% margin when the duplicate count is an estimate (None when exact)
+    duplicates_margin: Optional[int] = None
+    # Duplicate counts per key-column subset ("a,b"), with margins for estimates
+    key_duplicates: Dict[str, int] = field(default_factory=dict)
+    key_duplicates_margin: Dict[str, int] = field(default_factory=dict)
+    approximate: bool = False
+    notes: List[str] = field(default_factory=list)
+    # Set when computed from a row sample (see tools/sampling.py)
+    sample_rows: Optional[int] = None
+    confidence: Optional[float] = None
+    exact_columns: List[str] = field(default_factory=list)
+
+    @property
+    def numeric_columns(self) -> List[str]:
+        return [s.name for s in self.numeric]
+
+    @property
+    def categorical_columns(self) -> List[str]:
+        return [s.name for s in self.categorical]
+
+
+def _numeric_block_stats(block: np.ndarray):
+    """
+    Compute per-column statistics for a 2D float64 block (rows x columns).
+
+    Returns a dict of 1D arrays, one entry per statistic.
+    """
+    n_rows, n_cols = block.shape
+    if n_rows == 0:
+        nan = np.full(n_cols, np.nan)
+        zeros = np.zeros(n_cols, dtype=np.int64)
+        return {"count": zeros, "mean": nan, "median": nan, "std": nan,
+                "min": nan, "max": nan, "q1": nan, "q3": nan, "outliers": zeros}
+
+    valid = ~np.isnan(block)
+    count = valid.sum(axis=0)
+    safe_count = np.maximum(count, 1)
+
+    total = np.where(valid, block, 0.0).sum(axis=0)
+    mean = total / safe_count
+    centered = np.where(valid, block - mean, 0.0)
+    var = np.square(centered).sum(axis=0) / np.maximum(count - 1, 1)
+    std = np.where(count > 1, np.sqrt(var), np.nan)
+
+    # One sort per block gives min, max and every quantile; NaNs sort last
+    ordered = np.sort(block, axis=0)
+    cols = np.arange(n_cols)
+
+    def quantile(q: float) -> np.ndarray:
+        # Linear interpolation over the non-missing prefix (pandas' default)
+        h = (safe_count - 1) * q
+        lo = np.floor(h).astype(np.intp)
+        hi = np.ceil(h).astype(np.intp)
+        low_vals = ordered[lo, cols]
+        return low_vals + (h - lo) * (ordered[hi, cols] - low_vals)
+
+    q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+    col_min = ordered[0, cols]
+    col_max = ordered[safe_count - 1, cols]
+
+    iqr = q3 - q1
+    with np.errstate(invalid="ignore"):
+        outliers = ((block < q1 - 1.5 * iqr) | (block > q3 + 1.5 * iqr)).sum(axis=0)
+
+    empty = count == 0
+    for values in (mean, q1, median, q3, col_min, col_max):
+        values[empty] = np.nan
+
+    return {
+        "count": count, "mean": mean, "median": median, "std": std,
+        "min": col_min, "max": col_max, "q1": q1, "q3": q3, "outliers": outliers,
+    }
+
+
+def compute_dataset_stats(df: pd.DataFrame, path: str = "", top_k: int = 5,
+                          check_duplicates: bool = True, duplicate_keys: Sequence[Sequence[str]] = ()) -> DatasetStats:
+    """
+    Compute exact statistics for an in-memory DataFrame.
+
+    Args:
+        df: The dataset
+        path: Source path, carried through to the result for display
+        top_k: Number of most frequent categories to keep per categorical column
+        check_duplicates: Count duplicate rows (left as None when False)
+        duplicate_keys: Column subsets (e.g. key columns) to count duplicate
+            values of, from row fingerprints
+
+    Returns:
+        DatasetStats with numeric, categorical, missing-value and quality results
+    """
+    n_rows = len(df)
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    categorical_cols = df.select_dtypes(include=["object", "category", "string"]).columns.tolist()
+
+    # Numeric and categorical null counts fall out of their own passes below;
+    # only the remaining columns need a separate null scan
+    typed = set(numeric_cols) | set(categorical_cols)
+    other_cols = [col for col in df.columns if col not in typed]
+    missing = {col: int(n) for col, n in df[other_cols].isnull().sum().items()}
+    constant_columns = set()
+
+    numeric = []
+    for start in range(0, len(numeric_cols), NUMERIC_BLOCK_COLUMNS):
+        block_cols = numeric_cols[start:start + NUMERIC_BLOCK_COLUMNS]
+        block = df[block_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        results = _numeric_block_stats(block)
+        for j, col in enumerate(block_cols):
+            missing[col] = n_rows - int(results["count"][j])
+            numeric.append(NumericColumnStats(
+                name=col,
+                count=int(results["count"][j]),
+                missing=missing[col],
+                mean=float(results["mean"][j]),
+                median=float(results["median"][j]),
+                std=float(results["std"][j]),
+                min=float(results["min"][j]),
+                max=float(results["max"][j]),
+                q1=float(results["q1"][j]),
+                q3=float(results["q3"][j]),
+                outliers=int(results["outliers"][j]),
+            ))
+            if results["count"][j] and results["min"][j] == results["max"][j]:
+                constant_columns.add(col)
+
+    # One value_counts per categorical column yields cardinality and top values
+    categorical = []
+    for col in categorical_cols:
+        value_counts = df[col].value_counts()
+        missing[col] = n_rows - int(value_counts.sum())
+        categorical.append(CategoricalColumnStats(
+            name=col,
+            missing=missing[col],
+            cardinality=len(value_counts),
+            top=[(val, int(count)) for val, count in value_counts.head(top_k).items()],
+        ))
+        if len(value_counts) == 1:
+            constant_columns.add(col)
+
+    # Remaining dtypes (bool, datetime, ...) only feed the constant-column check
+    for col in other_cols:
+        if df[col].nunique() == 1:
+            constant_columns.add(col)
+
+    return DatasetStats(
+        path=path,
+        n_rows=n_rows,
+        columns=list(df.columns),
+        numeric=numeric,
+        categorical=categorical,
+        missing={col: missing[col] for col in df.columns},
+        constant_columns=[col for col in df.columns if col in constant_columns],
+        duplicates=count_duplicates(df).duplicates if check_duplicates else None,
+        key_duplicates={label: count.duplicates for label, count in key_duplicate_counts(df, duplicate_keys).items()},
+    )
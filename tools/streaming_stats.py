@@ -0,0 +1,271 @@
+"""Single-pass, chunked statistics engine for datasets larger than memory."""
+import os
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from tools.dataset_io import check_columns, iter_chunks
+from tools.row_fingerprints import DuplicateCounter, row_fingerprints, subset_label
+from tools.sketches import FrequentItems, HyperLogLog, KLLSketch, RunningMoments
+from tools.stats_kernel import CategoricalColumnStats, DatasetStats, NumericColumnStats
+
+
+# Rows per chunk when streaming a CSV
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Files above this size (in MB) are profiled in streaming mode automatically
+# (overridable via DATA_STATS_STREAMING_THRESHOLD_MB)
+DEFAULT_STREAMING_THRESHOLD_MB = 1024
+
+
+def should_stream(csv_path: str) -> bool:
+    """Return True if the file is large enough to be profiled in streaming mode."""
+    threshold_mb = float(os.getenv("DATA_STATS_STREAMING_THRESHOLD_MB", DEFAULT_STREAMING_THRESHOLD_MB))
+    return os.path.getsize(csv_path) > threshold_mb * 1024 * 1024
+
+
+class NumericColumnProfile:
+    """Streaming state for one numeric column."""
+
+    def __init__(self):
+        self.missing = 0
+        self.moments = RunningMoments()
+        self.quantiles = KLLSketch()
+
+    def to_stats(self, name: str) -> NumericColumnStats:
+        moments = self.moments
+        q1, median, q3 = self.quantiles.quantiles([0.25, 0.5, 0.75])
+        outliers = 0
+        if moments.count:
+            # IQR outliers estimated from the sketch's rank function
+            iqr = q3 - q1
+            below = self.quantiles.rank(q1 - 1.5 * iqr, inclusive=False)
+            above = 1 - self.quantiles.rank(q3 + 1.5 * iqr, inclusive=True)
+            outliers = int(round((below + above) * moments.count))
+        empty = float("nan")
+        return NumericColumnStats(
+            name=name,
+            count=moments.count,
+            missing=self.missing,
+            mean=moments.mean if moments.count else empty,
+            median=float(median),
+            std=moments.std,
+            min=moments.min if moments.count else empty,
+            max=moments.max if moments.count else empty,
+            q1=float(q1),
+            q3=float(q3),
+            outliers=outliers,
+        )
+
+    def update(self, values: pd.Series) -> None:
+        array = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        self.missing += int(np.isnan(array).sum())
+        self.moments.update(array)
+        self.quantiles.update(array)
+
+    def merge(self, other: "NumericColumnProfile") -> None:
+        self.missing += other.missing
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+
+
+class CategoricalColumnProfile:
+    """Streaming state for one categorical (object/category) column."""
+
+    def __init__(self):
+        self.missing = 0
+        self.distinct = HyperLogLog()
+        self.frequent = FrequentItems()
+
+    def to_stats(self, name: str, top_k: int = 5) -> CategoricalColumnStats:
+        # HLL can overshoot slightly; a column cannot hold more values than rows
+        cardinality = min(self.distinct.estimate(), self.frequent.n)
+        return CategoricalColumnStats(
+            name=name,
+            missing=self.missing,
+            cardinality=cardinality,
+            top=[(val, int(count)) for val, count in self.frequent.top(top_k).items()],
+            top_error=self.frequent.error,
+        )
+
+    def update(self, values: pd.Series) -> None:
+        present = values.dropna()
+        self.missing += len(values) - len(present)
+        if present.empty:
+            return
+        counts = present.astype(str).value_counts()
+        self.distinct.update(counts.index.to_numpy(dtype=object))
+        self.frequent.update_counts(counts)
+
+    def merge(self, other: "CategoricalColumnProfile") -> None:
+        self.missing += other.missing
+        self.distinct.merge(other.distinct)
+        self.frequent.merge(other.frequent)
+
+
+class OtherColumnProfile:
+    """Streaming state for columns that are neither numeric nor categorical."""
+
+    def __init__(self):
+        self.missing = 0
+
+    def update(self, values: pd.Series) -> None:
+        self.missing += int(values.isna().sum())
+
+    def merge(self, other: "OtherColumnProfile") -> None:
+        self.missing += other.missing
+
+
+class StreamingProfiler:
+    """
+    Accumulates per-column statistics over a sequence of DataFrame chunks.
+
+    Column kinds are fixed by the first chunk, mirroring the dtype split the
+    Data Statistics tool uses (numeric vs object/category). Later chunks whose
+    values do not parse as numbers in a numeric column count as missing.
+    Memory is bounded by one chunk plus a fixed-size sketch per column, and
+    by the duplicate counters' budget (beyond which they spill to disk).
+    """
+
+    def __init__(self, duplicate_keys: Sequence[Sequence[str]] = ()):
+        """
+        Args:
+            duplicate_keys: Column subsets (e.g. key columns) to count
+                duplicate values of, besides whole rows
+        """
+        self.rows = 0
+        self.chunks = 0
+        self.columns = []
+        self.numeric_cols = []
+        self.categorical_cols = []
+        self.profiles = {}
+        self.duplicates = DuplicateCounter()
+        self.key_duplicates = {subset_label(key): (list(key), DuplicateCounter()) for key in duplicate_keys}
+
+    def _init_columns(self, chunk: pd.DataFrame) -> None:
+        self.columns = list(chunk.columns)
+        self.numeric_cols = chunk.select_dtypes(include=[np.number]).columns.tolist()
+        self.categorical_cols = chunk.select_dtypes(include=["object", "category", "string"]).columns.tolist()
+        for col in self.columns:
+            if col in self.numeric_cols:
+                self.profiles[col] = NumericColumnProfile()
+            elif col in self.categorical_cols:
+                self.profiles[col] = CategoricalColumnProfile()
+            else:
+                self.profiles[col] = OtherColumnProfile()
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Fold one chunk of rows into the running statistics."""
+        if not self.columns:
+            self._init_columns(chunk)
+        self.rows += len(chunk)
+        self.chunks += 1
+        for col in self.columns:
+            self.profiles[col].update(chunk[col])
+        self.duplicates.update(row_fingerprints(chunk, self.columns))
+        for key, counter in self.key_duplicates.values():
+            counter.update(row_fingerprints(chunk, key))
+
+    def merge(self, other: "StreamingProfiler") -> None:
+        """Merge the statistics of another profiler over the same columns."""
+        if not self.columns:
+            self.columns = list(other.columns)
+            self.numeric_cols = list(other.numeric_cols)
+            self.categorical_cols = list(other.categorical_cols)
+            self.profiles = {col: type(profile)() for col, profile in other.profiles.items()}
+        self.rows += other.rows
+        self.chunks += other.chunks
+        for col in self.columns:
+            self.profiles[col].merge(other.profiles[col])
+        self.duplicates.merge(other.duplicates)
+        # Only keys counted on both sides stay meaningful
+        self.key_duplicates = {
+            label: (key, counter) for label, (key, counter) in self.key_duplicates.items()
+            if label in other.key_duplicates
+        }
+        for label, (_, counter) in self.key_duplicates.items():
+            counter.merge(other.key_duplicates[label][1])
+
+    def close(self) -> None:
+        """Delete any fingerprints the duplicate counters spilled to disk."""
+        self.duplicates.close()
+        for _, counter in self.key_duplicates.values():
+            counter.close()
+
+    def to_stats(self, path: str = "", chunk_size: int = None) -> DatasetStats:
+        """
+        Convert the accumulated state into a DatasetStats result.
+
+        Args:
+            path: Source path, carried through to the result for display
+            chunk_size: Rows per chunk used for the pass, for the mode note
+
+        Returns:
+            DatasetStats flagged as approximate; duplicate counts are exact
+            unless the counters had to fall back to their estimates
+        """
+        constant_columns = []
+        for col in self.columns:
+            profile = self.profiles[col]
+            if col in self.numeric_cols:
+                moments = profile.moments
+                if moments.count and moments.min == moments.max:
+                    constant_columns.append(col)
+            elif col in self.categorical_cols:
+                if len(profile.frequent.counts) == 1 and profile.distinct.estimate() == 1:
+                    constant_columns.append(col)
+
+        duplicates = self.duplicates.result()
+        keys = {label: counter.result() for label, (_, counter) in self.key_duplicates.items()}
+        chunk_note = f" of up to {chunk_size:,} rows" if chunk_size else ""
+        notes = [
+            f"Mode: streaming ({self.chunks} chunks{chunk_note}; quantiles, outliers, "
+            f"cardinality and top categories are approximate)"
+        ]
+        if not duplicates.exact:
+            notes.append("Duplicates: estimated from a HyperLogLog of 64-bit row fingerprints "
+                         "(the exact fingerprints exceeded DUPLICATES_MEMORY_MB and were not kept)")
+        elif duplicates.partitions:
+            notes.append(f"Duplicates: exact count of 64-bit row fingerprints, spilled to "
+                         f"{duplicates.partitions} disk partitions")
+        return DatasetStats(
+            path=path,
+            n_rows=self.rows,
+            columns=list(self.columns),
+            numeric=[self.profiles[col].to_stats(col) for col in self.numeric_cols],
+            categorical=[self.profiles[col].to_stats(col) for col in self.categorical_cols],
+            missing={col: self.profiles[col].missing for col in self.columns},
+            constant_columns=constant_columns,
+            duplicates=duplicates.duplicates,
+            duplicates_margin=None if duplicates.exact else duplicates.margin,
+            key_duplicates={label: count.duplicates for label, count in keys.items()},
+            key_duplicates_margin={label: count.margin for label, count in keys.items() if not count.exact},
+            approximate=True,
+            notes=notes,
+        )
+
+
+def profile_csv_streaming(csv_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          columns: Sequence[str] = None,
+                          duplicate_keys: Sequence[Sequence[str]] = ()) -> StreamingProfiler:
+    """
+    Profile a dataset file in one pass over fixed-size chunks.
+
+    Args:
+        csv_path: Path to the dataset file (CSV, compressed CSV, Parquet or Feather)
+        chunk_size: Number of rows per chunk
+        columns: Profile only these columns (None or empty for all); key
+            columns missing from the projection are added to it
+        duplicate_keys: Column subsets to count duplicate values of
+
+    Returns:
+        StreamingProfiler holding the accumulated statistics
+    """
+    check_columns(csv_path, [col for key in duplicate_keys for col in key])
+    if columns and duplicate_keys:
+        columns = list(dict.fromkeys(list(columns) + [col for key in duplicate_keys for col in key]))
+    profiler = StreamingProfiler(duplicate_keys=duplicate_keys)
+    for chunk in iter_chunks(csv_path, chunk_size, columns):
+        profiler.update(chunk)
+    return profiler
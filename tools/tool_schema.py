@@ -0,0 +1,28 @@
+"""Argument schemas that keep the tool functions' parameter defaults.
+
+crewai's @tool decorator builds the argument schema from type annotations
+only, so every parameter becomes required and an agent calling a tool with
+just csv_path fails validation. optional_args rebuilds the schema from the
+function signature so parameters with defaults stay optional.
+"""
+import inspect
+
+from pydantic import create_model
+
+
+def optional_args(tool):
+    """
+    Rebuild a @tool's argument schema so defaulted parameters are optional.
+
+    Args:
+        tool: A tool created with crewai's @tool decorator
+
+    Returns:
+        The same tool, with its args_schema replaced
+    """
+    fields = {}
+    for name, param in inspect.signature(tool.func).parameters.items():
+        default = ... if param.default is inspect.Parameter.empty else param.default
+        fields[name] = (param.annotation, default)
+    tool.args_schema = create_model(tool.args_schema.__name__, **fields)
+    return tool